@@ -0,0 +1,106 @@
+import contextlib
+import io
+import socket
+import threading
+import time
+
+import client
+from client import ChatClient, send_message
+from protocol import FrameDecoder
+
+MESSAGE_COUNT = 2000
+
+
+class SinkServer:
+    """
+    只统计收到消息数量的本地服务器，避免打印影响基准结果
+    """
+
+    def __init__(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(('localhost', 0))
+        self._server.listen(1024)
+        self.port = self._server.getsockname()[1]
+        self.received = 0
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def wait_for(self, count, timeout=60):
+        """
+        等待累计收到count条消息
+        """
+        with self._done:
+            return self._done.wait_for(lambda: self.received >= count, timeout)
+
+    def _accept_loop(self):
+        while True:
+            conn, _ = self._server.accept()
+            threading.Thread(target=self._read_loop, args=(conn,),
+                             daemon=True).start()
+
+    def _read_loop(self, conn):
+        decoder = FrameDecoder()
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                count = len(decoder.feed(data))
+                if count:
+                    with self._done:
+                        self.received += count
+                        self._done.notify_all()
+
+
+def bench_connect_per_message(sink, count=MESSAGE_COUNT):
+    """
+    每条消息新建一次连接的吞吐量
+
+    Returns:
+        float: 每秒消息数
+    """
+    start = time.perf_counter()
+    # send_message每条都会打印，基准期间屏蔽输出
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            send_message(f"消息{i}")
+    sink.wait_for(count)
+    return count / (time.perf_counter() - start)
+
+
+def bench_persistent(sink, count=MESSAGE_COUNT):
+    """
+    长连接流水线发送的吞吐量
+
+    Returns:
+        float: 每秒消息数
+    """
+    base = sink.received
+    start = time.perf_counter()
+    with ChatClient('localhost', sink.port) as chat:
+        for i in range(count):
+            chat.send(f"消息{i}")
+    sink.wait_for(base + count)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """
+    运行两种发送方式的基准并打印结果
+    """
+    sink = SinkServer()
+    # send_message使用模块级地址，指向本地统计服务器
+    client.PORT = sink.port
+
+    print(f"=== 客户端发送基准 ({MESSAGE_COUNT} 条消息) ===")
+    per_message = bench_connect_per_message(sink)
+    print(f"每条消息新建连接: {per_message:>10,.0f} msg/s")
+    persistent = bench_persistent(sink)
+    print(f"长连接流水线:     {persistent:>10,.0f} msg/s "
+          f"({persistent / per_message:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
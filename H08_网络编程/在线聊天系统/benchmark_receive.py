@@ -0,0 +1,152 @@
+import socket
+import threading
+import time
+import tracemalloc
+
+from protocol import BufferPool, FrameDecoder, FrameReceiver, encode_frames
+
+MESSAGE_COUNT = 200000
+MESSAGE = "x" * 64
+# 原接收路径每次recv的字节数
+RECV_SIZE = 4096
+
+
+class ReplaySocket:
+    """
+    从内存中的字节流读取数据的假套接字，使统计只包含接收路径本身的分配
+
+    recv()像真实套接字一样每次返回新的bytes，recv_into()直接写入调用方缓冲区。
+    """
+
+    def __init__(self, data, chunk=RECV_SIZE):
+        self._view = memoryview(data)
+        self._offset = 0
+        self._chunk = chunk
+
+    def recv(self, size):
+        end = min(self._offset + size, self._offset + self._chunk)
+        data = bytes(self._view[self._offset:end])
+        self._offset += len(data)
+        return data
+
+    def recv_into(self, buffer):
+        count = min(len(buffer), self._chunk, len(self._view) - self._offset)
+        buffer[:count] = self._view[self._offset:self._offset + count]
+        self._offset += count
+        return count
+
+
+def read_with_decoder(sock):
+    """
+    原接收路径：recv得到新的bytes，再由FrameDecoder复制到内部缓冲区解码
+
+    Returns:
+        int: 收到的消息数量
+    """
+    decoder = FrameDecoder()
+    count = 0
+    while True:
+        data = sock.recv(RECV_SIZE)
+        if not data:
+            return count
+        count += len(decoder.feed(data))
+
+
+def read_with_receiver(sock, pool):
+    """
+    新接收路径：recv_into写入池化缓冲区，只解码完整的帧
+
+    Returns:
+        int: 收到的消息数量
+    """
+    receiver = FrameReceiver(pool)
+    count = 0
+    try:
+        while True:
+            messages = receiver.recv(sock)
+            if messages is None:
+                return count
+            count += len(messages)
+    finally:
+        receiver.close()
+
+
+def measure_allocations(reader, data, count):
+    """
+    统计接收路径每条消息临时分配的字节数
+
+    对象在CPython中用完立即释放，当前内存看不出分配量，
+    因此在每次接收前重置峰值，把每次的峰值增量累加起来。
+
+    Returns:
+        float: 每条消息临时分配的字节数
+    """
+    sock = ReplaySocket(data)
+    recv, recv_into = sock.recv, sock.recv_into
+    total = 0
+
+    def traced(method):
+        def wrapper(*args):
+            nonlocal total
+            current, peak = tracemalloc.get_traced_memory()
+            total += peak - current
+            tracemalloc.reset_peak()
+            return method(*args)
+        return wrapper
+
+    sock.recv = traced(recv)
+    sock.recv_into = traced(recv_into)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        assert reader(sock) == count
+        current, peak = tracemalloc.get_traced_memory()
+        total += peak - current
+    finally:
+        tracemalloc.stop()
+    return total / count
+
+
+def measure_throughput(reader, data, count):
+    """
+    通过真实的本地套接字测量接收吞吐量
+
+    Returns:
+        float: 每秒消息数
+    """
+    left, right = socket.socketpair()
+
+    def sender():
+        with left:
+            left.sendall(data)
+
+    thread = threading.Thread(target=sender)
+    start = time.perf_counter()
+    thread.start()
+    with right:
+        assert reader(right) == count
+    thread.join()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """
+    对比两种接收路径的分配量与吞吐量
+    """
+    data = encode_frames([MESSAGE] * MESSAGE_COUNT)
+    pool = BufferPool()
+    paths = [
+        ("recv + FrameDecoder", read_with_decoder),
+        ("recv_into + BufferPool", lambda sock: read_with_receiver(sock, pool)),
+    ]
+
+    print(f"=== 服务器接收路径 ({MESSAGE_COUNT} 条 {len(MESSAGE)} 字节消息) ===")
+    for name, reader in paths:
+        allocated = measure_allocations(reader, data, MESSAGE_COUNT)
+        throughput = measure_throughput(reader, data, MESSAGE_COUNT)
+        print(f"{name:<24} 每条消息临时分配 {allocated:>7.1f} 字节, "
+              f"{throughput:>10,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
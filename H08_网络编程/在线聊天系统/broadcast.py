@@ -0,0 +1,604 @@
+import asyncio
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+
+from protocol import encode_frame
+
+# 慢消费者策略
+DROP_OLDEST = 'drop_oldest'
+DISCONNECT = 'disconnect'
+COALESCE = 'coalesce'
+POLICIES = (DROP_OLDEST, DISCONNECT, COALESCE)
+
+DEFAULT_ROOM = 'lobby'
+# 每个聊天室在内存中保留的最近消息数，新加入的客户端会先收到这些消息
+HISTORY_SIZE = 50
+
+# Linux上不阻塞地send；其他平台退化为0，依赖套接字本身的模式
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+
+class FanoutMetrics:
+    """
+    广播扇出指标：从服务器收到消息到最后一个接收方写出的耗时
+    """
+
+    def __init__(self, max_samples=10000):
+        """
+        Args:
+            max_samples: 保留的最近耗时样本数量，用于计算分位数
+        """
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)
+        self.messages = 0
+        self.deliveries = 0
+        self.dropped = 0
+        self.disconnects = 0
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.messages += 1
+
+    def record_delivered(self, count=1):
+        with self._lock:
+            self.deliveries += count
+
+    def record_dropped(self, count=1):
+        with self._lock:
+            self.dropped += count
+
+    def record_disconnect(self):
+        with self._lock:
+            self.disconnects += 1
+
+    def snapshot(self):
+        """
+        获取指标快照
+
+        Returns:
+            dict: 完成扇出的消息数、投递数、丢弃数、断开数，
+            以及最近样本的p50/p99/最大扇出耗时（毫秒）
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            result = {
+                'messages': self.messages,
+                'deliveries': self.deliveries,
+                'dropped': self.dropped,
+                'disconnects': self.disconnects,
+            }
+        result['p50_ms'] = _percentile(samples, 0.50) * 1000
+        result['p99_ms'] = _percentile(samples, 0.99) * 1000
+        result['max_ms'] = (samples[-1] if samples else 0.0) * 1000
+        return result
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+class Delivery:
+    """
+    一条广播消息的投递进度，所有接收方写出或丢弃后记录扇出耗时
+    """
+
+    __slots__ = ('received_at', 'remaining', 'metrics')
+
+    def __init__(self, received_at, remaining, metrics):
+        self.received_at = received_at
+        self.remaining = remaining
+        self.metrics = metrics
+
+    def done(self):
+        # 各会话可能在不同线程完成，计数用指标锁保护
+        with self.metrics._lock:
+            self.remaining -= 1
+            finished = self.remaining == 0
+        if finished:
+            self.metrics.record_latency(
+                time.perf_counter() - self.received_at)
+
+
+class ClientSession:
+    """
+    单个客户端的有界发送队列
+
+    队列元素为 [待写字节, 已写偏移, 投递列表]。队列已满时按策略处理：
+    drop_oldest丢弃最早的消息；disconnect断开该客户端；
+    coalesce把积压的消息合并成一次写入，积压字节超过上限时断开。
+    """
+
+    def __init__(self, address, metrics, max_queue=256, policy=DROP_OLDEST,
+                 max_pending_bytes=4 * 1024 * 1024):
+        """
+        Args:
+            address: 客户端地址信息
+            metrics: 共享的FanoutMetrics
+            max_queue: 发送队列最多容纳的消息数
+            policy: 慢消费者策略，取值见POLICIES
+            max_pending_bytes: coalesce策略下允许积压的最大字节数
+
+        Raises:
+            ValueError: 当policy不受支持时抛出
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的慢消费者策略: {policy}")
+        self.address = address
+        self.room = None
+        self.closed = False
+        # 最近一次收到数据的monotonic时间与空闲定时器，由服务器维护
+        self.last_active = time.monotonic()
+        self.idle_timer = None
+        self._metrics = metrics
+        self._max_queue = max_queue
+        self._policy = policy
+        self._max_pending_bytes = max_pending_bytes
+        self._queue = deque()
+        self._pending_bytes = 0
+        # 队头消息已交给写出方、还没确认写完，偏移可能仍为0，但不能丢弃
+        self._head_in_flight = False
+        self._lock = threading.Lock()
+
+    def enqueue(self, frame, delivery=None):
+        """
+        把一帧放入发送队列并尝试写出，不会阻塞
+
+        Args:
+            frame: 已编码的帧
+            delivery: 广播投递进度，单独回复时为None
+        """
+        deliveries = [delivery] if delivery is not None else []
+        with self._lock:
+            if self.closed:
+                _complete(deliveries)
+                return
+            if len(self._queue) >= self._max_queue:
+                if not self._make_room_locked():
+                    self._close_locked(deliveries)
+                    return
+            self._queue.append([frame, 0, deliveries])
+            self._pending_bytes += len(frame)
+        self._on_enqueue()
+
+    def pending(self):
+        """
+        获取队列中尚未写出的消息数
+        """
+        with self._lock:
+            return len(self._queue)
+
+    def close(self):
+        """
+        关闭会话，丢弃尚未写出的消息
+        """
+        with self._lock:
+            self._close_locked([])
+
+    def _make_room_locked(self):
+        """
+        按策略为新消息腾出位置
+
+        Returns:
+            bool: 腾出位置返回True，需要断开客户端返回False
+        """
+        if self._policy == DROP_OLDEST:
+            # 正在写出的消息不能丢弃，否则会破坏帧边界
+            index = 1 if self._queue[0][1] or self._head_in_flight else 0
+            if index >= len(self._queue):
+                return False
+            entry = self._queue[index]
+            del self._queue[index]
+            self._pending_bytes -= len(entry[0])
+            self._metrics.record_dropped(len(entry[2]))
+            _complete(entry[2])
+            return True
+
+        if self._policy == COALESCE:
+            if self._pending_bytes > self._max_pending_bytes:
+                return False
+            first = self._queue.popleft()
+            data = bytes(first[0][first[1]:]) + b''.join(
+                entry[0] for entry in self._queue)
+            deliveries = first[2]
+            for entry in self._queue:
+                deliveries.extend(entry[2])
+            self._queue.clear()
+            self._queue.append([data, 0, deliveries])
+            self._pending_bytes = len(data)
+            return True
+
+        return False
+
+    def _close_locked(self, deliveries):
+        if self.closed:
+            _complete(deliveries)
+            return
+        self.closed = True
+        self._metrics.record_disconnect()
+        for entry in self._queue:
+            deliveries.extend(entry[2])
+        self._metrics.record_dropped(len(deliveries))
+        _complete(deliveries)
+        self._queue.clear()
+        self._pending_bytes = 0
+        self._on_close()
+
+    def _written_locked(self, count):
+        """
+        记录已写出count字节，完成队头消息的投递
+        """
+        while count and self._queue:
+            entry = self._queue[0]
+            step = min(count, len(entry[0]) - entry[1])
+            entry[1] += step
+            count -= step
+            self._pending_bytes -= step
+            if entry[1] == len(entry[0]):
+                self._queue.popleft()
+                self._metrics.record_delivered(len(entry[2]))
+                _complete(entry[2])
+
+    def _on_enqueue(self):
+        """
+        子类在这里安排写出
+        """
+
+    def _on_close(self):
+        """
+        子类在这里关闭底层连接，调用方已持有锁
+        """
+
+
+def _complete(deliveries):
+    for delivery in deliveries:
+        delivery.done()
+
+
+class SocketSession(ClientSession):
+    """
+    线程模式下的会话：广播线程先尝试非阻塞写，写不完的交给Flusher
+    """
+
+    def __init__(self, sock, address, metrics, flusher, **kwargs):
+        super().__init__(address, metrics, **kwargs)
+        self.sock = sock
+        self._flusher = flusher
+
+    def flush(self):
+        """
+        不阻塞地写出尽可能多的数据
+
+        Returns:
+            bool: 队列已写空返回True
+        """
+        with self._lock:
+            while self._queue and not self.closed:
+                data, offset, _ = self._queue[0]
+                try:
+                    sent = self.sock.send(
+                        memoryview(data)[offset:], _MSG_DONTWAIT)
+                except (BlockingIOError, InterruptedError):
+                    return False
+                except OSError:
+                    self._close_locked([])
+                    return True
+                self._written_locked(sent)
+            return True
+
+    def _on_enqueue(self):
+        if not self.flush():
+            self._flusher.watch(self)
+
+    def _on_close(self):
+        try:
+            # 唤醒阻塞在recv中的读线程，由它负责清理
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class Flusher:
+    """
+    用一个线程和selectors等待可写事件，替所有慢客户端写出积压数据
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def watch(self, session):
+        """
+        登记一个有积压数据的会话，可写时继续写出
+        """
+        with self._lock:
+            self._pending.add(session)
+        try:
+            self._wakeup_w.send(b'\0')
+        except BlockingIOError:
+            pass
+
+    def forget(self, session):
+        """
+        移除会话的可写登记，必须在关闭套接字之前调用
+
+        套接字关闭后epoll自动丢弃该fd且不再报告事件，残留的登记永远不会被清理，
+        之后复用同一fd编号的新连接也无法登记。
+        """
+        with self._lock:
+            self._pending.discard(session)
+            self._unregister_locked(session)
+
+    def _unregister_locked(self, session):
+        try:
+            key = self._selector.get_key(session.sock)
+        except (KeyError, ValueError):
+            return
+        # fd可能已被新连接复用，只移除本会话自己的登记
+        if key.data is session:
+            self._selector.unregister(session.sock)
+
+    def _run(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.fileobj is self._wakeup_r:
+                    try:
+                        self._wakeup_r.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                session = key.data
+                if session.flush() or session.closed:
+                    with self._lock:
+                        self._unregister_locked(session)
+
+            # 登记与forget()都持有锁，forget()之后已关闭的会话不会再被登记
+            with self._lock:
+                sessions, self._pending = self._pending, set()
+                for session in sessions:
+                    if not session.closed:
+                        self._register_locked(session)
+
+    def _register_locked(self, session):
+        try:
+            self._selector.register(
+                session.sock, selectors.EVENT_WRITE, session)
+        except KeyError:
+            # 同一会话表示已在等待可写；否则是复用了该fd的旧连接没有forget()，
+            # 它的登记已经失效，换成新会话
+            if self._selector.get_key(session.sock).data is not session:
+                self._selector.unregister(session.sock)
+                self._selector.register(
+                    session.sock, selectors.EVENT_WRITE, session)
+        except (ValueError, OSError):
+            # 套接字已关闭
+            pass
+
+
+class StreamSession(ClientSession):
+    """
+    asyncio模式下的会话：每个连接一个写协程从队列取数据写出
+    """
+
+    def __init__(self, writer, address, metrics, **kwargs):
+        super().__init__(address, metrics, **kwargs)
+        self.writer = writer
+        self._ready = asyncio.Event()
+
+    async def write_loop(self):
+        """
+        持续写出队列中的数据，直到会话关闭
+        """
+        while not self.closed:
+            await self._ready.wait()
+            self._ready.clear()
+            while True:
+                with self._lock:
+                    if self.closed or not self._queue:
+                        break
+                    data, offset, _ = self._queue[0]
+                    chunk = memoryview(data)[offset:]
+                    # drain期间队头不能被drop_oldest丢弃
+                    self._head_in_flight = True
+                self.writer.write(chunk)
+                try:
+                    await self.writer.drain()
+                except (ConnectionError, OSError):
+                    self.close()
+                    return
+                with self._lock:
+                    # 期间可能被coalesce合并，合并后的队头仍以这段字节开头，
+                    # 只确认实际写出的字节
+                    self._head_in_flight = False
+                    self._written_locked(len(chunk))
+
+    def _on_enqueue(self):
+        self._ready.set()
+
+    def _on_close(self):
+        self._ready.set()
+        self.writer.close()
+
+
+class Room:
+    """
+    聊天室：把一条消息扇出给室内除发送者外的所有会话，
+    并在环形缓冲区中保留最近的消息帧
+    """
+
+    def __init__(self, name, metrics, history_size=HISTORY_SIZE):
+        self.name = name
+        self._metrics = metrics
+        self._sessions = set()
+        self._recent = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def join(self, session, greeting=None, replay=False):
+        """
+        加入聊天室，可选先发送提示再重放最近的消息
+
+        加入与读取最近的消息在同一把锁内完成：之前的广播只出现在重放中，
+        之后的广播排在重放之后，不会重复也不会乱序。
+
+        Args:
+            session: 客户端会话
+            greeting: 加入后最先发送的已编码帧，None表示不发送
+            replay: 是否重放环形缓冲区中最近的消息
+        """
+        with self._lock:
+            self._sessions.add(session)
+            session.room = self
+            if greeting is not None:
+                session.enqueue(greeting)
+            if replay:
+                for frame in self._recent:
+                    session.enqueue(frame)
+
+    def leave(self, session):
+        with self._lock:
+            self._sessions.discard(session)
+
+    def size(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def recent_frames(self):
+        """
+        获取最近消息的已编码帧，按时间从早到晚排列
+        """
+        with self._lock:
+            return list(self._recent)
+
+    def preload(self, messages):
+        """
+        用已有的消息填充环形缓冲区，放在已缓存的消息之前
+
+        Args:
+            messages: 消息字符串序列，按时间从早到晚排列
+        """
+        frames = [encode_frame(message) for message in messages]
+        with self._lock:
+            self._recent.extendleft(reversed(frames))
+
+    def broadcast(self, message, sender=None, received_at=None):
+        """
+        编码一次，放入每个接收方的发送队列
+
+        Args:
+            message: 消息字符串
+            sender: 发送方会话，不会收到自己的消息
+            received_at: 服务器收到消息的perf_counter时间，None表示现在
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        frame = encode_frame(message)
+        with self._lock:
+            self._recent.append(frame)
+            targets = [s for s in self._sessions if s is not sender]
+        if not targets:
+            return
+        delivery = Delivery(received_at, len(targets), self._metrics)
+        for session in targets:
+            session.enqueue(frame, delivery)
+
+
+class Hub:
+    """
+    所有聊天室与共享指标
+    """
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        """
+        Args:
+            history_size: 每个聊天室在内存中保留的最近消息数
+        """
+        self.metrics = FanoutMetrics()
+        self.history_size = history_size
+        # 聊天室首次创建时调用 loader(name, limit) 取得持久化的最近消息
+        self.loader = None
+        self._rooms = {}
+        # 正在预热的聊天室：{名称: 预热结束时置位的threading.Event}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """
+        获取已创建的聊天室，不会创建也不会读取磁盘
+
+        Returns:
+            Room: 聊天室，尚未创建时返回None
+        """
+        with self._lock:
+            return self._rooms.get(name)
+
+    def room(self, name):
+        """
+        获取聊天室，不存在时创建
+
+        loader在锁外调用，读取磁盘时不阻塞其他聊天室；同名聊天室的并发请求
+        等待同一次预热。预热成功后聊天室才对外可见，loader抛出异常时不缓存，
+        异常传给调用方，下次获取时重新预热。
+
+        Raises:
+            Exception: loader抛出的异常
+        """
+        while True:
+            with self._lock:
+                room = self._rooms.get(name)
+                if room is not None:
+                    return room
+                if self.loader is None or not self.history_size:
+                    room = self._rooms[name] = Room(
+                        name, self.metrics, self.history_size)
+                    return room
+                loading = self._loading.get(name)
+                if loading is None:
+                    loading = self._loading[name] = threading.Event()
+                    break
+            # 其他线程正在预热，结束后重新查找，失败时由本线程重试
+            loading.wait()
+
+        try:
+            room = Room(name, self.metrics, self.history_size)
+            room.preload(self.loader(name, self.history_size))
+            with self._lock:
+                self._rooms[name] = room
+        finally:
+            with self._lock:
+                del self._loading[name]
+            loading.set()
+        return room
+
+    async def room_async(self, name):
+        """
+        asyncio模式下获取聊天室，需要预热时在线程池中调用loader，不阻塞事件循环
+        """
+        room = self.get(name)
+        if room is not None:
+            return room
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.room, name)
+
+    def move(self, session, name, **options):
+        """
+        把会话移到指定聊天室，options传给Room.join
+        """
+        if session.room is not None:
+            session.room.leave(session)
+        self.room(name).join(session, **options)
+
+    def leave(self, session):
+        if session.room is not None:
+            session.room.leave(session)
+            session.room = None
@@ -0,0 +1,116 @@
+import asyncio
+import socket
+import time
+
+from broadcast import DROP_OLDEST, Delivery, FanoutMetrics, StreamSession
+from protocol import FrameDecoder, encode_frame
+
+# 总线消息中聊天室名与消息正文的分隔符
+SEPARATOR = '\0'
+# 每个对端进程最多积压的总线消息数
+MAX_PEER_QUEUE = 4096
+
+
+def create_mesh(workers):
+    """
+    为N个工作进程两两创建一对Unix套接字，组成全连接总线
+
+    Args:
+        workers: 工作进程数量
+
+    Returns:
+        list: 第i项为第i个工作进程持有的套接字列表，连接其余每个进程
+    """
+    ends = [[] for _ in range(workers)]
+    for i in range(workers):
+        for j in range(i + 1, workers):
+            left, right = socket.socketpair()
+            ends[i].append(left)
+            ends[j].append(right)
+    return ends
+
+
+class WorkerBus:
+    """
+    工作进程之间的广播总线
+
+    每条本地广播编码为一帧（聊天室名 + 分隔符 + 消息）写给其他所有进程；
+    收到的帧交给回调，在本进程的聊天室内再扇出一次。
+    总线只转发一跳，不会形成回环。
+
+    每个对端与客户端一样有独立的有界发送队列（StreamSession），
+    某个进程停滞时按慢消费者策略处理它的积压，不会让其他进程无限缓冲；
+    写出、丢弃的消息数和写给所有对端的耗时记在metrics中。
+    """
+
+    def __init__(self, peers, max_queue=MAX_PEER_QUEUE, policy=DROP_OLDEST):
+        """
+        Args:
+            peers: create_mesh为本进程分配的套接字列表
+            max_queue: 每个对端最多积压的消息数
+            policy: 对端积压超过上限时的策略，取值见broadcast.POLICIES
+        """
+        self._peers = peers
+        self._max_queue = max_queue
+        self._policy = policy
+        self._sessions = []
+        self._tasks = []
+        self.metrics = FanoutMetrics()
+        self.published = 0
+        self.received = 0
+
+    async def start(self, on_message):
+        """
+        在当前事件循环中开始收发
+
+        Args:
+            on_message: 回调 on_message(room, message)，收到其他进程的广播时调用
+        """
+        for index, sock in enumerate(self._peers):
+            reader, writer = await asyncio.open_connection(sock=sock)
+            session = StreamSession(
+                writer, f"peer{index}", self.metrics,
+                max_queue=self._max_queue, policy=self._policy)
+            self._sessions.append(session)
+            self._tasks.append(asyncio.create_task(session.write_loop()))
+            self._tasks.append(
+                asyncio.create_task(self._read_loop(reader, on_message)))
+
+    def publish(self, room, message):
+        """
+        把一条广播放入每个对端的发送队列，不等待写出
+
+        Args:
+            room: 聊天室名
+            message: 广播的消息字符串
+        """
+        if not self._sessions:
+            return
+        frame = encode_frame(room + SEPARATOR + message)
+        delivery = Delivery(time.perf_counter(), len(self._sessions), self.metrics)
+        for session in self._sessions:
+            session.enqueue(frame, delivery)
+        self.published += 1
+
+    def pending(self):
+        """
+        获取各对端尚未写出的消息数
+        """
+        return [session.pending() for session in self._sessions]
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        for session in self._sessions:
+            session.close()
+
+    async def _read_loop(self, reader, on_message):
+        decoder = FrameDecoder()
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            for frame in decoder.feed(data):
+                room, _, message = frame.partition(SEPARATOR)
+                self.received += 1
+                on_message(room, message)
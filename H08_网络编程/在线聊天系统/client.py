@@ -1,8 +1,25 @@
+import queue
 import socket
+import threading
+
+from protocol import PING, FrameDecoder, encode_frame, encode_frames
+
+HOST = 'localhost'
+PORT = 8000
+
+# 一次批量发送的最大消息数
+MAX_BATCH = 256
+# 断线重连的退避时间（秒）
+RECONNECT_DELAY = 0.1
+MAX_RECONNECT_DELAY = 2.0
+# 连接空闲多少秒后发送一次心跳，需小于服务器的空闲超时
+HEARTBEAT_INTERVAL = 15
+# 建立连接的超时时间（秒），避免对端不响应时一直卡在握手
+CONNECT_TIMEOUT = 5
 
 def send_message(message):
     """
-    向服务器发送消息的函数
+    向服务器发送消息的函数，每条消息单独建立一次连接
     
     Args:
         message: 要发送的消息字符串
@@ -12,10 +29,10 @@ def send_message(message):
     
     try:
         # 连接到服务器
-        client.connect(('localhost', 8000))
+        client.connect((HOST, PORT))
         
-        # 将消息编码为字节串并发送
-        client.sendall(message.encode('utf-8'))
+        # 将消息编码为长度前缀帧并发送
+        client.sendall(encode_frame(message))
         print(f"消息已发送: {message}")
         
     except Exception as e:
@@ -24,6 +41,208 @@ def send_message(message):
         # 关闭连接
         client.close()
 
+class ChatClient:
+    """
+    保持长连接的聊天客户端
+
+    特性：
+    1. 所有消息复用同一个TCP连接，不再为每条消息握手和进入TIME_WAIT
+    2. send()只把消息放入发送队列，后台线程把积压的消息合并成一批，
+       用一次sendall流水线式发出
+    3. 连接断开时按指数退避自动重连，并重发未确认发送成功的那一批消息。
+       sendall失败时无法知道服务器已经读到哪里，整批重发可能让部分消息
+       重复送达，即至少一次语义；close()之后不再重连，发送失败的批次被丢弃，
+       条数计入dropped
+    4. 连接空闲时定期发送心跳，避免被服务器当作空闲连接断开
+    5. 每个连接有一个接收线程，解码服务器广播的消息并交给on_message，
+       忽略服务器的心跳探测
+    """
+
+    def __init__(self, host=HOST, port=PORT, max_pending=10000, on_message=None):
+        """
+        初始化客户端并启动后台发送线程
+
+        Args:
+            host: 服务器地址
+            port: 服务器端口
+            max_pending: 发送队列最多积压的消息数，超过时send()阻塞
+            on_message: 收到消息时的回调，参数为消息字符串，默认打印到终端
+        """
+        self._address = (host, port)
+        self._on_message = on_message or self._print_message
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._socket = None
+        self._closed = threading.Event()
+        # close()后因发送失败而丢弃的消息数
+        self.dropped = 0
+        self._sender = threading.Thread(target=self._send_loop, daemon=True)
+        self._sender.start()
+
+    def send(self, message):
+        """
+        把消息放入发送队列
+
+        Args:
+            message: 要发送的消息字符串
+
+        Raises:
+            RuntimeError: 当客户端已关闭时抛出
+        """
+        if self._closed.is_set():
+            raise RuntimeError("客户端已关闭")
+        self._pending.put(message)
+
+    def flush(self, timeout=None):
+        """
+        阻塞直到队列中的所有消息都已发出
+
+        Args:
+            timeout: 最多等待的秒数，None表示一直等待
+
+        Returns:
+            bool: 全部发出返回True，超时返回False
+        """
+        done = self._pending.all_tasks_done
+        with done:
+            return done.wait_for(
+                lambda: not self._pending.unfinished_tasks, timeout)
+
+    def close(self, timeout=None):
+        """
+        发出剩余消息后关闭连接
+
+        关闭后发送失败不再重连，剩余的消息被丢弃，服务器不可达时也能很快返回。
+
+        Args:
+            timeout: 最多等待后台线程结束的秒数，None表示一直等待
+
+        Returns:
+            bool: 后台线程已结束返回True，超时返回False
+        """
+        if not self._closed.is_set():
+            self._closed.set()
+            self._pending.put(None)
+        self._sender.join(timeout)
+        return not self._sender.is_alive()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _send_loop(self):
+        """
+        后台发送线程：取出一批消息，合并编码后一次发出
+        """
+        while True:
+            try:
+                batch = [self._pending.get(timeout=HEARTBEAT_INTERVAL)]
+            except queue.Empty:
+                self._heartbeat()
+                continue
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is None
+            messages = [message for message in batch if message is not None]
+            if messages:
+                self._send_batch(encode_frames(messages), len(messages))
+            for _ in batch:
+                self._pending.task_done()
+
+            if stop:
+                self._disconnect()
+                return
+
+    def _send_batch(self, data, count):
+        """
+        发送一批帧，失败时重连后重发；客户端已关闭时不再重试，丢弃这一批
+
+        Args:
+            data: 编码后的帧
+            count: 这一批的消息数
+        """
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                if self._socket is None:
+                    self._socket = socket.create_connection(
+                        self._address, timeout=CONNECT_TIMEOUT)
+                    self._socket.settimeout(None)
+                    self._socket.setsockopt(
+                        socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    threading.Thread(target=self._receive_loop,
+                                     args=(self._socket,), daemon=True).start()
+                self._socket.sendall(data)
+                return
+            except OSError as e:
+                self._disconnect()
+                if self._closed.is_set():
+                    print(f"发送消息时发生错误: {e}，客户端已关闭，丢弃 {count} 条消息")
+                    self.dropped += count
+                    return
+                print(f"发送消息时发生错误: {e}，{delay:.1f} 秒后重连")
+                # close()会打断退避等待
+                self._closed.wait(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _heartbeat(self):
+        """
+        空闲时发送心跳；尚未连接时不需要
+        """
+        if self._socket is None:
+            return
+        try:
+            self._socket.sendall(encode_frame(PING))
+        except OSError:
+            self._disconnect()
+
+    def _receive_loop(self, sock):
+        """
+        接收线程：读取一个连接上的帧并交给on_message，连接关闭后退出
+
+        重连时会为新连接启动新的接收线程，解码器不跨连接复用。
+
+        Args:
+            sock: 要读取的套接字
+        """
+        decoder = FrameDecoder()
+        while True:
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            try:
+                messages = decoder.feed(data)
+            except ValueError as e:
+                print(f"收到无效的数据: {e}")
+                return
+            for message in messages:
+                if message != PING:
+                    self._on_message(message)
+
+    @staticmethod
+    def _print_message(message):
+        print(f"\n收到消息: {message}")
+
+    def _disconnect(self):
+        if self._socket is not None:
+            try:
+                # 先shutdown，唤醒阻塞在recv上的接收线程
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                self._socket.close()
+            finally:
+                self._socket = None
+
 def main():
     """
     主函数，处理用户输入并发送消息
@@ -31,17 +250,22 @@ def main():
     print("欢迎使用聊天客户端！")
     print("输入 'quit' 退出程序")
     
-    while True:
-        # 获取用户输入
-        message = input("请输入要发送的消息: ")
-        
-        # 检查是否退出
-        if message.lower() == 'quit':
-            print("正在退出程序...")
-            break
+    with ChatClient() as client:
+        while True:
+            # 获取用户输入
+            message = input("请输入要发送的消息: ")
             
-        # 发送消息
-        send_message(message)
+            # 检查是否退出
+            if message.lower() == 'quit':
+                print("正在退出程序...")
+                break
+                
+            # 通过长连接发送消息
+            client.send(message)
+            if client.flush(timeout=CONNECT_TIMEOUT):
+                print(f"消息已发送: {message}")
+            else:
+                print(f"服务器暂时不可达，消息将在重连后发送: {message}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
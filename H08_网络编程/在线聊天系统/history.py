@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import threading
+import time
+
+# 项目共用的SQLite数据库
+DATABASE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'sqlite',
+    'mySqlite.db')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+'''
+INDEX = '''
+CREATE INDEX IF NOT EXISTS idx_chat_messages_room_id
+    ON chat_messages (room, id)
+'''
+INSERT = '''
+INSERT INTO chat_messages (room, sender, content, created_at)
+VALUES (?, ?, ?, ?)
+'''
+
+
+class HistoryWriter:
+    """
+    聊天记录的后写式批量写入器
+
+    append()只把消息放入内存，后台线程每flush_interval秒或攒够batch_size条时
+    用一个事务executemany写入SQLite，收发消息的线程不会等待磁盘。
+    """
+
+    def __init__(self, database=DATABASE, batch_size=256, flush_interval=0.05,
+                 max_pending=100000):
+        """
+        初始化写入器，建表并启动后台写入线程
+
+        Args:
+            database: SQLite数据库文件路径
+            batch_size: 攒够多少条立即写入
+            flush_interval: 最长多少秒写入一次
+            max_pending: 内存中最多积压的条数，磁盘跟不上时丢弃超出的消息
+        """
+        self._database = database
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._pending = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._submitted = 0
+        self._written = 0
+        self._failed = 0
+        self._flush_target = 0
+        self.batches = 0
+        self.dropped = 0
+
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+            conn.execute(INDEX)
+        conn.close()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def append(self, room, sender, content):
+        """
+        记录一条消息，不会阻塞
+
+        Args:
+            room: 聊天室名
+            sender: 发送方
+            content: 消息内容
+
+        Raises:
+            RuntimeError: 当写入器已关闭时抛出
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("聊天记录写入器已关闭")
+            if len(self._pending) >= self._max_pending:
+                self.dropped += 1
+                return
+            self._pending.append((room, sender, content, time.time()))
+            self._submitted += 1
+            if len(self._pending) >= self._batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        立即写入积压的消息，并等待写入完成
+
+        Args:
+            timeout: 最长等待秒数，None表示一直等待
+
+        Returns:
+            bool: 在超时前全部写入返回True
+        """
+        with self._cond:
+            self._flush_target = self._submitted
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: self._written + self._failed >= self._flush_target,
+                timeout)
+
+    def close(self):
+        """
+        写入剩余消息后停止后台线程
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def load_recent(self, room, limit):
+        """
+        从数据库读取某个聊天室最近的消息，用于进程启动后预热内存缓冲区
+
+        Args:
+            room: 聊天室名
+            limit: 最多读取的条数
+
+        Returns:
+            list: [(sender, content), ...]，按时间从早到晚排列
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT sender, content FROM chat_messages WHERE room = ? '
+                'ORDER BY id DESC LIMIT ?', (room, limit)).fetchall()
+        finally:
+            conn.close()
+        return rows[::-1]
+
+    def _connect(self):
+        # prefork模式下多个进程写同一个文件，等待锁而不是立即失败
+        return sqlite3.connect(self._database, timeout=30)
+
+    def _ready(self):
+        return (self._closed
+                or len(self._pending) >= self._batch_size
+                or (self._pending
+                    and self._flush_target > self._written + self._failed))
+
+    def _run(self):
+        """
+        后台写入线程
+        """
+        conn = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(self._ready, self._flush_interval)
+                    batch, self._pending = self._pending, []
+                    closed = self._closed
+
+                if batch:
+                    try:
+                        with conn:
+                            conn.executemany(INSERT, batch)
+                    except sqlite3.Error as e:
+                        print(f"写入聊天记录失败，丢弃 {len(batch)} 条: {e}")
+                        with self._cond:
+                            self._failed += len(batch)
+                            self.dropped += len(batch)
+                    else:
+                        with self._cond:
+                            self._written += len(batch)
+                            self.batches += 1
+                    with self._cond:
+                        self._cond.notify_all()
+
+                if closed:
+                    return
+        finally:
+            conn.close()
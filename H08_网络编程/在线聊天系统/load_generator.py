@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from protocol import FrameDecoder, encode_frame
+from server import raise_nofile_limit
+
+# 消息正文中发送时间戳的前缀，接收方据此计算投递耗时
+STAMP = 't='
+
+
+class LoadStats:
+    """
+    压测过程中累计的统计数据
+    """
+
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.first_connect_at = None
+        self.last_connect_at = None
+        self.sent = 0
+        self.received = 0
+        self.latencies = []
+
+    def connection_rate(self):
+        """
+        建连阶段每秒建立的连接数
+        """
+        if not self.connected or self.last_connect_at == self.first_connect_at:
+            return 0.0
+        return self.connected / (self.last_connect_at - self.first_connect_at)
+
+    def percentile(self, fraction):
+        """
+        投递耗时的分位数（毫秒）
+        """
+        if not self.latencies:
+            return 0.0
+        samples = sorted(self.latencies)
+        return samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000
+
+
+def make_payload(size):
+    """
+    生成带发送时间戳的消息，用x补齐到size字节
+
+    Args:
+        size: 消息字节数，不足以容纳时间戳时以时间戳长度为准
+
+    Returns:
+        str: 消息字符串
+    """
+    head = f"{STAMP}{time.perf_counter():.9f} "
+    return head + 'x' * max(size - len(head), 0)
+
+
+def parse_latency(message, now):
+    """
+    从收到的广播中取出发送时间戳
+
+    Returns:
+        float: 投递耗时（秒），不是压测消息时返回None
+    """
+    index = message.find(STAMP)
+    if index < 0:
+        return None
+    end = message.find(' ', index)
+    try:
+        return now - float(message[index + len(STAMP):end])
+    except ValueError:
+        return None
+
+
+async def read_loop(reader, stats, start_sending):
+    """
+    接收广播并记录投递耗时
+
+    发送阶段开始前收到的帧（如加入聊天室时重放的历史消息）不计入统计，
+    其中旧的时间戳会让投递耗时严重偏大。
+    """
+    decoder = FrameDecoder()
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            return
+        now = time.perf_counter()
+        messages = decoder.feed(data)
+        if not start_sending.is_set():
+            continue
+        for message in messages:
+            latency = parse_latency(message, now)
+            if latency is not None:
+                stats.received += 1
+                stats.latencies.append(latency)
+
+
+async def run_client(index, args, stats, start_sending, stop_sending):
+    """
+    单个模拟客户端：建连、加入聊天室、按速率发送消息
+
+    Args:
+        index: 客户端序号，决定所在聊天室
+        args: 命令行参数
+        stats: 共享的LoadStats
+        start_sending: 全部连接建立后置位的asyncio.Event
+        stop_sending: 压测时间结束后置位的asyncio.Event
+    """
+    try:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    except OSError:
+        stats.failed += 1
+        return
+    now = time.perf_counter()
+    stats.connected += 1
+    if stats.first_connect_at is None:
+        stats.first_connect_at = now
+    stats.last_connect_at = now
+
+    writer.write(encode_frame(f"/join room{index % args.rooms}"))
+    reader_task = asyncio.create_task(read_loop(reader, stats, start_sending))
+    try:
+        await start_sending.wait()
+        if args.rate > 0:
+            interval = 1 / args.rate
+            # 随机错开首条消息，避免所有客户端同时发送
+            await asyncio.sleep(random.random() * interval)
+            while not stop_sending.is_set():
+                writer.write(encode_frame(make_payload(args.size)))
+                stats.sent += 1
+                await writer.drain()
+                await asyncio.sleep(interval)
+        # 等待在途消息送达
+        await asyncio.sleep(args.grace)
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        reader_task.cancel()
+        writer.close()
+
+
+async def run_load(args):
+    """
+    按设定的建连速率启动全部客户端，稳定发送args.duration秒
+
+    Returns:
+        tuple: (LoadStats, 稳定发送阶段的实际秒数)
+    """
+    stats = LoadStats()
+    start_sending = asyncio.Event()
+    stop_sending = asyncio.Event()
+
+    tasks = []
+    ramp_start = time.perf_counter()
+    for i in range(args.clients):
+        # 按建连速率排期，而不是每个连接都sleep一次
+        delay = ramp_start + i / args.ramp - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(
+            run_client(i, args, stats, start_sending, stop_sending)))
+
+    # 等待所有连接完成（成功或失败）后再开始计时
+    while stats.connected + stats.failed < args.clients:
+        await asyncio.sleep(0.01)
+
+    steady_start = time.perf_counter()
+    start_sending.set()
+    await asyncio.sleep(args.duration)
+    stop_sending.set()
+    elapsed = time.perf_counter() - steady_start
+    await asyncio.gather(*tasks)
+    return stats, elapsed
+
+
+def process_rss(pid):
+    """
+    读取进程及其所有子进程的常驻内存（Linux）
+
+    Args:
+        pid: 进程ID
+
+    Returns:
+        int: 字节数，无法读取时返回0
+    """
+    pids = {pid}
+    try:
+        # prefork模式的内存分布在各工作进程中
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == pid:
+                pids.add(int(entry))
+    except OSError:
+        return 0
+
+    total = 0
+    for child in pids:
+        try:
+            with open(f'/proc/{child}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+def spawn_server(mode, port, workers=None):
+    """
+    以子进程方式启动server.py，输出重定向到空设备，避免打印拖慢服务器
+
+    Returns:
+        subprocess.Popen: 服务器进程
+    """
+    # 关闭聊天记录，避免写库拖慢服务器，也避免重放上一轮压测的消息
+    command = [sys.executable, 'server.py', '--mode', mode, '--port', str(port),
+               '--history-db', '']
+    if workers:
+        command += ['--workers', str(workers)]
+    process = subprocess.Popen(
+        command, cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # 等待端口可连接
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(_probe(port))
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"服务器未能在端口 {port} 上启动")
+
+
+async def _probe(port):
+    _, writer = await asyncio.open_connection('localhost', port)
+    writer.close()
+
+
+def report(stats, elapsed, rss):
+    """
+    打印压测结果
+    """
+    print(f"连接: 成功 {stats.connected}, 失败 {stats.failed}, "
+          f"{stats.connection_rate():,.0f} conn/s")
+    print(f"发送: {stats.sent:,} 条, {stats.sent / elapsed:,.0f} msg/s")
+    print(f"投递: {stats.received:,} 条, {stats.received / elapsed:,.0f} msg/s")
+    print(f"投递耗时: p50 {stats.percentile(0.50):.2f} ms, "
+          f"p99 {stats.percentile(0.99):.2f} ms, "
+          f"p999 {stats.percentile(0.999):.2f} ms")
+    if rss:
+        print(f"服务器RSS: {rss / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    """
+    解析命令行参数，对已运行的服务器或新启动的服务器进行压测
+    """
+    parser = argparse.ArgumentParser(description="聊天服务器压测工具")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument(
+        '--spawn', choices=['threaded', 'pool', 'async', 'prefork'],
+        help="以指定模式启动一个服务器再压测，不指定则压测已运行的服务器")
+    parser.add_argument(
+        '--workers', type=int, help="--spawn prefork时的工作进程数量")
+    parser.add_argument(
+        '--server-pid', type=int, help="已运行服务器的进程ID，用于读取RSS")
+    parser.add_argument('--clients', type=int, default=1000, help="并发客户端数")
+    parser.add_argument(
+        '--ramp', type=float, default=500, help="每秒新建的连接数")
+    parser.add_argument(
+        '--rooms', type=int, default=100, help="客户端平均分布的聊天室数")
+    parser.add_argument('--size', type=int, default=64, help="消息字节数")
+    parser.add_argument(
+        '--rate', type=float, default=1, help="每个客户端每秒发送的消息数")
+    parser.add_argument(
+        '--duration', type=float, default=10, help="稳定发送阶段的秒数")
+    parser.add_argument(
+        '--grace', type=float, default=1, help="停止发送后等待在途消息的秒数")
+    args = parser.parse_args()
+
+    raise_nofile_limit()
+    process = None
+    pid = args.server_pid
+    if args.spawn:
+        process = spawn_server(args.spawn, args.port, args.workers)
+        pid = process.pid
+
+    try:
+        print(f"=== 压测: {args.clients} 客户端, {args.rooms} 个聊天室, "
+              f"{args.rate} msg/s/客户端, {args.size} 字节 ===")
+        stats, elapsed = asyncio.run(run_load(args))
+        report(stats, elapsed, process_rss(pid) if pid else 0)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
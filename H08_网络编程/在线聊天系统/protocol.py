@@ -0,0 +1,288 @@
+import struct
+from collections import deque
+
+# 帧头：4字节大端无符号整数，表示消息体字节数
+HEADER = struct.Struct('!I')
+HEADER_SIZE = HEADER.size
+
+# 单帧消息体的最大字节数，超过视为协议错误
+MAX_FRAME_SIZE = 1024 * 1024
+
+# 心跳消息：客户端空闲时发给服务器，服务器探测空闲连接时发给客户端，不会被广播
+PING = '/ping'
+
+
+def encode_frame(message):
+    """
+    把消息编码为一帧：帧头 + UTF-8消息体
+
+    Args:
+        message: 消息字符串
+
+    Returns:
+        bytes: 编码后的帧
+
+    Raises:
+        ValueError: 当消息体超过MAX_FRAME_SIZE时抛出
+    """
+    payload = message.encode('utf-8')
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"消息长度 {len(payload)} 超过上限 {MAX_FRAME_SIZE}")
+    return HEADER.pack(len(payload)) + payload
+
+
+def encode_frames(messages):
+    """
+    把多条消息编码为连续的帧，便于一次sendall批量发送
+
+    Args:
+        messages: 消息字符串序列
+
+    Returns:
+        bytes: 拼接后的帧
+    """
+    return b''.join(encode_frame(message) for message in messages)
+
+
+class FrameDecoder:
+    """
+    增量帧解码器
+
+    每次feed一段收到的字节，返回其中所有完整的消息；
+    不完整的帧（包括被截断的帧头和被截断的多字节UTF-8字符）留在缓冲区，
+    等下一段数据到达后继续解析。
+    """
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        """
+        初始化解码器
+
+        Args:
+            max_frame_size: 单帧消息体的最大字节数
+        """
+        self._buffer = bytearray()
+        self._max_frame_size = max_frame_size
+
+    def feed(self, data):
+        """
+        送入一段字节并解析出完整消息
+
+        Args:
+            data: 收到的字节，bytes、bytearray或memoryview
+
+        Returns:
+            list: 解析出的消息字符串，可能为空
+
+        Raises:
+            ValueError: 当帧长度超过上限时抛出
+        """
+        buffer = self._buffer
+        buffer += data
+
+        messages = []
+        offset = 0
+        while len(buffer) - offset >= HEADER_SIZE:
+            (length,) = HEADER.unpack_from(buffer, offset)
+            if length > self._max_frame_size:
+                raise ValueError(
+                    f"帧长度 {length} 超过上限 {self._max_frame_size}")
+            end = offset + HEADER_SIZE + length
+            if end > len(buffer):
+                break
+            messages.append(str(buffer[offset + HEADER_SIZE:end], 'utf-8'))
+            offset = end
+
+        # 丢弃已解析的部分，保留不完整的帧
+        if offset:
+            del buffer[:offset]
+        return messages
+
+    def pending(self):
+        """
+        获取缓冲区中尚未解析的字节数
+
+        Returns:
+            int: 字节数
+        """
+        return len(self._buffer)
+
+
+class BufferPool:
+    """
+    可复用的接收缓冲区池
+
+    连接建立时取出一个bytearray，断开时归还，避免每个连接反复分配大块内存。
+    """
+
+    def __init__(self, buffer_size=64 * 1024, max_buffers=1024):
+        """
+        初始化缓冲区池
+
+        Args:
+            buffer_size: 每个缓冲区的字节数
+            max_buffers: 池中最多保留的空闲缓冲区数量
+        """
+        self.buffer_size = buffer_size
+        self._max_buffers = max_buffers
+        self._free = deque()
+
+    def acquire(self):
+        """
+        取出一个缓冲区，池为空时新建
+
+        Returns:
+            bytearray: 长度为buffer_size的缓冲区
+        """
+        try:
+            return self._free.pop()
+        except IndexError:
+            return bytearray(self.buffer_size)
+
+    def release(self, buffer):
+        """
+        归还缓冲区，为超长帧扩容过的缓冲区直接丢弃
+
+        Args:
+            buffer: acquire取出的缓冲区
+        """
+        if len(buffer) == self.buffer_size and len(self._free) < self._max_buffers:
+            self._free.append(buffer)
+
+    def free_count(self):
+        """
+        获取池中空闲缓冲区的数量
+        """
+        return len(self._free)
+
+
+class FrameReceiver:
+    """
+    基于recv_into的零拷贝帧接收器
+
+    数据由内核直接写入池化的bytearray，帧头和消息体通过memoryview切片读取，
+    只有完整的帧才会被解码为字符串；不完整的帧留在缓冲区中，
+    缓冲区写满时把它移到开头，单帧比缓冲区还大时才扩容。
+    """
+
+    def __init__(self, pool=None, max_frame_size=MAX_FRAME_SIZE):
+        """
+        初始化接收器
+
+        Args:
+            pool: 缓冲区池，None表示不复用缓冲区
+            max_frame_size: 单帧消息体的最大字节数
+        """
+        self._pool = pool
+        self._max_frame_size = max_frame_size
+        self._buffer = pool.acquire() if pool else bytearray(64 * 1024)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+    def recv(self, sock):
+        """
+        从套接字接收一次数据并解析出完整消息
+
+        Args:
+            sock: 已连接的套接字
+
+        Returns:
+            list: 解析出的消息字符串，可能为空；对端关闭连接时返回None
+
+        Raises:
+            ValueError: 当帧长度超过上限时抛出
+        """
+        count = sock.recv_into(self.writable())
+        if not count:
+            return None
+        return self.commit(count)
+
+    def writable(self):
+        """
+        获取可供写入的缓冲区空间，必要时先整理或扩容
+
+        Returns:
+            memoryview: 缓冲区尾部的空闲部分
+        """
+        if self._buffer is None:
+            self._buffer = self._pool.acquire()
+            self._view = memoryview(self._buffer)
+        if self._end == len(self._buffer):
+            size = self._end - self._start
+            if self._start:
+                # 源与目标可能重叠，先复制出来；只在缓冲区写满时发生
+                self._buffer[:size] = bytes(self._view[self._start:self._end])
+            else:
+                # 单帧比缓冲区还大，扩容一倍
+                buffer = bytearray(len(self._buffer) * 2)
+                buffer[:size] = self._view[:size]
+                self._view.release()
+                if self._pool:
+                    self._pool.release(self._buffer)
+                self._buffer = buffer
+                self._view = memoryview(buffer)
+            self._start = 0
+            self._end = size
+        return self._view[self._end:]
+
+    def commit(self, count):
+        """
+        记录已写入count字节并解析出完整消息
+
+        Args:
+            count: 写入writable()返回空间的字节数
+
+        Returns:
+            list: 解析出的消息字符串，可能为空
+
+        Raises:
+            ValueError: 当帧长度超过上限时抛出
+        """
+        self._end += count
+        view = self._view
+        messages = []
+        offset = self._start
+        while self._end - offset >= HEADER_SIZE:
+            (length,) = HEADER.unpack_from(view, offset)
+            if length > self._max_frame_size:
+                raise ValueError(
+                    f"帧长度 {length} 超过上限 {self._max_frame_size}")
+            end = offset + HEADER_SIZE + length
+            if end > self._end:
+                break
+            messages.append(str(view[offset + HEADER_SIZE:end], 'utf-8'))
+            offset = end
+
+        if offset == self._end:
+            # 缓冲区已全部解析，下次从头写入
+            self._start = self._end = 0
+        else:
+            self._start = offset
+        return messages
+
+    def pending(self):
+        """
+        获取缓冲区中尚未解析的字节数
+        """
+        return self._end - self._start
+
+    def release_idle(self):
+        """
+        缓冲区中没有未解析的数据时先把它归还到池中，下次接收时再取出，
+        使空闲连接不占用缓冲区
+        """
+        if self._pool and self._buffer is not None and self._start == self._end:
+            self._view.release()
+            self._pool.release(self._buffer)
+            self._buffer = None
+
+    def close(self):
+        """
+        把缓冲区归还到池中，之后不能再使用该接收器
+        """
+        if self._buffer is None:
+            return
+        self._view.release()
+        if self._pool:
+            self._pool.release(self._buffer)
+        self._buffer = None
@@ -1,5 +1,235 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import queue
+import selectors
 import socket
+import sqlite3
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from broadcast import (DEFAULT_ROOM, DROP_OLDEST, POLICIES, Flusher, Hub,
+                       SocketSession, StreamSession)
+from bus import WorkerBus, create_mesh
+from history import DATABASE, HistoryWriter
+from protocol import (PING, BufferPool, FrameDecoder, FrameReceiver,
+                      encode_frame)
+from timer_wheel import TimerWheel
+
+HOST = 'localhost'
+PORT = 8000
+
+# 每个客户端发送队列的容量与慢消费者策略，可由命令行修改
+SEND_QUEUE_SIZE = 256
+SLOW_CONSUMER_POLICY = DROP_OLDEST
+
+# 连接空闲HEARTBEAT_INTERVAL秒后发送心跳探测，空闲IDLE_TIMEOUT秒后断开
+HEARTBEAT_INTERVAL = 20
+IDLE_TIMEOUT = 60
+
+# 线程池模式：处理消息的线程数、最多同时保持的连接数、内核等待accept的队列长度
+POOL_SIZE = 16
+MAX_CONNECTIONS = 10000
+ACCEPT_BACKLOG = 1024
+# 连接数已满时发给新连接的提示
+BUSY_MESSAGE = "服务器繁忙，请稍后重试"
+
+# 聊天记录数据库，为空字符串时不保存聊天记录；命令行默认使用项目数据库
+HISTORY_DB = ''
+
+# 所有聊天室与扇出指标，各模式共用
+hub = Hub()
+# 线程模式下各连接共用的接收缓冲区池
+receive_pool = BufferPool()
+# 线程模式下替慢客户端写出积压数据的线程，首次使用时创建
+_flusher = None
+# 所有连接的空闲定时器共用一个时间轮
+timer_wheel = TimerWheel()
+# prefork模式下本工作进程连接其他工作进程的总线，其他模式为None
+bus = None
+# 聊天记录写入器，由open_history创建
+history = None
+
+def session_options():
+    """
+    获取创建会话时使用的发送队列参数
+    """
+    return {'max_queue': SEND_QUEUE_SIZE, 'policy': SLOW_CONSUMER_POLICY}
+
+def watch_idle(session):
+    """
+    为新连接登记空闲检查
+    """
+    session.last_active = time.monotonic()
+    session.idle_timer = timer_wheel.schedule(
+        HEARTBEAT_INTERVAL, check_idle, session)
+
+def check_idle(session):
+    """
+    空闲定时器到期时调用：超时则断开，空闲较久则发送心跳，否则顺延
+
+    收到数据时只更新last_active，不重新登记定时器，
+    定时器到期后再按最近一次活动时间决定下一次检查的时间。
+    """
+    if session.closed:
+        return
+    idle = time.monotonic() - session.last_active
+    if idle >= IDLE_TIMEOUT:
+        print(f"客户端 {session.address} 空闲 {idle:.1f} 秒，断开连接")
+        session.close()
+        return
+    if idle >= HEARTBEAT_INTERVAL:
+        # 对端已消失的半开连接在写入时会收到RST，读线程随之退出
+        session.enqueue(encode_frame(PING))
+        delay = min(HEARTBEAT_INTERVAL, IDLE_TIMEOUT - idle)
+    else:
+        delay = HEARTBEAT_INTERVAL - idle
+    session.idle_timer = timer_wheel.schedule(delay, check_idle, session)
+
+def unwatch_idle(session):
+    timer_wheel.cancel(session.idle_timer)
+    session.idle_timer = None
+
+def open_history(database):
+    """
+    创建聊天记录写入器，并让新建的聊天室从数据库预热最近的消息
+
+    Args:
+        database: SQLite数据库文件路径
+    """
+    global history
+    history = HistoryWriter(database)
+    hub.loader = load_history
+
+def load_history(room, limit):
+    """
+    读取聊天室最近的消息，格式与广播一致
+
+    读取失败时明确放弃预热，聊天室不带历史消息照常使用。
+    """
+    try:
+        rows = history.load_recent(room, limit)
+    except sqlite3.Error as e:
+        print(f"读取聊天记录失败: {e}")
+        return []
+    return [f"{sender}: {content}" for sender, content in rows]
+
+def close_history():
+    """
+    写入剩余的聊天记录
+    """
+    if history is not None:
+        history.close()
+
+def join_room(session, name, notify=False):
+    """
+    把会话移到聊天室，并重放该聊天室最近的消息
+
+    最近的消息来自聊天室在内存中的环形缓冲区，不需要读取磁盘。
+
+    Args:
+        session: 客户端会话
+        name: 聊天室名
+        notify: 是否先发送加入成功的提示
+    """
+    greeting = encode_frame(f"已加入聊天室 {name}") if notify else None
+    hub.move(session, name, greeting=greeting, replay=True)
+
+def join_target(message):
+    """
+    解析/join命令
+
+    Returns:
+        str: 要加入的聊天室名，不是/join命令时返回None
+    """
+    if not message.startswith('/join '):
+        return None
+    return message[len('/join '):].strip() or DEFAULT_ROOM
+
+def handle_message(message, session, received_at=None):
+    """
+    处理一条客户端消息，线程模式和asyncio模式共用
+
+    支持的命令：/join <聊天室> 切换聊天室；/stats 查看扇出指标；
+    /ping 心跳，只刷新空闲时间。
+    其他消息广播给同一聊天室的其他客户端。
+
+    Args:
+        message: 解码后的消息字符串
+        session: 发送方会话
+        received_at: 收到消息的perf_counter时间，用于统计扇出耗时
+    """
+    if message == PING:
+        return
+    room = join_target(message)
+    if room is not None:
+        join_room(session, room, notify=True)
+        return
+    if message == '/stats':
+        session.enqueue(encode_frame(str(hub.metrics.snapshot())))
+        return
+
+    print(f"来自 {session.address} 的消息: {message}")
+    text = f"{session.address}: {message}"
+    session.room.broadcast(text, session, received_at)
+    if history is not None:
+        history.append(session.room.name, str(session.address), message)
+    if bus is not None:
+        # 连接在其他工作进程上的客户端由对方进程扇出
+        bus.publish(session.room.name, text)
+
+def open_client_session(client_socket, client_address):
+    """
+    为新连接创建会话、加入默认聊天室并登记空闲检查，
+    线程模式和线程池模式共用
+
+    Returns:
+        tuple: (SocketSession, FrameReceiver)
+    """
+    global _flusher
+    print(f"客户端 {client_address} 已连接")
+    if _flusher is None:
+        _flusher = Flusher()
+    session = SocketSession(
+        client_socket, client_address, hub.metrics, _flusher,
+        **session_options())
+    join_room(session, DEFAULT_ROOM)
+    watch_idle(session)
+    return session, FrameReceiver(receive_pool)
+
+def receive_messages(session, receiver):
+    """
+    接收一次数据并逐条处理其中的完整消息
+
+    Returns:
+        bool: 连接仍然打开返回True，对端关闭返回False
+    """
+    # 数据直接写入池化缓冲区，只解码完整的帧
+    messages = receiver.recv(session.sock)
+    if messages is None:
+        return False
+    received_at = time.perf_counter()
+    session.last_active = time.monotonic()
+
+    # 一次recv可能包含半帧或多帧，逐条处理
+    for message in messages:
+        handle_message(message, session, received_at)
+    return True
+
+def close_client_session(session, receiver):
+    """
+    离开聊天室、归还缓冲区并关闭客户端连接
+    """
+    unwatch_idle(session)
+    hub.leave(session)
+    session.close()
+    receiver.close()
+    # 先移除Flusher中的登记，关闭后fd可能立即被新连接复用
+    _flusher.forget(session)
+    session.sock.close()
+    print(f"客户端 {session.address} 已断开连接")
 
 def handle_client(client_socket, client_address):
     """
@@ -9,25 +239,16 @@ def handle_client(client_socket, client_address):
         client_socket: 客户端套接字对象
         client_address: 客户端地址信息
     """
-    print(f"客户端 {client_address} 已连接")
+    session, receiver = open_client_session(client_socket, client_address)
     
     try:
-        while True:
-            # 接收客户端消息
-            data = client_socket.recv(1024)
-            if not data:
-                break
-                
-            # 解码并打印消息
-            message = data.decode('utf-8')
-            print(f"来自 {client_address} 的消息: {message}")
+        while receive_messages(session, receiver):
+            pass
             
     except Exception as e:
         print(f"处理客户端 {client_address} 时发生错误: {e}")
     finally:
-        # 关闭客户端连接
-        client_socket.close()
-        print(f"客户端 {client_address} 已断开连接")
+        close_client_session(session, receiver)
 
 def start_server():
     """
@@ -37,11 +258,12 @@ def start_server():
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     
     # 绑定地址和端口
-    server.bind(('localhost', 8000))
+    server.bind((HOST, PORT))
     
     # 开始监听
     server.listen(5)
-    print("服务器已启动，正在监听端口 8000...")
+    print(f"服务器已启动，正在监听端口 {PORT}...")
+    timer_wheel.start()
     
     try:
         while True:
@@ -59,6 +281,407 @@ def start_server():
         print("\n服务器正在关闭...")
     finally:
         server.close()
+        print(f"扇出指标: {hub.metrics.snapshot()}")
+
+class PoolDispatcher:
+    """
+    线程池模式的调度器
+
+    一个线程用selectors（Linux上为epoll）等待所有连接，
+    连接可读时把它交给固定大小的线程池，由工作线程执行与线程模式相同的
+    阻塞式处理代码；处理完一次后再交回调度线程继续等待。
+    线程数固定，连接数由准入控制限制，内存占用不再随连接数无限增长。
+    """
+
+    def __init__(self, server_socket, pool_size=POOL_SIZE,
+                 max_connections=MAX_CONNECTIONS):
+        """
+        Args:
+            server_socket: 已开始监听的服务器套接字
+            pool_size: 工作线程数量
+            max_connections: 最多同时保持的连接数，超过时拒绝新连接
+        """
+        self._server = server_socket
+        self._server.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix='chat-worker')
+        self._max_connections = max_connections
+        self.connections = 0
+        self.rejected = 0
+        # 工作线程处理完的连接，由调度线程重新登记或计为已关闭
+        self._finished = queue.SimpleQueue()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+
+    def serve_forever(self):
+        """
+        在当前线程运行调度循环
+        """
+        self._selector.register(self._server, selectors.EVENT_READ, 'accept')
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, 'wakeup')
+        try:
+            while True:
+                for key, _ in self._selector.select():
+                    if key.data == 'accept':
+                        self._accept()
+                    elif key.data == 'wakeup':
+                        self._rearm()
+                    else:
+                        # 处理期间不再监听，避免同一连接被两个线程同时读取
+                        self._selector.unregister(key.fileobj)
+                        self._executor.submit(self._serve, key.data)
+        finally:
+            self._executor.shutdown(wait=False)
+            self._selector.close()
+
+    def _accept(self):
+        # 一次最多接受一批，避免连接风暴时饿死已有连接
+        for _ in range(64):
+            try:
+                client_socket, client_address = self._server.accept()
+            except BlockingIOError:
+                return
+            if self.connections >= self._max_connections:
+                # 准入控制：告知客户端后立即关闭，不占用会话和缓冲区
+                self.rejected += 1
+                try:
+                    client_socket.send(encode_frame(BUSY_MESSAGE))
+                except OSError:
+                    pass
+                client_socket.close()
+                continue
+            client_socket.setblocking(False)
+            self.connections += 1
+            connection = open_client_session(client_socket, client_address)
+            connection[1].release_idle()
+            self._selector.register(
+                client_socket, selectors.EVENT_READ, connection)
+
+    def _serve(self, connection):
+        """
+        在工作线程中处理一次可读事件
+        """
+        session, receiver = connection
+        try:
+            alive = receive_messages(session, receiver)
+        except BlockingIOError:
+            # 可读通知已被消费，继续等待
+            alive = True
+        except Exception as e:
+            print(f"处理客户端 {session.address} 时发生错误: {e}")
+            alive = False
+        if alive:
+            # 空闲连接不占用接收缓冲区，内存随工作线程数而不是连接数增长
+            receiver.release_idle()
+        else:
+            close_client_session(session, receiver)
+        self._finished.put((connection, alive))
+        try:
+            self._wakeup_w.send(b'\0')
+        except BlockingIOError:
+            pass
+
+    def _rearm(self):
+        try:
+            self._wakeup_r.recv(4096)
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                connection, alive = self._finished.get_nowait()
+            except queue.Empty:
+                return
+            if alive:
+                self._selector.register(
+                    connection[0].sock, selectors.EVENT_READ, connection)
+            else:
+                self.connections -= 1
+
+def start_pool_server(pool_size=POOL_SIZE, max_connections=MAX_CONNECTIONS):
+    """
+    启动线程池模式的服务器
+
+    Args:
+        pool_size: 工作线程数量
+        max_connections: 最多同时保持的连接数
+    """
+    raise_nofile_limit()
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind((HOST, PORT))
+    server.listen(ACCEPT_BACKLOG)
+    print(f"服务器已启动(线程池模式，{pool_size} 个工作线程，"
+          f"最多 {max_connections} 个连接)，正在监听端口 {PORT}...")
+    timer_wheel.start()
+    dispatcher = PoolDispatcher(server, pool_size, max_connections)
+
+    try:
+        dispatcher.serve_forever()
+    except KeyboardInterrupt:
+        print("\n服务器正在关闭...")
+    finally:
+        server.close()
+        print(f"拒绝连接: {dispatcher.rejected}, "
+              f"扇出指标: {hub.metrics.snapshot()}")
+
+async def handle_client_async(reader, writer):
+    """
+    asyncio模式下处理单个客户端连接的协程
+
+    Args:
+        reader: asyncio.StreamReader
+        writer: asyncio.StreamWriter
+    """
+    client_address = writer.get_extra_info('peername')
+    print(f"客户端 {client_address} 已连接")
+    decoder = FrameDecoder()
+    session = StreamSession(
+        writer, client_address, hub.metrics, **session_options())
+    # 聊天室需要从数据库预热时在线程池中读取，join_room随后直接取到已预热的聊天室
+    await hub.room_async(DEFAULT_ROOM)
+    join_room(session, DEFAULT_ROOM)
+    watch_idle(session)
+    # 写协程独立运行，慢客户端只会积压自己的发送队列
+    write_task = asyncio.create_task(session.write_loop())
+
+    try:
+        while True:
+            # 接收客户端数据
+            data = await reader.read(4096)
+            if not data:
+                break
+            received_at = time.perf_counter()
+            session.last_active = time.monotonic()
+
+            # 一次read可能包含半帧或多帧，按帧解码后逐条处理
+            for message in decoder.feed(data):
+                room = join_target(message)
+                if room is not None:
+                    await hub.room_async(room)
+                handle_message(message, session, received_at)
+
+    except Exception as e:
+        print(f"处理客户端 {client_address} 时发生错误: {e}")
+    finally:
+        # 离开聊天室并关闭客户端连接
+        unwatch_idle(session)
+        hub.leave(session)
+        session.close()
+        write_task.cancel()
+        writer.close()
+        print(f"客户端 {client_address} 已断开连接")
+
+def raise_nofile_limit():
+    """
+    把进程可打开的文件描述符软限制提高到硬限制，
+    asyncio模式下每个连接占用一个描述符
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows没有resource模块
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+async def serve_async():
+    """
+    asyncio模式的服务器主协程，所有连接共用一个事件循环线程
+    """
+    raise_nofile_limit()
+    # 保留任务引用，避免被垃圾回收
+    reaper = asyncio.create_task(timer_wheel.run_async())
+    server = await asyncio.start_server(
+        handle_client_async, HOST, PORT, backlog=1024)
+    print(f"服务器已启动(asyncio模式)，正在监听端口 {PORT}...")
+    async with server:
+        await server.serve_forever()
+
+def start_async_server():
+    """
+    启动asyncio模式的服务器
+    """
+    try:
+        asyncio.run(serve_async())
+    except KeyboardInterrupt:
+        print("\n服务器正在关闭...")
+    finally:
+        print(f"扇出指标: {hub.metrics.snapshot()}")
+
+def deliver_from_bus(room, message):
+    """
+    在本进程的聊天室内扇出其他工作进程转发来的广播
+    """
+    if hub.loader is None:
+        hub.room(room).broadcast(message)
+        return
+    # 不在事件循环中读取磁盘：本进程还没有该聊天室时也没有本地客户端需要扇出，
+    # 之后创建时会从聊天记录预热
+    local = hub.get(room)
+    if local is not None:
+        local.broadcast(message)
+
+async def serve_worker(index, peers):
+    """
+    prefork模式下单个工作进程的主协程
+
+    各工作进程用SO_REUSEPORT各自绑定同一端口，由内核把新连接分摊到各进程；
+    进程内部与asyncio模式相同，广播另经总线发给其他进程。
+
+    Args:
+        index: 工作进程序号
+        peers: 连接其他工作进程的套接字列表
+    """
+    global bus
+    raise_nofile_limit()
+    bus = WorkerBus(peers)
+    await bus.start(deliver_from_bus)
+    # 保留任务引用，避免被垃圾回收
+    reaper = asyncio.create_task(timer_wheel.run_async())
+    server = await asyncio.start_server(
+        handle_client_async, HOST, PORT, backlog=1024, reuse_port=True)
+    print(f"工作进程 {index} (pid {os.getpid()}) 正在监听端口 {PORT}...")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        bus.close()
+
+def run_worker(index, mesh):
+    """
+    工作进程入口
+    """
+    # 只保留自己的总线套接字，其余是fork继承来的
+    for i, peers in enumerate(mesh):
+        if i != index:
+            for sock in peers:
+                sock.close()
+    # 各工作进程各自连接数据库，SQLite连接不能跨fork使用
+    if HISTORY_DB:
+        open_history(HISTORY_DB)
+    try:
+        asyncio.run(serve_worker(index, mesh[index]))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_history()
+        print(f"工作进程 {index} 扇出指标: {hub.metrics.snapshot()}")
+
+def spawn_workers(workers):
+    """
+    创建总线并启动N个工作进程
+
+    Args:
+        workers: 工作进程数量
+
+    Returns:
+        list: 已启动的multiprocessing.Process
+
+    Raises:
+        RuntimeError: 当平台不支持SO_REUSEPORT时抛出
+    """
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise RuntimeError("当前平台不支持SO_REUSEPORT，无法使用prefork模式")
+    mesh = create_mesh(workers)
+    # 总线套接字靠fork继承，不能用spawn方式启动
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=run_worker, args=(i, mesh), daemon=True)
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for peers in mesh:
+        for sock in peers:
+            sock.close()
+    return processes
+
+def start_prefork_server(workers=None):
+    """
+    启动prefork模式的服务器，默认每个CPU核心一个工作进程
+
+    Args:
+        workers: 工作进程数量，None表示os.cpu_count()
+    """
+    workers = workers or os.cpu_count() or 1
+    processes = spawn_workers(workers)
+    print(f"服务器已启动(prefork模式)，{workers} 个工作进程")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("\n服务器正在关闭...")
+        # 终端的Ctrl+C也会送达各工作进程，这里等待它们退出
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+def main():
+    """
+    解析命令行参数，选择线程模式或asyncio模式启动服务器
+    """
+    global PORT, SEND_QUEUE_SIZE, SLOW_CONSUMER_POLICY
+    global HEARTBEAT_INTERVAL, IDLE_TIMEOUT, HISTORY_DB
+    parser = argparse.ArgumentParser(description="在线聊天服务器")
+    parser.add_argument(
+        '--mode', choices=['threaded', 'pool', 'async', 'prefork'],
+        default='threaded',
+        help="threaded: 每个连接一个线程; pool: selectors加固定线程池; "
+             "async: 单线程事件循环; prefork: 多个asyncio工作进程共享端口")
+    parser.add_argument(
+        '--port', type=int, default=PORT, help="监听端口")
+    parser.add_argument(
+        '--pool-size', type=int, default=POOL_SIZE,
+        help="pool模式的工作线程数量")
+    parser.add_argument(
+        '--max-connections', type=int, default=MAX_CONNECTIONS,
+        help="pool模式最多同时保持的连接数，超过时拒绝新连接")
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help="prefork模式的工作进程数量，默认等于CPU核心数")
+    parser.add_argument(
+        '--policy', choices=POLICIES, default=SLOW_CONSUMER_POLICY,
+        help="发送队列满时的处理方式: 丢弃最早消息/断开客户端/合并积压写入")
+    parser.add_argument(
+        '--send-queue', type=int, default=SEND_QUEUE_SIZE,
+        help="每个客户端发送队列最多积压的消息数")
+    parser.add_argument(
+        '--heartbeat', type=float, default=HEARTBEAT_INTERVAL,
+        help="连接空闲多少秒后发送心跳探测")
+    parser.add_argument(
+        '--idle-timeout', type=float, default=IDLE_TIMEOUT,
+        help="连接空闲多少秒后断开")
+    parser.add_argument(
+        '--history-db', default=DATABASE,
+        help="保存聊天记录的SQLite数据库，传入空字符串则不保存")
+    args = parser.parse_args()
+
+    PORT = args.port
+    SEND_QUEUE_SIZE = args.send_queue
+    SLOW_CONSUMER_POLICY = args.policy
+    HEARTBEAT_INTERVAL = args.heartbeat
+    IDLE_TIMEOUT = args.idle_timeout
+    HISTORY_DB = args.history_db
+
+    if args.mode == 'prefork':
+        # 由各工作进程在fork之后自行打开聊天记录
+        start_prefork_server(args.workers)
+        return
+
+    if HISTORY_DB:
+        open_history(HISTORY_DB)
+    try:
+        if args.mode == 'async':
+            start_async_server()
+        elif args.mode == 'pool':
+            start_pool_server(args.pool_size, args.max_connections)
+        else:
+            start_server()
+    finally:
+        close_history()
 
 if __name__ == "__main__":
-    start_server() 
\ No newline at end of file
+    main() 
\ No newline at end of file
@@ -0,0 +1,347 @@
+from broadcast import (COALESCE, DISCONNECT, DROP_OLDEST, ClientSession,
+                       FanoutMetrics, Flusher, Hub, Room, SocketSession,
+                       StreamSession)
+from protocol import FrameDecoder, encode_frame, encode_frames
+import asyncio
+import socket
+import threading
+import time
+
+import server
+
+
+def test_drop_oldest() -> None:
+    """
+    测试队列满时丢弃最早的消息
+    """
+    print("=== 测试丢弃最早消息 ===")
+    metrics = FanoutMetrics()
+    # 基类不写出数据，相当于一个完全不读的客户端
+    session = ClientSession('slow', metrics, max_queue=3, policy=DROP_OLDEST)
+    for i in range(5):
+        session.enqueue(encode_frame(f"消息{i}"))
+
+    data = b''.join(entry[0] for entry in session._queue)
+    print(f"积压: {session.pending()}, 丢弃: {metrics.dropped}")
+    assert FrameDecoder().feed(data) == ["消息2", "消息3", "消息4"]
+    assert not session.closed
+
+
+def test_disconnect() -> None:
+    """
+    测试队列满时断开慢客户端
+    """
+    print("\n=== 测试断开慢客户端 ===")
+    metrics = FanoutMetrics()
+    session = ClientSession('slow', metrics, max_queue=2, policy=DISCONNECT)
+    for i in range(3):
+        session.enqueue(encode_frame(f"消息{i}"))
+
+    assert session.closed
+    assert session.pending() == 0
+    assert metrics.disconnects == 1
+
+
+def test_coalesce() -> None:
+    """
+    测试队列满时把积压合并为一次写入，不丢消息
+    """
+    print("\n=== 测试合并积压 ===")
+    metrics = FanoutMetrics()
+    session = ClientSession('slow', metrics, max_queue=4, policy=COALESCE)
+    messages = [f"消息{i}" for i in range(10)]
+    for message in messages:
+        session.enqueue(encode_frame(message))
+
+    data = b''.join(entry[0] for entry in session._queue)
+    print(f"积压条目: {session.pending()}")
+    assert session.pending() <= 4
+    assert data == encode_frames(messages)
+    assert metrics.dropped == 0
+
+
+def test_slow_consumer_does_not_stall_room() -> None:
+    """
+    测试一个不读数据的客户端不会拖慢其他客户端
+    """
+    print("\n=== 测试慢客户端隔离 ===")
+    metrics = FanoutMetrics()
+    flusher = Flusher()
+    room = Room('lobby', metrics)
+
+    fast_server, fast_client = socket.socketpair()
+    slow_server, slow_client = socket.socketpair()
+    count = 2000
+    # 快客户端的队列能容纳全部消息，只验证它不被慢客户端拖住
+    fast = SocketSession(
+        fast_server, 'fast', metrics, flusher, max_queue=count)
+    slow = SocketSession(slow_server, 'slow', metrics, flusher, max_queue=64)
+    room.join(fast)
+    room.join(slow)
+
+    received = []
+
+    def reader() -> None:
+        decoder = FrameDecoder()
+        while len(received) < count:
+            received.extend(decoder.feed(fast_client.recv(65536)))
+
+    reader_thread = threading.Thread(target=reader, daemon=True)
+    reader_thread.start()
+
+    start = time.perf_counter()
+    for i in range(count):
+        room.broadcast(f"{i:04d}" + "x" * 1000)
+    elapsed = time.perf_counter() - start
+    reader_thread.join(timeout=10)
+
+    print(f"广播耗时: {elapsed * 1000:.1f} ms, 快客户端收到: {len(received)}, "
+          f"慢客户端积压: {slow.pending()}, 丢弃: {metrics.dropped}")
+    assert len(received) == count
+    assert received[-1].startswith(f"{count - 1:04d}")
+    assert slow.pending() <= 64
+    assert metrics.dropped > 0
+    assert metrics.snapshot()['messages'] > 0
+
+    for sock in (fast_server, fast_client, slow_server, slow_client):
+        sock.close()
+
+
+def backlog(session, count=2000) -> None:
+    """
+    向不读数据的客户端写入count条消息，写满套接字缓冲区后交给Flusher
+    """
+    for i in range(count):
+        session.enqueue(encode_frame(f"{i:04d}" + "x" * 1000))
+    assert session.pending() > 0
+
+
+def wait_registered(flusher, session) -> None:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            if flusher._selector.get_key(session.sock).data is session:
+                return
+        except KeyError:
+            pass
+        time.sleep(0.01)
+    raise AssertionError("会话没有登记到Flusher")
+
+
+def test_flusher_fd_reuse() -> None:
+    """
+    测试有积压的客户端断开后，复用同一fd的新慢客户端仍会被Flusher写出
+    """
+    print("\n=== 测试断开后fd被复用 ===")
+    metrics = FanoutMetrics()
+    flusher = Flusher()
+
+    # forget()表示按服务器的顺序关闭；不forget()时由登记时替换失效的登记
+    for forget in (True, False):
+        old_server, old_client = socket.socketpair()
+        old = SocketSession(old_server, 'old', metrics, flusher, max_queue=2000)
+        backlog(old)
+        wait_registered(flusher, old)
+        fd = old_server.fileno()
+
+        old.close()
+        if forget:
+            flusher.forget(old)
+        old_server.close()
+        old_client.close()
+
+        new_server, new_client = socket.socketpair()
+        assert new_server.fileno() == fd
+        new = SocketSession(new_server, 'new', metrics, flusher, max_queue=2000)
+        backlog(new)
+
+        decoder = FrameDecoder()
+        received = []
+        new_client.settimeout(5)
+        try:
+            while len(received) < 2000:
+                received.extend(decoder.feed(new_client.recv(65536)))
+        except socket.timeout:
+            pass
+        print(f"forget={forget}: 新客户端收到 {len(received)} 条")
+        assert len(received) == 2000
+        assert new.pending() == 0
+
+        new.close()
+        flusher.forget(new)
+        new_server.close()
+        new_client.close()
+        # 只剩下唤醒用的套接字
+        assert len(flusher._selector.get_map()) == 1
+
+
+def test_hub_preload_outside_lock() -> None:
+    """
+    测试预热读取磁盘时不阻塞其他聊天室，并发获取只预热一次，失败时不缓存
+    """
+    print("\n=== 测试聊天室预热 ===")
+    hub = Hub()
+    gate = threading.Event()
+    calls = []
+
+    def loader(name: str, limit: int) -> list:
+        calls.append(name)
+        if name == 'slow':
+            gate.wait()
+        if name == 'broken' and calls.count('broken') == 1:
+            raise OSError("磁盘错误")
+        return [f"{name}的历史"]
+
+    hub.loader = loader
+    rooms = []
+    threads = [threading.Thread(target=lambda: rooms.append(hub.room('slow')))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+
+    # 慢聊天室预热期间，其他聊天室照常创建，慢聊天室尚不可见
+    start = time.perf_counter()
+    assert hub.room('fast').name == 'fast'
+    assert time.perf_counter() - start < 0.05
+    assert hub.get('slow') is None
+
+    gate.set()
+    for t in threads:
+        t.join(timeout=5)
+    assert len(rooms) == 3 and all(room is rooms[0] for room in rooms)
+    assert calls.count('slow') == 1
+    assert FrameDecoder().feed(b''.join(rooms[0].recent_frames())) == ["slow的历史"]
+
+    # 预热失败时异常传给调用方，聊天室不缓存，下次获取时重试
+    try:
+        hub.room('broken')
+    except OSError as e:
+        print(f"捕获到异常: {e}")
+    else:
+        raise AssertionError("预热失败时应当抛出异常")
+    assert hub.get('broken') is None
+    room = hub.room('broken')
+    assert FrameDecoder().feed(b''.join(room.recent_frames())) == ["broken的历史"]
+    print(f"loader调用: {calls}")
+
+
+class StalledWriter:
+    """
+    drain()一直阻塞到gate打开的假StreamWriter，写入的数据记录在data中
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.gate = asyncio.Event()
+
+    def write(self, chunk) -> None:
+        self.data += chunk
+
+    async def drain(self) -> None:
+        await self.gate.wait()
+
+    def close(self) -> None:
+        pass
+
+
+def test_drop_oldest_keeps_in_flight_frame() -> None:
+    """
+    测试drain阻塞期间drop_oldest不会丢弃正在写出的队头，帧边界保持完整
+    """
+    print("\n=== 测试drain期间丢弃最早的消息 ===")
+
+    async def run() -> bytes:
+        writer = StalledWriter()
+        session = StreamSession(writer, 'slow', FanoutMetrics(),
+                                max_queue=2, policy=DROP_OLDEST)
+        task = asyncio.create_task(session.write_loop())
+        session.enqueue(encode_frame("A" * 10))
+        await asyncio.sleep(0.01)
+        # 队头已交给writer.write，drain阻塞中
+        for message in ("B" * 300, "C" * 20, "D" * 5):
+            session.enqueue(encode_frame(message))
+        writer.gate.set()
+        await asyncio.sleep(0.01)
+        session.close()
+        await task
+        return bytes(writer.data)
+
+    messages = FrameDecoder().feed(asyncio.run(run()))
+    print(f"客户端收到: {[m[:1] + str(len(m)) for m in messages]}")
+    # 队列最多2条，B、C依次被丢弃，正在写出的A保留
+    assert messages == ["A" * 10, "D" * 5]
+
+
+def test_join_during_broadcast() -> None:
+    """
+    测试广播期间加入聊天室，每条消息恰好收到一次且按顺序
+    """
+    print("\n=== 测试广播期间加入 ===")
+    count = 2000
+    room = Room('race', FanoutMetrics(), history_size=count)
+    sessions = []
+
+    def broadcaster() -> None:
+        for i in range(count):
+            room.broadcast(str(i))
+
+    thread = threading.Thread(target=broadcaster)
+    thread.start()
+    while thread.is_alive():
+        session = ClientSession('late', FanoutMetrics(), max_queue=count + 1)
+        room.join(session, greeting=encode_frame("hi"), replay=True)
+        sessions.append(session)
+    thread.join()
+
+    print(f"广播期间加入了 {len(sessions)} 个会话")
+    for session in sessions:
+        frames = b''.join(entry[0] for entry in session._queue)
+        messages = FrameDecoder().feed(frames)
+        assert messages[0] == "hi"
+        assert messages[1:] == [str(i) for i in range(count)]
+
+
+def test_async_room_broadcast() -> None:
+    """
+    测试asyncio模式下消息广播给同一聊天室的其他客户端
+    """
+    print("\n=== 测试asyncio模式广播 ===")
+
+    async def run() -> list:
+        listener = await asyncio.start_server(
+            server.handle_client_async, 'localhost', 0)
+        port = listener.sockets[0].getsockname()[1]
+
+        reader_a, writer_a = await asyncio.open_connection('localhost', port)
+        reader_b, writer_b = await asyncio.open_connection('localhost', port)
+        await asyncio.sleep(0.05)
+
+        writer_a.write(encode_frames(["你好", "/stats"]))
+        decoder = FrameDecoder()
+        messages = []
+        while not messages:
+            data = await asyncio.wait_for(reader_b.read(4096), 2)
+            messages.extend(decoder.feed(data))
+
+        for writer in (writer_a, writer_b):
+            writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return messages
+
+    messages = asyncio.run(run())
+    print(f"收到: {messages}")
+    assert messages[0].endswith(": 你好")
+
+
+if __name__ == "__main__":
+    test_drop_oldest()
+    # test_disconnect()
+    # test_coalesce()
+    # test_slow_consumer_does_not_stall_room()
+    # test_flusher_fd_reuse()
+    # test_hub_preload_outside_lock()
+    # test_drop_oldest_keeps_in_flight_frame()
+    # test_join_during_broadcast()
+    # test_async_room_broadcast()
@@ -0,0 +1,118 @@
+from broadcast import Hub
+from bus import WorkerBus, create_mesh
+from protocol import FrameDecoder, encode_frame
+import asyncio
+import socket
+import time
+
+import server
+
+
+def test_mesh_publish() -> None:
+    """
+    测试一条广播经总线到达其他所有工作进程，且不会回到发送方
+    """
+    print("=== 测试总线转发 ===")
+
+    async def run() -> list:
+        mesh = create_mesh(3)
+        received = [[] for _ in range(3)]
+        buses = [WorkerBus(peers) for peers in mesh]
+        for i, bus in enumerate(buses):
+            await bus.start(
+                lambda room, message, i=i: received[i].append((room, message)))
+
+        buses[0].publish('lobby', "来自0号进程")
+        buses[2].publish('game', "from 2")
+        await asyncio.sleep(0.1)
+        for bus in buses:
+            bus.close()
+        return received
+
+    received = asyncio.run(run())
+    print(f"各进程收到: {received}")
+    assert received[0] == [('game', "from 2")]
+    # 不同进程的广播经各自的写协程发出，到达顺序不固定
+    assert sorted(received[1]) == [('game', "from 2"), ('lobby', "来自0号进程")]
+    assert received[2] == [('lobby', "来自0号进程")]
+
+
+def test_stalled_peer_is_bounded() -> None:
+    """
+    测试某个工作进程停止读取时，发往它的积压有上限，多余的消息被丢弃
+    """
+    print("\n=== 测试停滞的工作进程 ===")
+
+    async def run() -> tuple:
+        mesh = create_mesh(2)
+        bus = WorkerBus(mesh[0], max_queue=16)
+        await bus.start(lambda room, message: None)
+        # mesh[1]的一端始终不读，相当于卡住的工作进程
+        for i in range(2000):
+            bus.publish('lobby', f"{i:04d}" + "x" * 10000)
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+        await asyncio.sleep(0.1)
+        buffered = bus._sessions[0].writer.transport.get_write_buffer_size()
+        result = (bus.pending()[0], buffered, bus.metrics.dropped)
+        bus.close()
+        for sock in mesh[1]:
+            sock.close()
+        return result
+
+    pending, buffered, dropped = asyncio.run(run())
+    print(f"积压: {pending} 条, 写缓冲: {buffered} 字节, 丢弃: {dropped} 条")
+    assert pending <= 16
+    # 传输层只缓冲正在写出的一帧和高水位以内的数据，而不是全部2000条
+    assert buffered <= 256 * 1024
+    assert dropped > 0
+
+
+def test_prefork_broadcast() -> None:
+    """
+    测试prefork模式下广播到达连接在任意工作进程上的客户端
+    """
+    print("\n=== 测试prefork模式广播 ===")
+    probe = socket.socket()
+    probe.bind(('localhost', 0))
+    server.PORT = probe.getsockname()[1]
+    probe.close()
+
+    # 工作进程继承当前的聊天室集合，换成新的以免重放其他测试留下的消息
+    server.hub = Hub()
+    processes = server.spawn_workers(2)
+    try:
+        clients = []
+        deadline = time.monotonic() + 5
+        while len(clients) < 8:
+            try:
+                clients.append(
+                    socket.create_connection(('localhost', server.PORT)))
+            except ConnectionRefusedError:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+        time.sleep(0.2)
+
+        clients[0].sendall(encode_frame("大家好"))
+        for sock in clients[1:]:
+            sock.settimeout(2)
+            decoder = FrameDecoder()
+            messages = []
+            while not messages:
+                messages.extend(decoder.feed(sock.recv(4096)))
+            assert messages[0].endswith(": 大家好")
+        print(f"{len(clients) - 1} 个客户端都收到了广播")
+
+        for sock in clients:
+            sock.close()
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+        server.PORT = 8000
+
+
+if __name__ == "__main__":
+    test_mesh_publish()
+    # test_stalled_peer_is_bounded()
+    # test_prefork_broadcast()
@@ -0,0 +1,68 @@
+from client import ChatClient
+from protocol import PING, FrameDecoder, encode_frames
+import socket
+import threading
+import time
+
+
+def test_send_and_receive() -> None:
+    """
+    测试消息经长连接发出，收到的广播交给on_message，心跳被忽略
+    """
+    print("=== 测试收发消息 ===")
+    listener = socket.create_server(('localhost', 0))
+    port = listener.getsockname()[1]
+    sent = []
+
+    def serve() -> None:
+        conn, _ = listener.accept()
+        decoder = FrameDecoder()
+        while len(sent) < 3:
+            sent.extend(decoder.feed(conn.recv(65536)))
+        conn.sendall(encode_frames(["你好", PING, "世界"]))
+        conn.recv(65536)
+        conn.close()
+
+    server_thread = threading.Thread(target=serve, daemon=True)
+    server_thread.start()
+    received = []
+    with ChatClient('localhost', port, on_message=received.append) as client:
+        for i in range(3):
+            client.send(f"消息{i}")
+        assert client.flush(timeout=5)
+        deadline = time.monotonic() + 5
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    server_thread.join(timeout=5)
+    listener.close()
+
+    print(f"服务器收到: {sent}, 客户端收到: {received}")
+    assert sent == ["消息0", "消息1", "消息2"]
+    assert received == ["你好", "世界"]
+
+
+def test_close_when_unreachable() -> None:
+    """
+    测试服务器不可达时flush超时返回，close()不再重连并丢弃剩余消息
+    """
+    print("\n=== 测试服务器不可达时关闭 ===")
+    # 绑定后立即关闭，得到一个没有监听的端口
+    probe = socket.socket()
+    probe.bind(('localhost', 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    client = ChatClient('localhost', port)
+    client.send("无人接收")
+    assert not client.flush(timeout=0.3)
+    start = time.monotonic()
+    assert client.close(timeout=5)
+    elapsed = time.monotonic() - start
+    print(f"关闭耗时: {elapsed:.2f} 秒, 丢弃: {client.dropped}")
+    assert elapsed < 1
+    assert client.dropped == 1
+
+
+if __name__ == "__main__":
+    test_send_and_receive()
+    # test_close_when_unreachable()
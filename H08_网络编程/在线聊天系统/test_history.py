@@ -0,0 +1,117 @@
+from broadcast import Hub
+from history import HistoryWriter
+from protocol import FrameDecoder, encode_frame
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+import server
+
+
+def test_batched_writes() -> None:
+    """
+    测试攒够一批立即写入，不足一批时按时间间隔写入
+    """
+    print("=== 测试批量写入 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'chat.db')
+        writer = HistoryWriter(database, batch_size=100, flush_interval=0.5)
+        for i in range(100):
+            writer.append('lobby', 'alice', f"消息{i}")
+        time.sleep(0.1)
+        assert writer.batches == 1
+
+        # 不足一批，等到时间间隔才写入
+        for i in range(10):
+            writer.append('lobby', 'alice', f"补充{i}")
+        time.sleep(0.1)
+        assert writer.batches == 1
+        time.sleep(0.6)
+        print(f"写入批次: {writer.batches}")
+        assert writer.batches == 2
+
+        writer.append('game', 'bob', "最后一条")
+        assert writer.flush(timeout=2)
+        writer.close()
+
+        conn = sqlite3.connect(database)
+        count = conn.execute('SELECT COUNT(*) FROM chat_messages').fetchone()[0]
+        conn.close()
+        assert count == 111
+
+
+def test_load_recent() -> None:
+    """
+    测试按聊天室读取最近的消息
+    """
+    print("\n=== 测试读取最近消息 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        writer = HistoryWriter(os.path.join(directory, 'chat.db'))
+        for i in range(10):
+            writer.append('lobby', 'alice', f"消息{i}")
+            writer.append('game', 'bob', f"game{i}")
+        writer.flush()
+        recent = writer.load_recent('lobby', 3)
+        writer.close()
+    print(f"最近3条: {recent}")
+    assert recent == [('alice', "消息7"), ('alice', "消息8"), ('alice', "消息9")]
+
+
+def test_replay_on_join() -> None:
+    """
+    测试新加入的客户端收到最近的消息，重启后从数据库预热
+    """
+    print("\n=== 测试加入时重放 ===")
+
+    async def chat(port: int, messages: list, expect: int) -> list:
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write(b''.join(encode_frame(m) for m in messages))
+        decoder = FrameDecoder()
+        received: list = []
+        while len(received) < expect:
+            data = await asyncio.wait_for(reader.read(4096), 2)
+            received.extend(decoder.feed(data))
+        writer.close()
+        return received
+
+    async def run() -> tuple:
+        listener = await asyncio.start_server(
+            server.handle_client_async, 'localhost', 0)
+        port = listener.sockets[0].getsockname()[1]
+        await chat(port, ["/join r", "一", "二", "三"], 1)
+        await asyncio.sleep(0.05)
+        replayed = await chat(port, ["/join r"], 3)
+        listener.close()
+        await listener.wait_closed()
+        return replayed
+
+    saved = server.hub, server.history
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, 'chat.db')
+            server.hub = Hub(history_size=2)
+            server.open_history(database)
+            replayed = asyncio.run(run())
+            server.close_history()
+
+            # 模拟重启：新的聊天室从数据库读取最近的消息
+            server.hub = Hub(history_size=2)
+            server.open_history(database)
+            frames = server.hub.room('r').recent_frames()
+            server.close_history()
+    finally:
+        server.hub, server.history = saved
+
+    print(f"加入后收到: {replayed}")
+    assert replayed[0] == "已加入聊天室 r"
+    assert [m.split(": ", 1)[1] for m in replayed[1:3]] == ["二", "三"]
+    assert [m.split(": ", 1)[1] for m in
+            FrameDecoder().feed(b''.join(frames))] == ["二", "三"]
+
+
+if __name__ == "__main__":
+    test_batched_writes()
+    # test_load_recent()
+    # test_replay_on_join()
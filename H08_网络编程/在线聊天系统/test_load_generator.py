@@ -0,0 +1,81 @@
+from load_generator import (LoadStats, make_payload, parse_latency, process_rss,
+                            read_loop, run_load)
+from protocol import encode_frame
+import argparse
+import asyncio
+import os
+import time
+
+import server
+
+
+def test_payload_roundtrip() -> None:
+    """
+    测试消息长度与时间戳解析
+    """
+    print("=== 测试压测消息 ===")
+    payload = make_payload(128)
+    assert len(payload) == 128
+    latency = parse_latency(f"('127.0.0.1', 1): {payload}", time.perf_counter())
+    print(f"解析出的耗时: {latency * 1000:.3f} ms")
+    assert 0 <= latency < 1
+    assert parse_latency("已加入聊天室 room1", time.perf_counter()) is None
+
+
+def test_run_load() -> None:
+    """
+    测试对进程内asyncio服务器的小规模压测
+    """
+    print("\n=== 测试小规模压测 ===")
+
+    async def run():
+        listener = await asyncio.start_server(
+            server.handle_client_async, 'localhost', 0)
+        args = argparse.Namespace(
+            host='localhost', port=listener.sockets[0].getsockname()[1],
+            clients=20, ramp=1000, rooms=2, size=64, rate=20,
+            duration=0.5, grace=0.3)
+        result = await run_load(args)
+        listener.close()
+        await listener.wait_closed()
+        return result
+
+    stats, elapsed = asyncio.run(run())
+    print(f"发送 {stats.sent} 条, 投递 {stats.received} 条, "
+          f"p99 {stats.percentile(0.99):.2f} ms")
+    assert stats.connected == 20 and stats.failed == 0
+    assert stats.sent > 0
+    # 每个聊天室10个客户端，每条消息投递给其他9个
+    assert stats.received == stats.sent * 9
+    assert process_rss(os.getpid()) > 0
+
+
+def test_ignore_replayed_messages() -> None:
+    """
+    测试发送阶段开始前收到的历史消息不计入投递统计
+    """
+    print("\n=== 测试忽略重放的历史消息 ===")
+
+    async def run():
+        stats = LoadStats()
+        start_sending = asyncio.Event()
+        reader = asyncio.StreamReader()
+        task = asyncio.create_task(read_loop(reader, stats, start_sending))
+        # 加入聊天室时重放的旧消息，时间戳早于发送阶段
+        reader.feed_data(encode_frame(make_payload(64)))
+        await asyncio.sleep(0.01)
+        start_sending.set()
+        reader.feed_data(encode_frame(make_payload(64)))
+        reader.feed_eof()
+        await task
+        return stats
+
+    stats = asyncio.run(run())
+    print(f"投递 {stats.received} 条")
+    assert stats.received == 1 and len(stats.latencies) == 1
+
+
+if __name__ == "__main__":
+    test_payload_roundtrip()
+    # test_run_load()
+    # test_ignore_replayed_messages()
@@ -0,0 +1,99 @@
+from broadcast import Hub
+from protocol import FrameDecoder, encode_frame
+import socket
+import threading
+import time
+
+import server
+
+
+def start_dispatcher(max_connections: int) -> tuple:
+    """
+    在后台线程启动线程池模式的调度器
+
+    Returns:
+        tuple: (调度器, 端口)
+    """
+    # 使用新的聊天室集合，避免重放其他测试留下的消息
+    server.hub = Hub()
+    listener = socket.socket()
+    listener.bind(('localhost', 0))
+    listener.listen(server.ACCEPT_BACKLOG)
+    dispatcher = server.PoolDispatcher(
+        listener, pool_size=2, max_connections=max_connections)
+    threading.Thread(target=dispatcher.serve_forever, daemon=True).start()
+    return dispatcher, listener.getsockname()[1]
+
+
+def read_messages(sock: socket.socket, count: int = 1) -> list:
+    """
+    从套接字读取至少count条消息
+    """
+    sock.settimeout(2)
+    decoder = FrameDecoder()
+    messages = []
+    while len(messages) < count:
+        data = sock.recv(4096)
+        if not data:
+            break
+        messages.extend(decoder.feed(data))
+    return messages
+
+
+def test_pool_broadcast() -> None:
+    """
+    测试2个工作线程服务多个连接，消息广播给聊天室内其他客户端
+    """
+    print("=== 测试线程池模式广播 ===")
+    dispatcher, port = start_dispatcher(max_connections=100)
+    clients = [socket.create_connection(('localhost', port)) for _ in range(10)]
+    for sock in clients:
+        sock.sendall(encode_frame("/join pool"))
+        assert read_messages(sock) == ["已加入聊天室 pool"]
+
+    clients[0].sendall(encode_frame("你好") + encode_frame("再见"))
+    for sock in clients[1:]:
+        messages = read_messages(sock, 2)
+        assert [m.split(": ", 1)[1] for m in messages] == ["你好", "再见"]
+    print(f"活动连接: {dispatcher.connections}, 工作线程: 2")
+    assert dispatcher.connections == 10
+
+    for sock in clients:
+        sock.close()
+    deadline = time.monotonic() + 2
+    while dispatcher.connections and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dispatcher.connections == 0
+
+
+def test_admission_control() -> None:
+    """
+    测试连接数已满时拒绝新连接，空出名额后恢复接受
+    """
+    print("\n=== 测试准入控制 ===")
+    dispatcher, port = start_dispatcher(max_connections=2)
+    first = socket.create_connection(('localhost', port))
+    second = socket.create_connection(('localhost', port))
+    rejected = socket.create_connection(('localhost', port))
+
+    messages = read_messages(rejected)
+    print(f"被拒绝的连接收到: {messages}")
+    assert messages == [server.BUSY_MESSAGE]
+    assert rejected.recv(1) == b''
+    assert dispatcher.rejected == 1
+
+    first.close()
+    deadline = time.monotonic() + 2
+    while dispatcher.connections > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    accepted = socket.create_connection(('localhost', port))
+    accepted.sendall(encode_frame("/join x"))
+    assert read_messages(accepted) == ["已加入聊天室 x"]
+
+    for sock in (second, rejected, accepted):
+        sock.close()
+
+
+if __name__ == "__main__":
+    test_pool_broadcast()
+    # test_admission_control()
@@ -0,0 +1,127 @@
+from protocol import (BufferPool, FrameDecoder, FrameReceiver, encode_frame,
+                      encode_frames, HEADER_SIZE)
+import socket
+
+
+def test_single_frame() -> None:
+    """
+    测试单帧编码与解码
+    """
+    print("=== 测试单帧 ===")
+    frame = encode_frame("你好")
+    assert len(frame) == HEADER_SIZE + len("你好".encode('utf-8'))
+    assert FrameDecoder().feed(frame) == ["你好"]
+
+
+def test_batched_frames() -> None:
+    """
+    测试一次读取包含多帧
+    """
+    print("\n=== 测试多帧合并 ===")
+    messages = ["a", "", "中文消息", "b" * 5000]
+    decoder = FrameDecoder()
+    assert decoder.feed(encode_frames(messages)) == messages
+    assert decoder.pending() == 0
+
+
+def test_partial_frames() -> None:
+    """
+    测试逐字节送入，帧头和多字节字符都可能被截断
+    """
+    print("\n=== 测试半帧 ===")
+    messages = ["第一条", "second", "第三条😀"]
+    data = encode_frames(messages)
+    decoder = FrameDecoder()
+    received = []
+    for i in range(len(data)):
+        received += decoder.feed(data[i:i + 1])
+    print(f"逐字节解码结果: {received}")
+    assert received == messages
+
+    # 一条半帧加一条完整帧
+    first = encode_frame("x" * 10)
+    decoder.feed(first[:7])
+    assert decoder.pending() == 7
+    assert decoder.feed(first[7:] + encode_frame("y")) == ["x" * 10, "y"]
+
+
+def test_oversized_frame() -> None:
+    """
+    测试超过上限的帧被拒绝
+    """
+    print("\n=== 测试超长帧 ===")
+    decoder = FrameDecoder(max_frame_size=4)
+    try:
+        decoder.feed(encode_frame("12345"))
+    except ValueError as e:
+        print(f"捕获到帧长度异常: {e}")
+    else:
+        raise AssertionError("应当拒绝超长帧")
+
+
+def test_receiver_partial_frames() -> None:
+    """
+    测试recv_into接收器在小缓冲区中处理半帧、整理和扩容
+    """
+    print("\n=== 测试零拷贝接收 ===")
+    pool = BufferPool(buffer_size=16)
+    receiver = FrameReceiver(pool)
+    messages = ["第一条", "second", "很长的消息" * 10, "第三条😀"]
+    data = encode_frames(messages)
+
+    received = []
+    offset = 0
+    while offset < len(data):
+        # 每次最多写入5字节，模拟零散到达的数据
+        space = receiver.writable()
+        count = min(len(space), 5, len(data) - offset)
+        space[:count] = data[offset:offset + count]
+        offset += count
+        received += receiver.commit(count)
+    print(f"解码结果: {received}")
+    assert received == messages
+    assert receiver.pending() == 0
+
+    # 扩容时原缓冲区已归还，扩容后的缓冲区不归还
+    receiver.close()
+    assert pool.free_count() == 1
+
+
+def test_receiver_socket() -> None:
+    """
+    测试从套接字接收，并在关闭后复用缓冲区
+    """
+    print("\n=== 测试套接字接收 ===")
+    pool = BufferPool()
+    left, right = socket.socketpair()
+    with left, right:
+        receiver = FrameReceiver(pool)
+        left.sendall(encode_frames(["a", "b"]) + encode_frame("c")[:3])
+        assert receiver.recv(right) == ["a", "b"]
+        left.sendall(encode_frame("c")[3:])
+        assert receiver.recv(right) == ["c"]
+        receiver.close()
+        assert pool.free_count() == 1
+
+        # 没有未解析数据时可以提前归还，下次接收时再取出
+        receiver = FrameReceiver(pool)
+        receiver.release_idle()
+        assert pool.free_count() == 1
+        left.sendall(encode_frame("d"))
+        assert receiver.recv(right) == ["d"]
+        receiver.close()
+
+        left.close()
+        receiver = FrameReceiver(pool)
+        assert pool.free_count() == 0
+        assert receiver.recv(right) is None
+        receiver.close()
+
+
+if __name__ == "__main__":
+    test_single_frame()
+    test_batched_frames()
+    test_partial_frames()
+    test_oversized_frame()
+    test_receiver_partial_frames()
+    test_receiver_socket()
@@ -0,0 +1,141 @@
+from protocol import PING, FrameDecoder, encode_frame
+from timer_wheel import TimerWheel
+import asyncio
+
+import server
+
+
+class FakeClock:
+    """
+    手动推进的时钟
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_schedule_and_cancel() -> None:
+    """
+    测试定时任务按时触发、取消后不触发
+    """
+    print("=== 测试时间轮定时与取消 ===")
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1, slots=8, clock=clock)
+    fired = []
+    wheel.schedule(2, fired.append, 'a')
+    wheel.schedule(3, fired.append, 'b')
+    cancelled = wheel.schedule(3, fired.append, 'c')
+    wheel.cancel(cancelled)
+    wheel.cancel(cancelled)
+    assert len(wheel) == 2
+
+    clock.now = 1.5
+    assert wheel.advance() == 0
+    clock.now = 2
+    assert wheel.advance() == 1
+    clock.now = 10
+    wheel.advance()
+    print(f"触发顺序: {fired}")
+    assert fired == ['a', 'b']
+    assert len(wheel) == 0
+
+
+def test_delay_longer_than_wheel() -> None:
+    """
+    测试超过一圈的延迟不会提前触发
+    """
+    print("\n=== 测试多圈延迟 ===")
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1, slots=4, clock=clock)
+    fired = []
+    wheel.schedule(10, fired.append, 'late')
+    wheel.schedule(2, fired.append, 'early')
+
+    for second in range(1, 10):
+        clock.now = second
+        wheel.advance()
+    assert fired == ['early']
+    clock.now = 10
+    wheel.advance()
+    assert fired == ['early', 'late']
+
+
+def test_many_timers() -> None:
+    """
+    测试大量定时任务的添加、取消和到期
+    """
+    print("\n=== 测试十万个定时任务 ===")
+    clock = FakeClock()
+    wheel = TimerWheel(tick=0.5, slots=512, clock=clock)
+    fired = []
+    timers = [wheel.schedule(i % 60, fired.append, i) for i in range(100000)]
+    for timer in timers[::2]:
+        wheel.cancel(timer)
+    assert len(wheel) == 50000
+
+    clock.now = 60
+    wheel.advance()
+    print(f"触发 {len(fired)} 个")
+    assert len(fired) == 50000
+    assert all(i % 2 == 1 for i in fired)
+
+
+def test_idle_connection_reaped() -> None:
+    """
+    测试空闲连接先收到心跳，再被断开；发心跳的连接保持在线
+    """
+    print("\n=== 测试空闲连接回收 ===")
+    saved = server.timer_wheel, server.HEARTBEAT_INTERVAL, server.IDLE_TIMEOUT
+    server.timer_wheel = TimerWheel(tick=0.05, slots=64)
+    server.HEARTBEAT_INTERVAL = 0.2
+    server.IDLE_TIMEOUT = 0.5
+
+    async def run() -> tuple:
+        reaper = asyncio.create_task(server.timer_wheel.run_async())
+        listener = await asyncio.start_server(
+            server.handle_client_async, 'localhost', 0)
+        port = listener.sockets[0].getsockname()[1]
+        idle_reader, _ = await asyncio.open_connection('localhost', port)
+        live_reader, live_writer = await asyncio.open_connection(
+            'localhost', port)
+
+        async def keep_alive() -> None:
+            while True:
+                live_writer.write(encode_frame(PING))
+                await asyncio.sleep(0.1)
+
+        pinger = asyncio.create_task(keep_alive())
+        decoder = FrameDecoder()
+        messages = []
+        while True:
+            data = await asyncio.wait_for(idle_reader.read(4096), 2)
+            if not data:
+                break
+            messages.extend(decoder.feed(data))
+
+        # 空闲连接已断开，发心跳的连接仍然可读
+        live_alive = not live_reader.at_eof()
+        pinger.cancel()
+        live_writer.close()
+        listener.close()
+        await listener.wait_closed()
+        reaper.cancel()
+        return messages, live_alive
+
+    try:
+        messages, live_alive = asyncio.run(run())
+    finally:
+        server.timer_wheel, server.HEARTBEAT_INTERVAL, server.IDLE_TIMEOUT = saved
+    print(f"空闲连接收到: {messages}")
+    assert PING in messages
+    assert live_alive
+
+
+if __name__ == "__main__":
+    test_schedule_and_cancel()
+    # test_delay_longer_than_wheel()
+    # test_many_timers()
+    # test_idle_connection_reaped()
@@ -0,0 +1,129 @@
+import asyncio
+import math
+import threading
+import time
+
+
+class Timer:
+    """
+    时间轮中的一个定时任务，由TimerWheel.schedule创建
+    """
+
+    __slots__ = ('expires', 'callback', 'args')
+
+    def __init__(self, expires, callback, args):
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+
+
+class TimerWheel:
+    """
+    哈希时间轮
+
+    时间按tick划分，定时任务按到期的tick数对槽数取模放入对应的槽；
+    超过一圈的任务留在槽中，直到到期的那一圈才触发。
+    添加和取消都是O(1)，每个tick只检查一个槽，
+    十万个连接各自一个空闲定时器也不需要堆或逐个线程计时。
+    """
+
+    def __init__(self, tick=0.5, slots=512, clock=time.monotonic):
+        """
+        初始化时间轮
+
+        Args:
+            tick: 每个槽代表的秒数，即定时精度
+            slots: 槽的数量，一圈覆盖tick * slots秒
+            clock: 时钟函数，测试时可替换
+        """
+        self._tick = tick
+        self._slots = [{} for _ in range(slots)]
+        self._clock = clock
+        self._origin = clock()
+        self._current = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def schedule(self, delay, callback, *args):
+        """
+        在delay秒后调用callback(*args)
+
+        Args:
+            delay: 延迟秒数，向上取整到tick
+            callback: 到期时调用的函数
+
+        Returns:
+            Timer: 可用于cancel的定时任务
+        """
+        with self._lock:
+            elapsed = self._clock() - self._origin
+            # 从当前时间而不是上次推进的位置算起，推进滞后时也不会提前触发
+            expires = max(math.ceil((elapsed + delay) / self._tick),
+                          self._current + 1)
+            timer = Timer(expires, callback, args)
+            self._slots[expires % len(self._slots)][timer] = None
+            self._count += 1
+            return timer
+
+    def cancel(self, timer):
+        """
+        取消尚未触发的定时任务，已触发或已取消时什么也不做
+
+        Args:
+            timer: schedule返回的定时任务
+        """
+        if timer is None:
+            return
+        with self._lock:
+            slot = self._slots[timer.expires % len(self._slots)]
+            if slot.pop(timer, 0) is None:
+                self._count -= 1
+
+    def advance(self):
+        """
+        推进到当前时间，触发所有已到期的定时任务
+
+        Returns:
+            int: 本次触发的任务数量
+        """
+        expired = []
+        with self._lock:
+            target = int((self._clock() - self._origin) / self._tick)
+            while self._current < target:
+                self._current += 1
+                slot = self._slots[self._current % len(self._slots)]
+                if not slot:
+                    continue
+                due = [t for t in slot if t.expires <= self._current]
+                for timer in due:
+                    del slot[timer]
+                expired.extend(due)
+            self._count -= len(expired)
+
+        # 回调可能再次schedule，必须在锁外调用
+        for timer in expired:
+            timer.callback(*timer.args)
+        return len(expired)
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    def start(self):
+        """
+        启动后台线程，每个tick推进一次
+        """
+        def run():
+            while True:
+                time.sleep(self._tick)
+                self.advance()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    async def run_async(self):
+        """
+        在事件循环中每个tick推进一次，回调在事件循环线程中执行
+        """
+        while True:
+            await asyncio.sleep(self._tick)
+            self.advance()
@@ -0,0 +1,281 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Deque, Generic, Optional, Tuple, TypeVar
+import time
+
+from blocking_queue import BlockingQueue
+
+
+T = TypeVar('T')
+
+_Waiter = Tuple[asyncio.AbstractEventLoop, asyncio.Future]
+
+
+class _LoopAwareQueue(BlockingQueue[T]):
+    """
+    在BlockingQueue基础上额外登记asyncio等待者
+
+    线程侧的put/take等操作不变，每次唤醒线程等待者时，
+    同时通过call_soon_threadsafe唤醒事件循环中的协程等待者。
+    """
+
+    def __init__(self, capacity: int = 10, storage: str = "deque"):
+        super().__init__(capacity, storage)
+        self._async_getters: Deque[_Waiter] = deque()
+        self._async_putters: Deque[_Waiter] = deque()
+
+    def _signal_not_empty(self, n: Optional[int] = 1) -> None:
+        super()._signal_not_empty(n)
+        _wake_waiters(self._async_getters, n)
+
+    def _signal_not_full(self, n: Optional[int] = 1) -> None:
+        super()._signal_not_full(n)
+        _wake_waiters(self._async_putters, n)
+
+    def _take_or_wait(
+            self, loop: asyncio.AbstractEventLoop
+    ) -> Tuple[Optional[T], Optional[asyncio.Future]]:
+        """
+        在同一次加锁内取出元素，或者登记一个等待future
+
+        Returns:
+            Tuple: (取出的元素, None)、已关闭且为空时(None, None)
+            或 (None, 等待元素的future)
+        """
+        with self._lock:
+            if len(self._queue) > 0:
+                item = self._queue.popleft()
+                self._signal_not_full()
+                return item, None
+            if self._closed:
+                return None, None
+            future = loop.create_future()
+            self._async_getters.append((loop, future))
+            return None, future
+
+    def _put_or_wait(
+            self, item: T, loop: asyncio.AbstractEventLoop
+    ) -> Tuple[bool, Optional[asyncio.Future]]:
+        """
+        在同一次加锁内放入元素，或者登记一个等待future
+
+        Returns:
+            Tuple: 放入成功返回(True, None)，已关闭返回(False, None)，
+            否则返回(False, 等待空间的future)
+        """
+        with self._lock:
+            if self._closed:
+                return False, None
+            if not self._is_full_locked():
+                self._queue.append(item)
+                self._signal_not_empty()
+                return True, None
+            future = loop.create_future()
+            self._async_putters.append((loop, future))
+            return False, future
+
+    def _cancel_waiter(self, future: asyncio.Future, is_getter: bool) -> None:
+        """
+        移除被取消的等待者；如果它已被唤醒，则把这次唤醒转交给下一个等待者
+        """
+        waiters = self._async_getters if is_getter else self._async_putters
+        with self._lock:
+            for waiter in waiters:
+                if waiter[1] is future:
+                    waiters.remove(waiter)
+                    return
+            if is_getter:
+                self._signal_not_empty()
+            else:
+                self._signal_not_full()
+
+
+def _wake_waiters(waiters: Deque[_Waiter], n: Optional[int]) -> None:
+    """
+    按先进先出顺序唤醒n个协程等待者，调用方必须已持有锁
+    """
+    count = len(waiters) if n is None else min(n, len(waiters))
+    for _ in range(count):
+        loop, future = waiters.popleft()
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AsyncBlockingQueue(Generic[T]):
+    """
+    可在asyncio中await的阻塞队列，同时允许线程通过sync视图读写
+
+    特性：
+    1. await put()/take()在等待时挂起协程，不占用执行器线程
+    2. 线程侧通过sync属性得到的BlockingQueue照常put/take
+    3. 线程放入元素后用call_soon_threadsafe唤醒事件循环
+    4. 一个事件循环可以同时消费多个由线程生产的队列
+    5. close()后可用async for消费直到取空
+    """
+
+    def __init__(self, capacity: int = 10, storage: str = "deque"):
+        """
+        初始化异步阻塞队列
+
+        Args:
+            capacity: 队列最大容量，必须大于0
+            storage: 底层存储类型，同BlockingQueue
+
+        Raises:
+            ValueError: 当capacity小于等于0或storage不受支持时抛出
+        """
+        self._queue: _LoopAwareQueue[T] = _LoopAwareQueue(capacity, storage)
+
+    @property
+    def sync(self) -> BlockingQueue[T]:
+        """
+        供线程使用的同步视图，与本队列共享同一份数据
+
+        Returns:
+            BlockingQueue[T]: 线程侧阻塞队列
+        """
+        return self._queue
+
+    async def put(self, item: T, timeout: Optional[float] = None) -> bool:
+        """
+        将元素放入队列，如果队列已满则挂起直到有空间可用
+
+        Args:
+            item: 要放入的元素
+            timeout: 超时时间（秒），None表示无限等待
+
+        Returns:
+            bool: 成功放入返回True，超时或队列已关闭返回False
+
+        Raises:
+            TypeError: 当item为None时抛出
+        """
+        if item is None:
+            raise TypeError("不允许放入None元素")
+
+        loop = asyncio.get_running_loop()
+        end_time = None if timeout is None else time.time() + timeout
+        while True:
+            done, future = self._queue._put_or_wait(item, loop)
+            if future is None:
+                return done
+            if not await self._wait(future, end_time, is_getter=False):
+                return False
+
+    async def take(self, timeout: Optional[float] = None) -> Optional[T]:
+        """
+        从队列取出元素，如果队列为空则挂起直到有元素可用
+
+        Args:
+            timeout: 超时时间（秒），None表示无限等待
+
+        Returns:
+            Optional[T]: 取出的元素，超时或队列已关闭且为空时返回None
+        """
+        loop = asyncio.get_running_loop()
+        end_time = None if timeout is None else time.time() + timeout
+        while True:
+            item, future = self._queue._take_or_wait(loop)
+            if future is None:
+                return item
+            if not await self._wait(future, end_time, is_getter=True):
+                return None
+
+    async def offer(self, item: T, timeout: Optional[float] = None) -> bool:
+        """
+        尝试将元素放入队列，如果队列已满则挂起指定时间
+
+        Args:
+            item: 要放入的元素
+            timeout: 超时时间（秒），None表示不等待
+
+        Returns:
+            bool: 成功放入返回True，失败返回False
+        """
+        if timeout is None:
+            timeout = 0
+        return await self.put(item, timeout)
+
+    async def poll(self, timeout: Optional[float] = None) -> Optional[T]:
+        """
+        尝试从队列取出元素，如果队列为空则挂起指定时间
+
+        Args:
+            timeout: 超时时间（秒），None表示不等待
+
+        Returns:
+            Optional[T]: 取出的元素，失败返回None
+        """
+        if timeout is None:
+            timeout = 0
+        return await self.take(timeout)
+
+    def close(self) -> None:
+        """
+        关闭队列，唤醒所有等待中的协程和线程
+        """
+        self._queue.close()
+
+    def is_closed(self) -> bool:
+        """
+        判断队列是否已关闭
+        """
+        return self._queue.is_closed()
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        """
+        依次取出元素，队列关闭且取空后结束迭代
+        """
+        while True:
+            item = await self.take()
+            if item is None:
+                return
+            yield item
+
+    def size(self) -> int:
+        """
+        获取队列当前元素数量
+        """
+        return self._queue.size()
+
+    def is_empty(self) -> bool:
+        """
+        判断队列是否为空
+        """
+        return self._queue.is_empty()
+
+    def is_full(self) -> bool:
+        """
+        判断队列是否已满
+        """
+        return self._queue.is_full()
+
+    async def _wait(self, future: asyncio.Future, end_time: Optional[float],
+                    is_getter: bool) -> bool:
+        """
+        等待future被唤醒
+
+        Returns:
+            bool: 被唤醒返回True，已到截止时间返回False
+        """
+        if end_time is None:
+            remaining = None
+        else:
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                self._queue._cancel_waiter(future, is_getter)
+                return False
+        try:
+            await asyncio.wait_for(future, remaining)
+        except asyncio.TimeoutError:
+            # 超时后仍回到调用方重试一次，避免与唤醒竞争时丢失元素
+            self._queue._cancel_waiter(future, is_getter)
+        except asyncio.CancelledError:
+            self._queue._cancel_waiter(future, is_getter)
+            raise
+        return True
@@ -0,0 +1,201 @@
+from blocking_queue import BlockingQueue
+from sharded_blocking_queue import ShardedBlockingQueue
+import threading
+import time
+import tracemalloc
+
+
+ITEM_COUNT = 200_000
+BATCH_SIZE = 256
+CAPACITY = 1024
+SCALING_ITEMS = 100_000
+SCALING_THREADS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def bench_per_item(item_count: int = ITEM_COUNT,
+                   storage: str = "deque", metrics: bool = False) -> float:
+    """
+    逐个put/take的吞吐量基准
+
+    Args:
+        item_count: 传递的元素总数
+        storage: 队列底层存储类型
+        metrics: 是否开启竞争指标统计
+
+    Returns:
+        float: 每秒传递的元素数量
+    """
+    queue: BlockingQueue[int] = BlockingQueue[int](
+        capacity=CAPACITY, storage=storage, metrics=metrics)
+
+    def producer() -> None:
+        for i in range(item_count):
+            queue.put(i)
+
+    def consumer() -> None:
+        for _ in range(item_count):
+            queue.take()
+
+    return _run(producer, consumer, item_count)
+
+
+def bench_batch(item_count: int = ITEM_COUNT,
+                batch_size: int = BATCH_SIZE,
+                storage: str = "deque") -> float:
+    """
+    put_all/drain_to批量传递的吞吐量基准
+
+    Args:
+        item_count: 传递的元素总数
+        batch_size: 每批元素数量
+        storage: 队列底层存储类型
+
+    Returns:
+        float: 每秒传递的元素数量
+    """
+    queue: BlockingQueue[int] = BlockingQueue[int](
+        capacity=CAPACITY, storage=storage)
+
+    def producer() -> None:
+        for start in range(0, item_count, batch_size):
+            queue.put_all(range(start, min(start + batch_size, item_count)))
+
+    def consumer() -> None:
+        received = 0
+        buffer: list = []
+        while received < item_count:
+            if queue.drain_to(buffer, max_items=batch_size, timeout=1) == 0:
+                continue
+            received += len(buffer)
+            buffer.clear()
+
+    return _run(producer, consumer, item_count)
+
+
+def bench_allocations(storage: str, rounds: int = 50) -> tuple:
+    """
+    统计队列在反复填满、清空过程中的内存分配情况
+
+    Args:
+        storage: 队列底层存储类型
+        rounds: 填满再取空的轮数
+
+    Returns:
+        tuple: (分配次数, 峰值字节数)
+    """
+    items = list(range(CAPACITY))
+    queue: BlockingQueue[int] = BlockingQueue[int](
+        capacity=CAPACITY, storage=storage)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    for _ in range(rounds):
+        for item in items:
+            queue.put(item)
+        for _ in items:
+            queue.take()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    allocations = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return allocations, peak
+
+
+def bench_producer_scaling(queue, producers: int,
+                           item_count: int = SCALING_ITEMS,
+                           consumers: int = 4) -> float:
+    """
+    多生产者多消费者吞吐量基准
+
+    Args:
+        queue: BlockingQueue或ShardedBlockingQueue实例
+        producers: 生产者线程数
+        item_count: 传递的元素总数
+        consumers: 消费者线程数
+
+    Returns:
+        float: 每秒传递的元素数量
+    """
+    per_producer = item_count // producers
+    total = per_producer * producers
+    per_consumer = [total // consumers] * consumers
+    per_consumer[0] += total % consumers
+
+    def producer() -> None:
+        for i in range(per_producer):
+            queue.put(i + 1)
+
+    def consumer(count: int) -> None:
+        for _ in range(count):
+            queue.take()
+
+    threads = [threading.Thread(target=producer) for _ in range(producers)]
+    threads += [threading.Thread(target=consumer, args=(count,))
+                for count in per_consumer]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return total / (time.perf_counter() - start)
+
+
+def _run(producer, consumer, item_count: int) -> float:
+    """
+    启动一个生产者和一个消费者线程并计时
+
+    Returns:
+        float: 每秒传递的元素数量
+    """
+    threads = [threading.Thread(target=producer),
+               threading.Thread(target=consumer)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return item_count / elapsed
+
+
+def main() -> None:
+    """
+    运行所有基准并打印结果
+    """
+    print(f"=== 吞吐量基准 ({ITEM_COUNT} 个元素, 容量 {CAPACITY}) ===")
+    for storage in ("deque", "ring"):
+        per_item = bench_per_item(storage=storage)
+        batch = bench_batch(storage=storage)
+        print(f"[{storage:>5}] 逐个 put/take:           "
+              f"{per_item:>12,.0f} items/s")
+        print(f"[{storage:>5}] put_all/drain_to({BATCH_SIZE}): "
+              f"{batch:>12,.0f} items/s ({batch / per_item:.1f}x)")
+
+    print("\n=== 指标统计开销 ===")
+    plain = bench_per_item()
+    timed = bench_per_item(metrics=True)
+    print(f"metrics=False: {plain:>12,.0f} items/s")
+    print(f"metrics=True:  {timed:>12,.0f} items/s "
+          f"({timed / plain:.2f}x)")
+
+    print(f"\n=== 生产者线程扩展性 ({SCALING_ITEMS} 个元素, 4 个消费者) ===")
+    for producers in SCALING_THREADS:
+        single = bench_producer_scaling(
+            BlockingQueue[int](capacity=CAPACITY), producers)
+        sharded = bench_producer_scaling(
+            ShardedBlockingQueue[int](capacity=CAPACITY, lanes=8), producers)
+        print(f"{producers:>2} 个生产者: 单锁 {single:>10,.0f} items/s, "
+              f"8通道 {sharded:>10,.0f} items/s ({sharded / single:.2f}x)")
+
+    print("\n=== 内存分配 (反复填满再取空) ===")
+    for storage in ("deque", "ring"):
+        allocations, peak = bench_allocations(storage)
+        print(f"[{storage:>5}] 残留分配块: {allocations:>6}, "
+              f"峰值: {peak / 1024:>8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,97 @@
 import threading
-from typing import Generic, TypeVar, Optional
+from typing import (Generic, TypeVar, Optional, Iterable, Iterator, List,
+                    Union, Dict, Any)
 from collections import deque
 import time
 
+from queue_metrics import QueueMetrics, TimedLock, TimedCondition
+
 
 T = TypeVar('T')
 
 
+class RingBuffer(Generic[T]):
+    """
+    固定容量的环形缓冲区
+
+    创建时一次性预分配capacity个槽位，通过head/tail下标循环复用，
+    运行期间不再申请或释放内存。接口与BlockingQueue用到的deque方法一致。
+    """
+
+    __slots__ = ('_slots', '_capacity', '_head', '_tail', '_size')
+
+    def __init__(self, capacity: int):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity: 槽位数量
+        """
+        self._slots: List[Optional[T]] = [None] * capacity
+        self._capacity: int = capacity
+        self._head: int = 0
+        self._tail: int = 0
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, item: T) -> None:
+        """
+        在队尾写入元素
+
+        Raises:
+            IndexError: 当缓冲区已满时抛出
+        """
+        if self._size >= self._capacity:
+            raise IndexError("环形缓冲区已满")
+        self._slots[self._tail] = item
+        self._tail = (self._tail + 1) % self._capacity
+        self._size += 1
+
+    def extend(self, items: Iterable[T]) -> None:
+        """
+        在队尾写入多个元素，按绕回位置最多分两段切片赋值
+
+        Raises:
+            IndexError: 当剩余槽位不足时抛出，此时不写入任何元素
+        """
+        batch = list(items)
+        count = len(batch)
+        if self._size + count > self._capacity:
+            raise IndexError("环形缓冲区已满")
+        first = min(count, self._capacity - self._tail)
+        self._slots[self._tail:self._tail + first] = batch[:first]
+        self._slots[:count - first] = batch[first:]
+        self._tail = (self._tail + count) % self._capacity
+        self._size += count
+
+    def popleft(self) -> T:
+        """
+        从队头取出元素，并释放槽位对元素的引用
+
+        Raises:
+            IndexError: 当缓冲区为空时抛出
+        """
+        if self._size == 0:
+            raise IndexError("环形缓冲区为空")
+        item = self._slots[self._head]
+        self._slots[self._head] = None
+        self._head = (self._head + 1) % self._capacity
+        self._size -= 1
+        return item
+
+    def clear(self) -> None:
+        """
+        清空缓冲区，槽位保留不释放
+        """
+        for i in range(self._capacity):
+            self._slots[i] = None
+        self._head = 0
+        self._tail = 0
+        self._size = 0
+
+
 class BlockingQueue(Generic[T]):
     """
     线程安全的阻塞队列实现
@@ -16,26 +101,50 @@ class BlockingQueue(Generic[T]):
     2. 当队列已满时，put()操作会阻塞直到有空间可用
     3. 支持超时机制
     4. 线程安全，使用条件变量实现同步
+    5. 可选deque或预分配的环形缓冲区作为底层存储
+    6. 可选开启等待耗时、锁持有时长等竞争指标统计
+    7. 支持close()结束数据流，可用for循环消费直到关闭且取空
     """
     
-    def __init__(self, capacity: int = 10):
+    def __init__(self, capacity: int = 10, storage: str = "deque",
+                 metrics: bool = False):
         """
         初始化阻塞队列
         
         Args:
             capacity: 队列最大容量，必须大于0
+            storage: 底层存储，"deque"为按需分配的双端队列，
+                     "ring"为按capacity预分配的环形缓冲区
+            metrics: 是否统计竞争指标，关闭时不产生额外开销
             
         Raises:
-            ValueError: 当capacity小于等于0时抛出
+            ValueError: 当capacity小于等于0或storage不受支持时抛出
         """
         if capacity <= 0:
             raise ValueError(f"队列容量必须大于0，当前值: {capacity}")
         
-        self._queue: deque[T] = deque()
+        self._queue: Union[deque[T], RingBuffer[T]]
+        if storage == "deque":
+            self._queue = deque()
+        elif storage == "ring":
+            self._queue = RingBuffer(capacity)
+        else:
+            raise ValueError(f"不支持的存储类型: {storage}")
         self._capacity: int = capacity
-        self._lock: threading.Lock = threading.Lock()
-        self._not_empty: threading.Condition = threading.Condition(self._lock)
-        self._not_full: threading.Condition = threading.Condition(self._lock)
+        self._closed: bool = False
+        self._metrics: Optional[QueueMetrics] = None
+        if metrics:
+            # 用计时的锁和条件变量替换普通实现，关闭时走原有路径
+            self._metrics = QueueMetrics()
+            self._lock = TimedLock(self._metrics.lock_hold)
+            self._not_empty = TimedCondition(
+                self._lock, self._metrics.not_empty_wait)
+            self._not_full = TimedCondition(
+                self._lock, self._metrics.not_full_wait)
+        else:
+            self._lock: threading.Lock = threading.Lock()
+            self._not_empty: threading.Condition = threading.Condition(self._lock)
+            self._not_full: threading.Condition = threading.Condition(self._lock)
     
     def put(self, item: T, timeout: Optional[float] = None) -> bool:
         """
@@ -46,7 +155,7 @@ class BlockingQueue(Generic[T]):
             timeout: 超时时间（秒），None表示无限等待
             
         Returns:
-            bool: 成功放入返回True，超时返回False
+            bool: 成功放入返回True，超时或队列已关闭返回False
             
         Raises:
             TypeError: 当item为None时抛出
@@ -55,26 +164,31 @@ class BlockingQueue(Generic[T]):
             raise TypeError("不允许放入None元素")
         
         with self._not_full:
-            # 队列已满，等待有空间
-            if len(self._queue) >= self._capacity:
+            # 队列已满，等待有空间或队列关闭
+            if self._is_full_locked():
                 if timeout is None:
                     # 无限等待
-                    while len(self._queue) >= self._capacity:
+                    while self._is_full_locked() and not self._closed:
                         self._not_full.wait()
                 else:
                     # 带超时的等待
                     end_time = time.time() + timeout
-                    while len(self._queue) >= self._capacity:
+                    while self._is_full_locked() and not self._closed:
                         remaining = end_time - time.time()
                         if remaining <= 0:
+                            self._record_timeout(put=True)
                             return False
                         self._not_full.wait(remaining)
             
+            # 关闭后不再接受新元素
+            if self._closed:
+                return False
+            
             # 放入元素
             self._queue.append(item)
             
             # 通知可能等待的消费者
-            self._not_empty.notify()
+            self._signal_not_empty()
             
             return True
     
@@ -86,32 +200,134 @@ class BlockingQueue(Generic[T]):
             timeout: 超时时间（秒），None表示无限等待
             
         Returns:
-            Optional[T]: 取出的元素，超时返回None
+            Optional[T]: 取出的元素，超时或队列已关闭且为空时返回None
         """
         with self._not_empty:
-            # 队列为空，等待有元素
+            # 队列为空，等待有元素或队列关闭
             if len(self._queue) == 0:
                 if timeout is None:
                     # 无限等待
-                    while len(self._queue) == 0:
+                    while len(self._queue) == 0 and not self._closed:
                         self._not_empty.wait()
                 else:
                     # 带超时的等待
                     end_time = time.time() + timeout
-                    while len(self._queue) == 0:
+                    while len(self._queue) == 0 and not self._closed:
                         remaining = end_time - time.time()
                         if remaining <= 0:
+                            self._record_timeout(put=False)
                             return None
                         self._not_empty.wait(remaining)
             
+            # 已关闭且取空
+            if len(self._queue) == 0:
+                return None
+            
             # 取出元素
             item = self._queue.popleft()
             
             # 通知可能等待的生产者
-            self._not_full.notify()
+            self._signal_not_full()
             
             return item
     
+    def put_all(self, items: Iterable[T], timeout: Optional[float] = None) -> int:
+        """
+        批量放入元素，整批在一次加锁内完成，队列满时阻塞等待空间
+
+        与逐个调用put()相比，只需一次加锁和一次容量检查循环，
+        并用notify(n)一次性唤醒与放入数量相当的消费者。
+
+        Args:
+            items: 要放入的元素序列
+            timeout: 超时时间（秒），None表示无限等待
+
+        Returns:
+            int: 实际放入的元素数量，超时或队列关闭时可能小于元素总数
+
+        Raises:
+            TypeError: 当items中包含None时抛出，此时不会放入任何元素
+        """
+        batch: List[T] = list(items)
+        if any(item is None for item in batch):
+            raise TypeError("不允许放入None元素")
+
+        total = len(batch)
+        count = 0
+        end_time = None if timeout is None else time.time() + timeout
+        with self._not_full:
+            while count < total:
+                # 队列已满，等待有空间或队列关闭
+                while self._is_full_locked() and not self._closed:
+                    if end_time is None:
+                        self._not_full.wait()
+                    else:
+                        remaining = end_time - time.time()
+                        if remaining <= 0:
+                            self._record_timeout(put=True)
+                            return count
+                        self._not_full.wait(remaining)
+
+                if self._closed:
+                    return count
+
+                # 一次放入当前能容纳的所有元素
+                free = self._free_slots_locked()
+                chunk = batch[count:count + free]
+                self._queue.extend(chunk)
+                count += len(chunk)
+
+                # 放入几个元素就唤醒几个消费者
+                self._signal_not_empty(len(chunk))
+
+            return count
+
+    def drain_to(self, target: List[T], max_items: Optional[int] = None,
+                 timeout: Optional[float] = None) -> int:
+        """
+        批量取出元素并追加到target中，整批在一次加锁内完成
+
+        Args:
+            target: 接收元素的列表
+            max_items: 最多取出的元素数量，None表示取出全部
+            timeout: 队列为空时等待的超时时间（秒），None表示不等待
+
+        Returns:
+            int: 实际取出的元素数量，超时、队列为空或已关闭且取空时返回0
+
+        Raises:
+            ValueError: 当max_items小于0时抛出
+        """
+        if max_items is not None and max_items < 0:
+            raise ValueError(f"max_items不能小于0，当前值: {max_items}")
+        if max_items == 0:
+            return 0
+
+        with self._not_empty:
+            # 队列为空，等待有元素
+            if len(self._queue) == 0 and timeout:
+                end_time = time.time() + timeout
+                while len(self._queue) == 0 and not self._closed:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        self._record_timeout(put=False)
+                        return 0
+                    self._not_empty.wait(remaining)
+
+            count = len(self._queue)
+            if max_items is not None:
+                count = min(count, max_items)
+            if count == 0:
+                return 0
+
+            queue = self._queue
+            target.extend(queue.popleft() for _ in range(count))
+
+            # 腾出几个位置就唤醒几个生产者
+            self._signal_not_full(count)
+
+            return count
+
     def offer(self, item: T, timeout: Optional[float] = None) -> bool:
         """
         尝试将元素放入队列，如果队列已满则阻塞指定时间
@@ -170,7 +386,7 @@ class BlockingQueue(Generic[T]):
             bool: 队列已满返回True，否则返回False
         """
         with self._lock:
-            return len(self._queue) >= self._capacity
+            return self._is_full_locked()
     
     def remaining_capacity(self) -> int:
         """
@@ -189,4 +405,101 @@ class BlockingQueue(Generic[T]):
         with self._lock:
             self._queue.clear()
             # 通知所有等待的生产者
+            self._signal_not_full(None)
+
+    def close(self) -> None:
+        """
+        关闭队列，表示数据流结束
+
+        关闭后put立即返回False；队列中剩余的元素仍可取出，
+        取空后take立即返回None。所有阻塞中的put和take都会被唤醒。
+        """
+        with self._lock:
+            self._closed = True
+            self._signal_not_empty(None)
+            self._signal_not_full(None)
+
+    def is_closed(self) -> bool:
+        """
+        判断队列是否已关闭
+
+        Returns:
+            bool: 已关闭返回True，否则返回False
+        """
+        with self._lock:
+            return self._closed
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        依次取出元素，队列关闭且取空后结束迭代
+
+        Yields:
+            T: 取出的元素
+        """
+        while True:
+            item = self.take()
+            if item is None:
+                return
+            yield item
+
+    def metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        获取竞争指标快照
+
+        Returns:
+            Optional[Dict[str, Any]]: 等待耗时、锁持有时长直方图，
+            历史最高长度及put/take超时次数；未开启统计时返回None
+        """
+        if self._metrics is None:
+            return None
+        with self._lock:
+            return self._metrics.snapshot()
+
+    def _record_timeout(self, put: bool) -> None:
+        """
+        记录一次put或take超时，调用方必须已持有锁
+        """
+        if self._metrics is None:
+            return
+        if put:
+            self._metrics.put_timeouts += 1
+        else:
+            self._metrics.take_timeouts += 1
+
+    def _is_full_locked(self) -> bool:
+        """
+        判断是否已无空间放入元素，调用方必须已持有锁
+        """
+        return len(self._queue) >= self._capacity
+
+    def _free_slots_locked(self) -> int:
+        """
+        当前还能放入的元素数量，调用方必须已持有锁
+        """
+        return self._capacity - len(self._queue)
+
+    def _signal_not_empty(self, n: Optional[int] = 1) -> None:
+        """
+        唤醒等待元素的消费者，调用方必须已持有锁
+
+        Args:
+            n: 唤醒数量，None表示全部唤醒
+        """
+        if self._metrics is not None:
+            self._metrics.record_size(len(self._queue))
+        if n is None:
+            self._not_empty.notify_all()
+        else:
+            self._not_empty.notify(n)
+
+    def _signal_not_full(self, n: Optional[int] = 1) -> None:
+        """
+        唤醒等待空间的生产者，调用方必须已持有锁
+
+        Args:
+            n: 唤醒数量，None表示全部唤醒
+        """
+        if n is None:
             self._not_full.notify_all()
+        else:
+            self._not_full.notify(n)
@@ -0,0 +1,258 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import (Any, Callable, Generic, Iterable, List, Optional, Tuple,
+                    TypeVar)
+
+from blocking_queue import BlockingQueue
+
+
+T = TypeVar('T')
+
+
+class HeapBuffer(Generic[T]):
+    """
+    基于二叉堆的存储，popleft总是取出key最小的元素
+
+    key相同的元素按放入顺序取出，元素本身不需要可比较。
+    接口与BlockingQueue用到的deque方法一致。
+    """
+
+    __slots__ = ('_heap', '_key', '_counter')
+
+    def __init__(self, key: Optional[Callable[[T], Any]] = None):
+        """
+        初始化堆存储
+
+        Args:
+            key: 计算排序键的函数，None表示按元素本身排序
+        """
+        self._heap: List[Tuple[Any, int, T]] = []
+        self._key: Callable[[T], Any] = key or (lambda item: item)
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def append(self, item: T) -> None:
+        """
+        放入元素
+        """
+        entry = (self._key(item), next(self._counter), item)
+        heapq.heappush(self._heap, entry)
+
+    def extend(self, items: Iterable[T]) -> None:
+        """
+        依次放入多个元素
+        """
+        for item in items:
+            self.append(item)
+
+    def popleft(self) -> T:
+        """
+        取出排序键最小的元素
+
+        Raises:
+            IndexError: 当堆为空时抛出
+        """
+        return heapq.heappop(self._heap)[2]
+
+    def peek_key(self) -> Any:
+        """
+        查看堆顶元素的排序键
+
+        Raises:
+            IndexError: 当堆为空时抛出
+        """
+        return self._heap[0][0]
+
+    def clear(self) -> None:
+        """
+        清空堆
+        """
+        self._heap.clear()
+
+
+class PriorityBlockingQueue(BlockingQueue[T]):
+    """
+    线程安全的优先级阻塞队列
+
+    与BlockingQueue的put/take/offer/poll及超时语义完全一致，
+    区别在于take总是取出排序键最小的元素，排序键相同时先进先出。
+    """
+
+    def __init__(self, capacity: int = 10,
+                 key: Optional[Callable[[T], Any]] = None,
+                 metrics: bool = False):
+        """
+        初始化优先级阻塞队列
+
+        Args:
+            capacity: 队列最大容量，必须大于0
+            key: 计算优先级的函数，值越小越先取出，None表示按元素本身比较
+            metrics: 是否统计竞争指标
+
+        Raises:
+            ValueError: 当capacity小于等于0时抛出
+        """
+        super().__init__(capacity, metrics=metrics)
+        self._queue = HeapBuffer(key)
+
+
+class DelayQueue(BlockingQueue[T]):
+    """
+    线程安全的延迟阻塞队列
+
+    特性：
+    1. put时指定延迟，元素到期后才能被take取出
+    2. take只在最早到期时间或更早的新元素到来时醒来，空闲时不轮询
+    3. 采用leader-follower模式，同一时刻只有一个消费者按到期时间定时等待，
+       其余消费者无限等待，避免到期时所有消费者同时被唤醒
+    """
+
+    def __init__(self, capacity: int = 10, metrics: bool = False):
+        """
+        初始化延迟阻塞队列
+
+        Args:
+            capacity: 队列最大容量，必须大于0
+            metrics: 是否统计竞争指标
+
+        Raises:
+            ValueError: 当capacity小于等于0时抛出
+        """
+        super().__init__(capacity, metrics=metrics)
+        self._queue = HeapBuffer(key=lambda entry: entry[0])
+        self._leader: Optional[threading.Thread] = None
+
+    def put(self, item: T, timeout: Optional[float] = None,
+            delay: float = 0.0) -> bool:
+        """
+        放入元素，元素在delay秒后到期
+
+        Args:
+            item: 要放入的元素
+            timeout: 队列已满时的超时时间（秒），None表示无限等待
+            delay: 延迟时间（秒）
+
+        Returns:
+            bool: 成功放入返回True，超时返回False
+
+        Raises:
+            TypeError: 当item为None时抛出
+        """
+        if item is None:
+            raise TypeError("不允许放入None元素")
+        return super().put((time.monotonic() + delay, item), timeout)
+
+    def put_all(self, items: Iterable[T], timeout: Optional[float] = None,
+                delay: float = 0.0) -> int:
+        """
+        批量放入元素，所有元素在delay秒后到期
+
+        Args:
+            items: 要放入的元素序列
+            timeout: 队列已满时的超时时间（秒），None表示无限等待
+            delay: 延迟时间（秒）
+
+        Returns:
+            int: 实际放入的元素数量
+
+        Raises:
+            TypeError: 当items中包含None时抛出，此时不会放入任何元素
+        """
+        batch = list(items)
+        if any(item is None for item in batch):
+            raise TypeError("不允许放入None元素")
+        deadline = time.monotonic() + delay
+        return super().put_all([(deadline, item) for item in batch], timeout)
+
+    def take(self, timeout: Optional[float] = None) -> Optional[T]:
+        """
+        取出最早到期的元素，如果没有到期元素则阻塞直到其到期
+
+        Args:
+            timeout: 超时时间（秒），None表示无限等待
+
+        Returns:
+            Optional[T]: 取出的元素，超时或队列已关闭且为空时返回None
+        """
+        end_time = None if timeout is None else time.monotonic() + timeout
+        current = threading.current_thread()
+        with self._not_empty:
+            try:
+                while True:
+                    now = time.monotonic()
+                    remaining = None if end_time is None else end_time - now
+
+                    if len(self._queue) > 0:
+                        delay = self._queue.peek_key() - now
+                        if delay <= 0:
+                            _, item = self._queue.popleft()
+                            self._signal_not_full()
+                            return item
+                    elif self._closed:
+                        # 已关闭且取空
+                        return None
+                    else:
+                        delay = None
+
+                    if remaining is not None and remaining <= 0:
+                        self._record_timeout(put=False)
+                        return None
+
+                    if delay is None or self._leader is not None:
+                        # 队列为空或已有leader在等待堆顶到期
+                        self._not_empty.wait(remaining)
+                    else:
+                        # 成为leader，只等到堆顶到期或超时
+                        self._leader = current
+                        try:
+                            if remaining is not None:
+                                delay = min(delay, remaining)
+                            self._not_empty.wait(delay)
+                        finally:
+                            if self._leader is current:
+                                self._leader = None
+            finally:
+                # 没有leader时唤醒一个follower接替等待下一个到期元素
+                if self._leader is None and len(self._queue) > 0:
+                    self._not_empty.notify()
+
+    def drain_to(self, target: List[T], max_items: Optional[int] = None,
+                 timeout: Optional[float] = None) -> int:
+        """
+        取出所有已到期的元素并追加到target中，不等待未到期元素
+
+        Args:
+            target: 接收元素的列表
+            max_items: 最多取出的元素数量，None表示不限制
+            timeout: 为兼容BlockingQueue保留，不使用
+
+        Returns:
+            int: 实际取出的元素数量
+
+        Raises:
+            ValueError: 当max_items小于0时抛出
+        """
+        if max_items is not None and max_items < 0:
+            raise ValueError(f"max_items不能小于0，当前值: {max_items}")
+
+        with self._lock:
+            now = time.monotonic()
+            count = 0
+            while (len(self._queue) > 0
+                   and (max_items is None or count < max_items)
+                   and self._queue.peek_key() <= now):
+                _, item = self._queue.popleft()
+                target.append(item)
+                count += 1
+            if count:
+                self._signal_not_full(count)
+            return count
+
+    def _signal_not_empty(self, n: Optional[int] = 1) -> None:
+        # 新元素可能早于当前堆顶，让被唤醒的消费者重新竞争leader
+        self._leader = None
+        super()._signal_not_empty(n)
@@ -0,0 +1,156 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 直方图桶上界（秒），最后一个桶收集所有更大的值
+BUCKET_BOUNDS: Tuple[float, ...] = (
+    1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, float('inf'))
+
+
+class Histogram:
+    """
+    固定桶边界的耗时直方图
+
+    不自带锁，由调用方保证记录时已持有队列锁。
+    """
+
+    __slots__ = ('_counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self._counts: List[int] = [0] * len(BUCKET_BOUNDS)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        记录一次耗时
+
+        Args:
+            seconds: 耗时（秒）
+        """
+        self._counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """
+        获取各桶计数
+
+        Returns:
+            List[Tuple[float, int]]: (桶上界秒数, 落入该桶的次数)
+        """
+        return list(zip(BUCKET_BOUNDS, self._counts))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取直方图快照
+
+        Returns:
+            Dict[str, Any]: 次数、总耗时、平均耗时、最大耗时和各桶计数
+        """
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': self.buckets(),
+        }
+
+
+class QueueMetrics:
+    """
+    阻塞队列的竞争与等待指标
+
+    记录内容：
+    1. 在_not_full/_not_empty上的等待耗时
+    2. 每次持有锁的时长
+    3. 队列长度的历史最高值
+    4. put/take因超时而失败的次数
+    """
+
+    def __init__(self):
+        self.not_full_wait = Histogram()
+        self.not_empty_wait = Histogram()
+        self.lock_hold = Histogram()
+        self.high_water_mark: int = 0
+        self.put_timeouts: int = 0
+        self.take_timeouts: int = 0
+
+    def record_size(self, size: int) -> None:
+        """
+        记录放入后的队列长度，更新历史最高值
+        """
+        if size > self.high_water_mark:
+            self.high_water_mark = size
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取所有指标的快照
+
+        Returns:
+            Dict[str, Any]: 指标名到值或直方图快照的映射
+        """
+        return {
+            'not_full_wait': self.not_full_wait.snapshot(),
+            'not_empty_wait': self.not_empty_wait.snapshot(),
+            'lock_hold': self.lock_hold.snapshot(),
+            'high_water_mark': self.high_water_mark,
+            'put_timeouts': self.put_timeouts,
+            'take_timeouts': self.take_timeouts,
+        }
+
+
+class TimedLock:
+    """
+    记录持有时长的互斥锁
+
+    threading.Condition在wait时通过release/acquire交出和取回锁，
+    因此等待期间不会计入持有时长。
+    """
+
+    def __init__(self, histogram: Histogram):
+        self._lock = threading.Lock()
+        self._histogram = histogram
+        self._acquired_at: float = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self._lock.acquire(blocking, timeout):
+            return False
+        self._acquired_at = time.perf_counter()
+        return True
+
+    def release(self) -> None:
+        # 释放前记录，此时仍持有锁，直方图无需额外同步
+        self._histogram.record(time.perf_counter() - self._acquired_at)
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+
+class TimedCondition(threading.Condition):
+    """
+    记录wait耗时的条件变量
+    """
+
+    def __init__(self, lock: TimedLock, histogram: Histogram):
+        super().__init__(lock)
+        self._histogram = histogram
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        start = time.perf_counter()
+        try:
+            return super().wait(timeout)
+        finally:
+            # wait返回时已重新持有锁
+            self._histogram.record(time.perf_counter() - start)
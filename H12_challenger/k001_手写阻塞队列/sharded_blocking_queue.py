@@ -0,0 +1,253 @@
+import itertools
+import threading
+import time
+from typing import Any, Callable, Generic, Iterator, List, Optional, TypeVar
+
+from blocking_queue import BlockingQueue
+
+
+T = TypeVar('T')
+
+
+class ShardedBlockingQueue(Generic[T]):
+    """
+    分片阻塞队列，把元素分散到多个BlockingQueue通道以降低锁竞争
+
+    特性：
+    1. 总容量按通道均分，所有通道容量之和等于capacity
+    2. 指定key时按hash(key(item))选择通道，同一key的元素保持先进先出；
+       否则轮询选择通道，当前通道已满时先尝试其他通道
+    3. take依次尝试各通道，全部为空时才阻塞，任一通道放入元素都会唤醒它
+    4. 只有存在阻塞中的消费者时，生产者才会触碰共享的唤醒锁
+    5. close()关闭所有通道，可用for循环消费直到取空
+    """
+
+    def __init__(self, capacity: int = 10, lanes: int = 4,
+                 key: Optional[Callable[[T], Any]] = None):
+        """
+        初始化分片阻塞队列
+
+        Args:
+            capacity: 队列总容量，必须不小于lanes
+            lanes: 通道数量，必须大于0
+            key: 计算分片键的函数，None表示轮询分配
+
+        Raises:
+            ValueError: 当lanes小于等于0或capacity小于lanes时抛出
+        """
+        if lanes <= 0:
+            raise ValueError(f"通道数量必须大于0，当前值: {lanes}")
+        if capacity < lanes:
+            raise ValueError(
+                f"队列容量不能小于通道数量，当前值: {capacity} < {lanes}")
+
+        base, extra = divmod(capacity, lanes)
+        self._lanes: List[BlockingQueue[T]] = [
+            BlockingQueue[T](capacity=base + (1 if i < extra else 0))
+            for i in range(lanes)
+        ]
+        self._capacity: int = capacity
+        self._key: Optional[Callable[[T], Any]] = key
+        self._put_counter = itertools.count()
+        self._take_counter = itertools.count()
+
+        # 所有通道都为空时，消费者在这里等待
+        self._available = threading.Condition(threading.Lock())
+        self._waiting_takers: int = 0
+        self._generation: int = 0
+        self._closed: bool = False
+
+    def put(self, item: T, timeout: Optional[float] = None) -> bool:
+        """
+        将元素放入某个通道，如果该通道已满则阻塞直到有空间可用
+
+        Args:
+            item: 要放入的元素
+            timeout: 超时时间（秒），None表示无限等待
+
+        Returns:
+            bool: 成功放入返回True，超时或队列已关闭返回False
+
+        Raises:
+            TypeError: 当item为None时抛出
+        """
+        if item is None:
+            raise TypeError("不允许放入None元素")
+
+        if self._key is not None:
+            lane = self._lanes[hash(self._key(item)) % len(self._lanes)]
+            if not lane.put(item, timeout):
+                return False
+        else:
+            start = next(self._put_counter)
+            if not self._offer_any(item, start):
+                lane = self._lanes[start % len(self._lanes)]
+                if not lane.put(item, timeout):
+                    return False
+
+        self._notify_taker()
+        return True
+
+    def take(self, timeout: Optional[float] = None) -> Optional[T]:
+        """
+        依次尝试各通道取出元素，全部为空时阻塞直到任一通道有元素
+
+        Args:
+            timeout: 超时时间（秒），None表示无限等待
+
+        Returns:
+            Optional[T]: 取出的元素，超时或队列已关闭且为空时返回None
+        """
+        item = self._poll_any()
+        if item is not None:
+            return item
+
+        end_time = None if timeout is None else time.time() + timeout
+        with self._available:
+            self._waiting_takers += 1
+        try:
+            while True:
+                # 先记录版本号再扫描，扫描期间的放入会让版本号变化
+                with self._available:
+                    generation = self._generation
+                item = self._poll_any()
+                if item is not None:
+                    return item
+
+                with self._available:
+                    if self._generation != generation:
+                        continue
+                    if self._closed:
+                        return None
+                    if end_time is None:
+                        self._available.wait()
+                    else:
+                        remaining = end_time - time.time()
+                        if remaining <= 0:
+                            return None
+                        self._available.wait(remaining)
+        finally:
+            with self._available:
+                self._waiting_takers -= 1
+
+    def offer(self, item: T, timeout: Optional[float] = None) -> bool:
+        """
+        尝试将元素放入队列，如果队列已满则阻塞指定时间
+
+        Args:
+            item: 要放入的元素
+            timeout: 超时时间（秒），None表示不等待
+
+        Returns:
+            bool: 成功放入返回True，失败返回False
+        """
+        if timeout is None:
+            timeout = 0
+        return self.put(item, timeout)
+
+    def poll(self, timeout: Optional[float] = None) -> Optional[T]:
+        """
+        尝试从队列取出元素，如果队列为空则阻塞指定时间
+
+        Args:
+            timeout: 超时时间（秒），None表示不等待
+
+        Returns:
+            Optional[T]: 取出的元素，失败返回None
+        """
+        if timeout is None:
+            timeout = 0
+        return self.take(timeout)
+
+    def size(self) -> int:
+        """
+        获取队列当前元素数量，各通道分别计数，并发读写时为近似值
+
+        Returns:
+            int: 所有通道的元素数量之和
+        """
+        return sum(lane.size() for lane in self._lanes)
+
+    def is_empty(self) -> bool:
+        """
+        判断队列是否为空
+        """
+        return all(lane.is_empty() for lane in self._lanes)
+
+    def is_full(self) -> bool:
+        """
+        判断队列是否已满
+        """
+        return all(lane.is_full() for lane in self._lanes)
+
+    def remaining_capacity(self) -> int:
+        """
+        获取队列剩余容量
+        """
+        return self._capacity - self.size()
+
+    def clear(self) -> None:
+        """
+        清空所有通道，并唤醒各通道上等待的生产者
+        """
+        for lane in self._lanes:
+            lane.clear()
+
+    def close(self) -> None:
+        """
+        关闭所有通道并唤醒所有阻塞中的put和take
+        """
+        for lane in self._lanes:
+            lane.close()
+        with self._available:
+            self._closed = True
+            self._generation += 1
+            self._available.notify_all()
+
+    def is_closed(self) -> bool:
+        """
+        判断队列是否已关闭
+        """
+        with self._available:
+            return self._closed
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        依次取出元素，队列关闭且取空后结束迭代
+        """
+        while True:
+            item = self.take()
+            if item is None:
+                return
+            yield item
+
+    def _offer_any(self, item: T, start: int) -> bool:
+        """
+        从start通道开始依次尝试不阻塞地放入
+        """
+        count = len(self._lanes)
+        for i in range(count):
+            if self._lanes[(start + i) % count].offer(item, 0):
+                return True
+        return False
+
+    def _poll_any(self) -> Optional[T]:
+        """
+        从轮询起点开始依次尝试不阻塞地取出
+        """
+        count = len(self._lanes)
+        start = next(self._take_counter)
+        for i in range(count):
+            item = self._lanes[(start + i) % count].poll()
+            if item is not None:
+                return item
+        return None
+
+    def _notify_taker(self) -> None:
+        """
+        有消费者阻塞时唤醒其中一个
+        """
+        if self._waiting_takers:
+            with self._available:
+                self._generation += 1
+                self._available.notify()
@@ -0,0 +1,253 @@
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from collections import deque
+from typing import Any, Deque, Generic, Iterable, Optional, TypeVar
+
+from blocking_queue import BlockingQueue
+
+
+T = TypeVar('T')
+
+# 每条记录前的长度字段
+_LENGTH = struct.Struct('<I')
+
+
+class _Segment:
+    """
+    只追加写的内存映射段文件
+
+    文件在创建时按固定大小预分配，写指针只向后移动；
+    读指针追上写指针且不再写入时，整个文件被删除。
+    """
+
+    def __init__(self, directory: Optional[str], size: int):
+        fd, self.path = tempfile.mkstemp(
+            prefix='blocking_queue_', suffix='.seg', dir=directory)
+        try:
+            os.ftruncate(fd, size)
+            self.mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.size: int = size
+        self.write_offset: int = 0
+        self.read_offset: int = 0
+
+    def fits(self, length: int) -> bool:
+        return self.write_offset + _LENGTH.size + length <= self.size
+
+    def append(self, payload: bytes) -> None:
+        _LENGTH.pack_into(self.mm, self.write_offset, len(payload))
+        start = self.write_offset + _LENGTH.size
+        self.mm[start:start + len(payload)] = payload
+        self.write_offset = start + len(payload)
+
+    def read(self) -> bytes:
+        length = _LENGTH.unpack_from(self.mm, self.read_offset)[0]
+        start = self.read_offset + _LENGTH.size
+        self.read_offset = start + length
+        return self.mm[start:start + length]
+
+    def exhausted(self) -> bool:
+        return self.read_offset >= self.write_offset
+
+    def rewind(self) -> None:
+        """
+        已读完时复用文件，从头开始写
+        """
+        self.write_offset = 0
+        self.read_offset = 0
+
+    def delete(self) -> None:
+        self.mm.close()
+        os.unlink(self.path)
+
+
+class SpillBuffer(Generic[T]):
+    """
+    内存加磁盘的两级先进先出存储
+
+    内存部分最多保存memory_capacity个元素；一旦溢出，
+    之后放入的元素都序列化后追加到段文件，直到磁盘上的元素全部被取走，
+    从而保证内存中的元素总是比磁盘上的更早，整体保持先进先出。
+    接口与BlockingQueue用到的deque方法一致。
+    """
+
+    def __init__(self, memory_capacity: int, disk_budget: int,
+                 segment_size: int, directory: Optional[str] = None):
+        """
+        初始化两级存储
+
+        Args:
+            memory_capacity: 内存中最多保存的元素数量
+            disk_budget: 磁盘上未取出记录的总字节数上限
+            segment_size: 每个段文件的预分配大小（字节）
+            directory: 段文件所在目录，None表示系统临时目录
+        """
+        self._memory: Deque[T] = deque()
+        self._memory_capacity: int = memory_capacity
+        self._segments: Deque[_Segment] = deque()
+        self._segment_size: int = segment_size
+        self._directory: Optional[str] = directory
+        self._disk_budget: int = disk_budget
+        self.disk_items: int = 0
+        self.disk_bytes: int = 0
+
+    def __len__(self) -> int:
+        return len(self._memory) + self.disk_items
+
+    def disk_full(self) -> bool:
+        """
+        磁盘预算是否已用完
+        """
+        return self.disk_bytes >= self._disk_budget
+
+    def append(self, item: T) -> None:
+        """
+        放入元素，内存已满或已有元素溢出到磁盘时写入段文件
+        """
+        if self.disk_items == 0 and len(self._memory) < self._memory_capacity:
+            self._memory.append(item)
+            return
+
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        segment = self._segments[-1] if self._segments else None
+        if segment is None or not segment.fits(len(payload)):
+            segment = _Segment(self._directory, max(
+                self._segment_size, _LENGTH.size + len(payload)))
+            self._segments.append(segment)
+        segment.append(payload)
+        self.disk_items += 1
+        self.disk_bytes += _LENGTH.size + len(payload)
+
+    def extend(self, items: Iterable[T]) -> None:
+        """
+        依次放入多个元素
+        """
+        for item in items:
+            self.append(item)
+
+    def popleft(self) -> T:
+        """
+        取出最早放入的元素
+
+        Raises:
+            IndexError: 当存储为空时抛出
+        """
+        if self._memory:
+            return self._memory.popleft()
+        if self.disk_items == 0:
+            raise IndexError("存储为空")
+
+        segment = self._segments[0]
+        payload = segment.read()
+        self.disk_items -= 1
+        self.disk_bytes -= _LENGTH.size + len(payload)
+        if segment.exhausted():
+            if len(self._segments) > 1:
+                self._segments.popleft().delete()
+            else:
+                segment.rewind()
+        return pickle.loads(payload)
+
+    def clear(self) -> None:
+        """
+        清空内存中的元素并删除所有段文件
+        """
+        self._memory.clear()
+        while self._segments:
+            self._segments.popleft().delete()
+        self.disk_items = 0
+        self.disk_bytes = 0
+
+
+class SpillingBlockingQueue(BlockingQueue[T]):
+    """
+    内存满后溢出到磁盘的阻塞队列
+
+    特性：
+    1. 内存中最多保存capacity个元素，超出部分追加到内存映射段文件
+    2. 磁盘上的元素按先进先出顺序读回，读完的段文件被删除
+    3. 只有磁盘预算用完时put才会阻塞
+    4. 元素必须可以pickle
+    """
+
+    def __init__(self, capacity: int = 10,
+                 disk_budget: int = 64 * 1024 * 1024,
+                 segment_size: int = 1024 * 1024,
+                 directory: Optional[str] = None,
+                 metrics: bool = False):
+        """
+        初始化溢出阻塞队列
+
+        Args:
+            capacity: 内存中最多保存的元素数量，必须大于0
+            disk_budget: 磁盘上未取出记录的总字节数上限，必须大于0；
+                         最后一条写入的记录可能使用量略超出该值
+            segment_size: 每个段文件的预分配大小（字节），必须大于0
+            directory: 段文件所在目录，None表示系统临时目录
+            metrics: 是否统计竞争指标
+
+        Raises:
+            ValueError: 当capacity、disk_budget或segment_size小于等于0时抛出
+        """
+        super().__init__(capacity, metrics=metrics)
+        if disk_budget <= 0:
+            raise ValueError(f"磁盘预算必须大于0，当前值: {disk_budget}")
+        if segment_size <= 0:
+            raise ValueError(f"段文件大小必须大于0，当前值: {segment_size}")
+        self._queue = SpillBuffer(capacity, disk_budget, segment_size,
+                                  directory)
+
+    def spilled(self) -> int:
+        """
+        获取当前溢出到磁盘的元素数量
+
+        Returns:
+            int: 磁盘上的元素数量
+        """
+        with self._lock:
+            return self._queue.disk_items
+
+    def disk_usage(self) -> int:
+        """
+        获取磁盘上未取出记录的总字节数
+
+        Returns:
+            int: 字节数
+        """
+        with self._lock:
+            return self._queue.disk_bytes
+
+    def remaining_capacity(self) -> int:
+        """
+        获取内存中剩余的槽位数量，已有元素溢出到磁盘时为0
+
+        Returns:
+            int: 剩余内存槽位
+        """
+        with self._lock:
+            if self._queue.disk_items:
+                return 0
+            return max(self._capacity - len(self._queue), 0)
+
+    def release(self) -> None:
+        """
+        清空队列并删除所有段文件，不再使用队列时调用
+        """
+        self.clear()
+
+    def _is_full_locked(self) -> bool:
+        return self._queue.disk_full()
+
+    def _free_slots_locked(self) -> int:
+        # 磁盘记录长度要序列化后才知道，批量放入时逐个检查预算
+        return 0 if self._queue.disk_full() else 1
+
+    def __enter__(self) -> 'SpillingBlockingQueue[T]':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.release()
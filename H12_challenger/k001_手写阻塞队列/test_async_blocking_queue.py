@@ -0,0 +1,148 @@
+from async_blocking_queue import AsyncBlockingQueue
+import asyncio
+import threading
+import time
+
+
+def thread_producer(queue: AsyncBlockingQueue[int], producer_id: int,
+                    count: int) -> None:
+    """
+    线程生产者，通过同步视图放入元素
+
+    Args:
+        queue: 异步阻塞队列实例
+        producer_id: 生产者ID
+        count: 放入的元素数量
+    """
+    for i in range(count):
+        queue.sync.put(producer_id * 1000 + i)
+        time.sleep(0.001)
+
+
+def test_async_basic_usage() -> None:
+    """
+    测试协程中的基本put/take
+    """
+    print("=== 测试异步基本使用 ===")
+
+    async def run() -> None:
+        queue: AsyncBlockingQueue[int] = AsyncBlockingQueue[int](capacity=2)
+        assert await queue.put(1)
+        assert await queue.put(2)
+        assert queue.is_full()
+
+        # 队列已满，offer超时返回False
+        assert await queue.offer(3, timeout=0.1) is False
+
+        assert await queue.take() == 1
+        assert await queue.take() == 2
+
+        # 队列为空，poll超时返回None
+        assert await queue.poll(timeout=0.1) is None
+        print(f"队列大小: {queue.size()}")
+
+    asyncio.run(run())
+
+
+def test_thread_producers_async_consumer() -> None:
+    """
+    测试多个线程生产、单个事件循环消费
+    """
+    print("\n=== 测试线程生产者-协程消费者 ===")
+
+    async def run() -> list:
+        queue: AsyncBlockingQueue[int] = AsyncBlockingQueue[int](capacity=3)
+        producers = [
+            threading.Thread(target=thread_producer, args=(queue, i, 20))
+            for i in range(3)
+        ]
+        for p in producers:
+            p.start()
+
+        received = [await queue.take(timeout=5) for _ in range(60)]
+
+        for p in producers:
+            p.join()
+        return received
+
+    received = asyncio.run(run())
+    print(f"共取出 {len(received)} 个元素")
+    assert None not in received
+    assert sorted(received) == sorted(
+        i * 1000 + j for i in range(3) for j in range(20))
+
+
+def test_async_producer_thread_consumer() -> None:
+    """
+    测试协程放入满队列时被线程消费者唤醒
+    """
+    print("\n=== 测试协程生产者-线程消费者 ===")
+    received: list = []
+
+    async def run() -> None:
+        queue: AsyncBlockingQueue[int] = AsyncBlockingQueue[int](capacity=1)
+
+        def consumer() -> None:
+            for _ in range(10):
+                received.append(queue.sync.take())
+
+        consumer_thread = threading.Thread(target=consumer)
+        consumer_thread.start()
+        for i in range(10):
+            assert await queue.put(i, timeout=5)
+        await asyncio.get_running_loop().run_in_executor(
+            None, consumer_thread.join)
+
+    asyncio.run(run())
+    assert received == list(range(10))
+
+
+def test_cancelled_take_passes_wakeup() -> None:
+    """
+    测试被取消的take不会吞掉唤醒
+    """
+    print("\n=== 测试取消等待 ===")
+
+    async def run() -> None:
+        queue: AsyncBlockingQueue[int] = AsyncBlockingQueue[int](capacity=2)
+        first = asyncio.ensure_future(queue.take())
+        second = asyncio.ensure_future(queue.take(timeout=2))
+        await asyncio.sleep(0.05)
+
+        first.cancel()
+        queue.sync.put(7)
+        assert await second == 7
+
+    asyncio.run(run())
+
+
+def test_async_close_and_iterate() -> None:
+    """
+    测试关闭后async for取空结束，阻塞中的take被唤醒
+    """
+    print("\n=== 测试异步关闭与迭代 ===")
+
+    async def run() -> list:
+        queue: AsyncBlockingQueue[int] = AsyncBlockingQueue[int](capacity=4)
+
+        def producer() -> None:
+            for i in range(10):
+                queue.sync.put(i)
+            queue.close()
+
+        threading.Thread(target=producer).start()
+        received = [item async for item in queue]
+
+        assert await queue.put(1) is False
+        assert await queue.take() is None
+        return received
+
+    assert asyncio.run(run()) == list(range(10))
+
+
+if __name__ == "__main__":
+    test_async_basic_usage()
+    # test_thread_producers_async_consumer()
+    # test_async_producer_thread_consumer()
+    # test_cancelled_take_passes_wakeup()
+    # test_async_close_and_iterate()
@@ -123,8 +123,187 @@ def test_exception_handling() -> None:
         print(f"捕获到None元素异常: {e}")
 
 
+def test_batch_operations() -> None:
+    """
+    测试批量放入和批量取出
+    """
+    print("\n=== 测试批量操作 ===")
+    queue: BlockingQueue[int] = BlockingQueue[int](capacity=5)
+
+    # 超出容量时只放入能容纳的部分
+    count = queue.put_all(range(8), timeout=0.1)
+    print(f"批量放入(超时0.1秒): {count}")
+    assert count == 5
+    assert queue.is_full()
+
+    # 按max_items限制取出数量
+    items: list = []
+    assert queue.drain_to(items, max_items=3) == 3
+    assert items == [0, 1, 2]
+
+    # 取出剩余全部元素
+    assert queue.drain_to(items) == 2
+    assert items == [0, 1, 2, 3, 4]
+    assert queue.is_empty()
+
+    # 空队列等待超时返回0
+    assert queue.drain_to(items, timeout=0.1) == 0
+
+    # 含None时整批拒绝
+    try:
+        queue.put_all([1, None])
+    except TypeError as e:
+        print(f"捕获到None元素异常: {e}")
+    assert queue.is_empty()
+
+
+def test_batch_producer_consumer() -> None:
+    """
+    测试批量放入在消费者并发取出时能全部完成
+    """
+    print("\n=== 测试批量生产者-消费者 ===")
+    queue: BlockingQueue[int] = BlockingQueue[int](capacity=4)
+    received: list = []
+
+    def batch_consumer() -> None:
+        while len(received) < 100:
+            queue.drain_to(received, max_items=3, timeout=0.1)
+
+    consumer_thread = threading.Thread(target=batch_consumer)
+    consumer_thread.start()
+
+    # 容量只有4，put_all需要多次等待消费者腾出空间
+    assert queue.put_all(range(100)) == 100
+    consumer_thread.join()
+
+    print(f"共取出 {len(received)} 个元素")
+    assert received == list(range(100))
+
+
+def test_ring_storage() -> None:
+    """
+    测试环形缓冲区存储模式
+    """
+    print("\n=== 测试环形缓冲区存储 ===")
+    queue: BlockingQueue[int] = BlockingQueue[int](capacity=3, storage="ring")
+
+    # 多轮放入取出，让head/tail下标绕回
+    for round_no in range(4):
+        assert queue.put_all([round_no, round_no + 1]) == 2
+        assert queue.take() == round_no
+        assert queue.take() == round_no + 1
+    print(f"多轮绕回后队列为空: {queue.is_empty()}")
+
+    queue.put(1)
+    queue.put(2)
+    queue.put(3)
+    assert queue.is_full()
+    assert queue.offer(4, timeout=0.1) is False
+
+    queue.clear()
+    assert queue.is_empty()
+    assert queue.remaining_capacity() == 3
+
+    # 不支持的存储类型
+    try:
+        BlockingQueue[int](capacity=3, storage="list")
+    except ValueError as e:
+        print(f"捕获到存储类型异常: {e}")
+
+
+def test_metrics() -> None:
+    """
+    测试竞争指标统计
+    """
+    print("\n=== 测试竞争指标 ===")
+    assert BlockingQueue[int](capacity=2).metrics() is None
+
+    queue: BlockingQueue[int] = BlockingQueue[int](capacity=2, metrics=True)
+    queue.put(1)
+    queue.put(2)
+    assert queue.offer(3, timeout=0.05) is False
+    queue.take()
+    queue.take()
+    assert queue.poll(timeout=0.05) is None
+
+    # 消费者先阻塞，再由生产者唤醒
+    consumer = threading.Thread(target=queue.take)
+    consumer.start()
+    time.sleep(0.05)
+    queue.put(4)
+    consumer.join()
+
+    snapshot = queue.metrics()
+    print(f"指标快照: high_water_mark={snapshot['high_water_mark']}, "
+          f"put_timeouts={snapshot['put_timeouts']}, "
+          f"take_timeouts={snapshot['take_timeouts']}")
+    assert snapshot['high_water_mark'] == 2
+    assert snapshot['put_timeouts'] == 1
+    assert snapshot['take_timeouts'] == 1
+    assert snapshot['not_full_wait']['count'] >= 1
+    assert snapshot['not_empty_wait']['max'] >= 0.04
+    assert snapshot['lock_hold']['count'] > 0
+    buckets = snapshot['lock_hold']['buckets']
+    assert sum(count for _, count in buckets) == snapshot['lock_hold']['count']
+
+
+def test_close_and_iterate() -> None:
+    """
+    测试关闭队列后唤醒阻塞调用，并用for循环串联多级流水线
+    """
+    print("\n=== 测试关闭与迭代 ===")
+
+    # 阻塞中的take和put在关闭时立即返回
+    empty: BlockingQueue[int] = BlockingQueue[int](capacity=1)
+    full: BlockingQueue[int] = BlockingQueue[int](capacity=1)
+    full.put(1)
+    results: list = []
+    waiters = [threading.Thread(target=lambda: results.append(empty.take())),
+               threading.Thread(target=lambda: results.append(full.put(2)))]
+    for w in waiters:
+        w.start()
+    time.sleep(0.05)
+    start = time.time()
+    empty.close()
+    full.close()
+    for w in waiters:
+        w.join(timeout=1)
+    assert sorted(results, key=str) == [False, None]
+    assert time.time() - start < 0.5
+
+    # 关闭后拒绝放入，但剩余元素仍可取出
+    assert full.is_closed()
+    assert full.put(3) is False
+    assert list(full) == [1]
+
+    # 两级流水线：source -> square -> sink
+    source: BlockingQueue[int] = BlockingQueue[int](capacity=2)
+    squared: BlockingQueue[int] = BlockingQueue[int](capacity=2)
+
+    def stage() -> None:
+        for item in source:
+            squared.put(item * item)
+        squared.close()
+
+    worker = threading.Thread(target=stage)
+    worker.start()
+    for i in range(1, 6):
+        source.put(i)
+    source.close()
+
+    result = list(squared)
+    worker.join()
+    print(f"流水线结果: {result}")
+    assert result == [1, 4, 9, 16, 25]
+
+
 if __name__ == "__main__":
     test_basic_usage()
     # test_timeout()
     # test_exception_handling()
     # test_producer_consumer()
+    # test_batch_operations()
+    # test_batch_producer_consumer()
+    # test_ring_storage()
+    # test_metrics()
+    # test_close_and_iterate()
@@ -0,0 +1,109 @@
+from priority_blocking_queue import PriorityBlockingQueue, DelayQueue
+import threading
+import time
+
+
+def test_priority_order() -> None:
+    """
+    测试优先级队列按排序键取出，排序键相同时先进先出
+    """
+    print("=== 测试优先级顺序 ===")
+    queue: PriorityBlockingQueue[int] = PriorityBlockingQueue[int](capacity=5)
+    for item in [5, 1, 4, 2, 3]:
+        queue.put(item)
+    assert queue.is_full()
+    assert queue.offer(0, timeout=0.1) is False
+
+    result = [queue.take() for _ in range(5)]
+    print(f"取出顺序: {result}")
+    assert result == [1, 2, 3, 4, 5]
+    assert queue.poll(timeout=0.1) is None
+
+    # 元素不可比较时按key排序，相同key保持放入顺序
+    tasks = PriorityBlockingQueue(capacity=4, key=lambda task: task[0])
+    tasks.put_all([(2, {"name": "b"}), (1, {"name": "a"}),
+                   (2, {"name": "c"})])
+    names: list = []
+    tasks.drain_to(names)
+    assert [task[1]["name"] for task in names] == ["a", "b", "c"]
+
+
+def test_delay_queue_take() -> None:
+    """
+    测试延迟队列在元素到期后才能取出
+    """
+    print("\n=== 测试延迟队列 ===")
+    queue: DelayQueue[str] = DelayQueue[str](capacity=5)
+    queue.put("late", delay=0.3)
+    queue.put("early", delay=0.1)
+
+    # 未到期时poll立即返回None，drain_to不取出任何元素
+    assert queue.poll() is None
+    items: list = []
+    assert queue.drain_to(items) == 0
+
+    start = time.monotonic()
+    assert queue.take() == "early"
+    assert queue.take() == "late"
+    elapsed = time.monotonic() - start
+    print(f"两个元素共等待 {elapsed:.2f} 秒")
+    assert 0.25 <= elapsed < 1
+
+    # 超时早于到期时间返回None
+    queue.put("never", delay=10)
+    assert queue.take(timeout=0.1) is None
+
+
+def test_delay_queue_earlier_item_wakes_consumer() -> None:
+    """
+    测试等待中的消费者被更早到期的新元素唤醒
+    """
+    print("\n=== 测试更早元素唤醒 ===")
+    queue: DelayQueue[str] = DelayQueue[str](capacity=5)
+    queue.put("slow", delay=5)
+    result: list = []
+
+    consumer = threading.Thread(target=lambda: result.append(queue.take()))
+    consumer.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    queue.put("fast", delay=0.1)
+    consumer.join(timeout=2)
+    elapsed = time.monotonic() - start
+    print(f"消费者在 {elapsed:.2f} 秒后取出: {result}")
+    assert result == ["fast"]
+    assert elapsed < 1
+
+
+def test_delay_queue_many_consumers() -> None:
+    """
+    测试多个消费者共同取出到期元素
+    """
+    print("\n=== 测试多个消费者 ===")
+    queue: DelayQueue[int] = DelayQueue[int](capacity=20)
+    received: list = []
+    lock = threading.Lock()
+
+    def consumer() -> None:
+        for _ in range(5):
+            item = queue.take(timeout=2)
+            with lock:
+                received.append(item)
+
+    consumers = [threading.Thread(target=consumer) for _ in range(4)]
+    for c in consumers:
+        c.start()
+    for i in range(20):
+        queue.put(i, delay=0.01 * (20 - i))
+    for c in consumers:
+        c.join()
+
+    assert sorted(received) == list(range(20))
+
+
+if __name__ == "__main__":
+    test_priority_order()
+    # test_delay_queue_take()
+    # test_delay_queue_earlier_item_wakes_consumer()
+    # test_delay_queue_many_consumers()
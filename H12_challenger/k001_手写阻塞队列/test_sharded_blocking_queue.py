@@ -0,0 +1,136 @@
+from sharded_blocking_queue import ShardedBlockingQueue
+import threading
+import time
+
+
+def test_sharded_basic_usage() -> None:
+    """
+    测试容量、大小和清空语义
+    """
+    print("=== 测试分片队列基本使用 ===")
+    queue: ShardedBlockingQueue[int] = ShardedBlockingQueue[int](
+        capacity=5, lanes=2)
+
+    # 总容量按通道均分，轮询放入会在通道满时换到其他通道
+    for i in range(5):
+        assert queue.put(i, timeout=0.1)
+    print(f"队列大小: {queue.size()}, 是否已满: {queue.is_full()}")
+    assert queue.size() == 5
+    assert queue.is_full()
+    assert queue.offer(5, timeout=0.05) is False
+
+    assert sorted(queue.take() for _ in range(5)) == [0, 1, 2, 3, 4]
+    assert queue.is_empty()
+    assert queue.poll(timeout=0.05) is None
+
+    queue.put(1)
+    queue.clear()
+    assert queue.remaining_capacity() == 5
+
+    try:
+        ShardedBlockingQueue[int](capacity=2, lanes=4)
+    except ValueError as e:
+        print(f"捕获到容量异常: {e}")
+
+
+def test_sharded_key_keeps_order() -> None:
+    """
+    测试按key分片时同一key的元素保持先进先出
+    """
+    print("\n=== 测试按key分片 ===")
+    queue = ShardedBlockingQueue(capacity=20, lanes=4,
+                                 key=lambda item: item[0])
+    # 整数key的hash是其本身，两个key落在不同通道
+    for i in range(5):
+        queue.put((0, i))
+        queue.put((1, i))
+
+    received = [queue.take() for _ in range(10)]
+    assert [i for k, i in received if k == 0] == list(range(5))
+    assert [i for k, i in received if k == 1] == list(range(5))
+
+
+def test_sharded_blocked_take_wakes() -> None:
+    """
+    测试阻塞中的消费者被任一通道的放入唤醒
+    """
+    print("\n=== 测试阻塞唤醒 ===")
+    queue: ShardedBlockingQueue[int] = ShardedBlockingQueue[int](
+        capacity=8, lanes=4)
+    result: list = []
+
+    consumers = [threading.Thread(
+        target=lambda: result.append(queue.take(timeout=2)))
+        for _ in range(3)]
+    for c in consumers:
+        c.start()
+    time.sleep(0.05)
+
+    for i in range(3):
+        queue.put(i)
+    for c in consumers:
+        c.join()
+    assert sorted(result) == [0, 1, 2]
+
+
+def test_sharded_many_producers() -> None:
+    """
+    测试多生产者多消费者下元素不丢失不重复
+    """
+    print("\n=== 测试多生产者 ===")
+    queue: ShardedBlockingQueue[int] = ShardedBlockingQueue[int](
+        capacity=16, lanes=4)
+    received: list = []
+    lock = threading.Lock()
+
+    def producer(producer_id: int) -> None:
+        for i in range(200):
+            queue.put(producer_id * 1000 + i)
+
+    def consumer() -> None:
+        for _ in range(400):
+            item = queue.take(timeout=5)
+            with lock:
+                received.append(item)
+
+    threads = [threading.Thread(target=producer, args=(i,))
+               for i in range(8)]
+    threads += [threading.Thread(target=consumer) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(received) == sorted(
+        i * 1000 + j for i in range(8) for j in range(200))
+
+
+def test_sharded_close_and_iterate() -> None:
+    """
+    测试关闭后迭代取空所有通道，阻塞中的take被唤醒
+    """
+    print("\n=== 测试分片队列关闭 ===")
+    queue: ShardedBlockingQueue[int] = ShardedBlockingQueue[int](
+        capacity=8, lanes=4)
+    result: list = []
+    waiter = threading.Thread(target=lambda: result.append(queue.take()))
+    waiter.start()
+    time.sleep(0.05)
+    queue.close()
+    waiter.join(timeout=1)
+    assert result == [None]
+
+    queue = ShardedBlockingQueue[int](capacity=8, lanes=4)
+    for i in range(6):
+        queue.put(i)
+    queue.close()
+    assert queue.put(6) is False
+    assert sorted(queue) == list(range(6))
+
+
+if __name__ == "__main__":
+    test_sharded_basic_usage()
+    # test_sharded_key_keeps_order()
+    # test_sharded_blocked_take_wakes()
+    # test_sharded_many_producers()
+    # test_sharded_close_and_iterate()
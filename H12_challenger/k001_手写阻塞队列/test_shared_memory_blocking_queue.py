@@ -0,0 +1,71 @@
+from shared_memory_blocking_queue import SharedMemoryBlockingQueue
+import multiprocessing
+
+
+def process_producer(queue: SharedMemoryBlockingQueue, count: int) -> None:
+    """
+    子进程生产者
+
+    Args:
+        queue: 共享内存阻塞队列实例
+        count: 放入的消息数量
+    """
+    for i in range(count):
+        queue.put(f"消息{i}".encode('utf-8'))
+    queue.release()
+
+
+def test_shared_memory_basic_usage() -> None:
+    """
+    测试同一进程内的基本操作与超时
+    """
+    print("=== 测试共享内存队列基本使用 ===")
+    queue = SharedMemoryBlockingQueue(capacity=2, slot_size=16)
+    try:
+        assert queue.put(b"hello")
+        assert queue.put(memoryview(bytearray(b"world")))
+        assert queue.is_full()
+        assert queue.offer(b"!", timeout=0.1) is False
+
+        assert queue.take() == b"hello"
+        buffer = bytearray(16)
+        length = queue.take_into(buffer)
+        assert bytes(buffer[:length]) == b"world"
+
+        assert queue.poll(timeout=0.1) is None
+        print(f"队列大小: {queue.size()}")
+
+        # 超过槽位大小
+        try:
+            queue.put(b"x" * 17)
+        except ValueError as e:
+            print(f"捕获到长度异常: {e}")
+    finally:
+        queue.release()
+        queue.unlink()
+
+
+def test_cross_process_producer() -> None:
+    """
+    测试子进程生产、父进程消费
+    """
+    print("\n=== 测试跨进程生产者-消费者 ===")
+    queue = SharedMemoryBlockingQueue(capacity=4, slot_size=64)
+    try:
+        producer = multiprocessing.Process(
+            target=process_producer, args=(queue, 50))
+        producer.start()
+
+        received = [queue.take(timeout=5) for _ in range(50)]
+        producer.join()
+
+        print(f"共取出 {len(received)} 条消息")
+        assert received == [f"消息{i}".encode('utf-8') for i in range(50)]
+    finally:
+        queue.release()
+        queue.unlink()
+
+
+if __name__ == "__main__":
+    test_shared_memory_basic_usage()
+    # test_cross_process_producer()
@@ -0,0 +1,63 @@
+from spilling_blocking_queue import SpillingBlockingQueue
+import os
+import tempfile
+import threading
+
+
+def test_spill_and_read_back() -> None:
+    """
+    测试内存满后溢出到磁盘，并按先进先出顺序读回
+    """
+    print("=== 测试溢出到磁盘 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        with SpillingBlockingQueue(capacity=3, segment_size=64,
+                                   directory=directory) as queue:
+            # 超过内存容量也不会阻塞
+            for i in range(20):
+                assert queue.put({"id": i, "body": "x" * i}, timeout=0)
+            print(f"队列大小: {queue.size()}, 溢出: {queue.spilled()}, "
+                  f"磁盘字节: {queue.disk_usage()}")
+            assert queue.size() == 20
+            assert queue.spilled() == 17
+            assert queue.remaining_capacity() == 0
+            assert len(os.listdir(directory)) > 1
+
+            # 读回过程中继续放入，顺序仍然正确
+            received = [queue.take()["id"] for _ in range(10)]
+            queue.put({"id": 20, "body": ""})
+            received += [queue.take()["id"] for _ in range(11)]
+            assert received == list(range(21))
+            assert queue.is_empty()
+            assert queue.spilled() == 0
+
+        # release后段文件全部删除
+        assert os.listdir(directory) == []
+
+
+def test_disk_budget_blocks_producer() -> None:
+    """
+    测试磁盘预算用完后put阻塞，取出后恢复
+    """
+    print("\n=== 测试磁盘预算 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        with SpillingBlockingQueue(capacity=2, disk_budget=100,
+                                   segment_size=256,
+                                   directory=directory) as queue:
+            count = queue.put_all((b"0123456789" * 2 for _ in range(20)),
+                                  timeout=0.05)
+            print(f"批量放入: {count}")
+            assert 2 < count < 20
+            assert queue.is_full()
+            assert queue.offer(b"x", timeout=0.05) is False
+
+            # 消费者取走磁盘上的记录后，生产者继续
+            producer = threading.Thread(target=queue.put, args=(b"last",))
+            producer.start()
+            received = [queue.take(timeout=2) for _ in range(count + 1)]
+            producer.join()
+            assert received[-1] == b"last"
+
+
+if __name__ == "__main__":
+    test_spill_and_read_back()
+    # test_disk_budget_blocks_producer()
@@ -0,0 +1,163 @@
+from work_stealing_executor import WorkStealingExecutor
+import threading
+import time
+
+
+def test_executor_basic_usage() -> None:
+    """
+    测试submit、map和异常传递
+    """
+    print("=== 测试线程池基本使用 ===")
+    with WorkStealingExecutor(max_workers=3, queue_capacity=4) as executor:
+        future = executor.submit(pow, 2, 10)
+        assert future.result(timeout=2) == 1024
+
+        results = list(executor.map(lambda x: x * x, range(20)))
+        print(f"map结果: {results[:5]}...")
+        assert results == [x * x for x in range(20)]
+
+        failed = executor.submit(int, "abc")
+        try:
+            failed.result(timeout=2)
+        except ValueError as e:
+            print(f"捕获到任务异常: {e}")
+
+    try:
+        executor.submit(pow, 2, 2)
+    except RuntimeError as e:
+        print(f"捕获到关闭后提交异常: {e}")
+
+
+def test_executor_backpressure() -> None:
+    """
+    测试所有队列已满时submit阻塞
+    """
+    print("\n=== 测试背压 ===")
+    gate = threading.Event()
+    executor = WorkStealingExecutor(max_workers=1, queue_capacity=1)
+    try:
+        executor.submit(gate.wait)
+        time.sleep(0.05)
+        # 工作线程被占用，队列只能再容纳一个任务
+        executor.submit(gate.wait)
+
+        submitted = threading.Event()
+
+        def blocked_submit() -> None:
+            executor.submit(gate.wait)
+            submitted.set()
+
+        submitter = threading.Thread(target=blocked_submit)
+        submitter.start()
+        assert not submitted.wait(0.1)
+
+        gate.set()
+        assert submitted.wait(2)
+        submitter.join()
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+def test_executor_work_stealing() -> None:
+    """
+    测试空闲线程窃取繁忙线程队列中的任务
+    """
+    print("\n=== 测试工作窃取 ===")
+    gate = threading.Event()
+    executor = WorkStealingExecutor(max_workers=2, queue_capacity=8,
+                                    steal_interval=0.01)
+    try:
+        # 第一个任务阻塞工作线程0，后续短任务轮询分配到两个队列
+        blocker = executor.submit(gate.wait)
+        futures = [executor.submit(time.sleep, 0.001) for _ in range(9)]
+        for future in futures:
+            future.result(timeout=2)
+        gate.set()
+        blocker.result(timeout=2)
+    finally:
+        gate.set()
+        executor.shutdown()
+
+    stats = executor.utilization()
+    print(f"线程统计: {stats}")
+    assert sum(s['tasks'] for s in stats) == 10
+    assert sum(s['stolen'] for s in stats) > 0
+    assert all(0.0 <= s['utilization'] <= 1.0 for s in stats)
+
+
+def test_executor_cancel_futures() -> None:
+    """
+    测试关闭时取消未开始的任务
+    """
+    print("\n=== 测试关闭时取消任务 ===")
+    gate = threading.Event()
+    executor = WorkStealingExecutor(max_workers=1, queue_capacity=4)
+    running = executor.submit(gate.wait)
+    time.sleep(0.05)
+    pending = [executor.submit(pow, 2, i) for i in range(3)]
+
+    executor.shutdown(wait=False, cancel_futures=True)
+    gate.set()
+    executor.shutdown()
+
+    assert running.result(timeout=2) is True
+    assert all(future.cancelled() for future in pending)
+
+
+class SlowStealExecutor(WorkStealingExecutor):
+    """
+    窃取落空后停顿一下，放大"窃取之后、退出之前"有任务入队的时间窗口
+    """
+
+    def _steal(self, thief):
+        item = super()._steal(thief)
+        if item is None:
+            time.sleep(0.002)
+        return item
+
+
+def test_executor_submit_during_shutdown() -> None:
+    """
+    测试关闭期间并发提交，shutdown返回时已提交的任务全部完成
+    """
+    print("\n=== 测试关闭期间提交 ===")
+    total = 0
+    for _ in range(10):
+        executor = SlowStealExecutor(
+            max_workers=2, queue_capacity=8, steal_interval=0)
+        futures = []
+        lock = threading.Lock()
+        started = threading.Barrier(5)
+
+        def submitter() -> None:
+            started.wait()
+            while True:
+                try:
+                    future = executor.submit(pow, 2, 3)
+                except RuntimeError:
+                    return
+                with lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=submitter) for _ in range(4)]
+        for t in threads:
+            t.start()
+        started.wait()
+        time.sleep(0.005)
+        executor.shutdown(wait=True)
+        for t in threads:
+            t.join()
+
+        pending = [f for f in futures if not f.done()]
+        assert not pending, f"{len(pending)}/{len(futures)} 个任务未完成"
+        total += len(futures)
+    print(f"关闭期间共提交 {total} 个任务，全部完成")
+
+
+if __name__ == "__main__":
+    test_executor_basic_usage()
+    # test_executor_backpressure()
+    # test_executor_work_stealing()
+    # test_executor_cancel_futures()
+    # test_executor_submit_during_shutdown()
@@ -0,0 +1,201 @@
+import itertools
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from blocking_queue import BlockingQueue
+
+
+_WorkItem = Tuple[Future, Callable[..., Any], tuple, dict]
+
+
+class _Worker:
+    """
+    单个工作线程的任务队列与运行统计
+    """
+
+    def __init__(self, index: int, capacity: int):
+        self.index: int = index
+        self.queue: BlockingQueue[_WorkItem] = BlockingQueue(capacity)
+        self.thread: Optional[threading.Thread] = None
+        self.tasks: int = 0
+        self.stolen: int = 0
+        self.busy_seconds: float = 0.0
+
+
+class WorkStealingExecutor(Executor):
+    """
+    基于BlockingQueue的工作窃取线程池，兼容concurrent.futures.Executor
+
+    特性：
+    1. 每个工作线程有自己的有界BlockingQueue，submit按轮询分配任务
+    2. 所有队列都满时submit阻塞，由队列容量提供背压，内存不会无限增长
+    3. 工作线程自己的队列为空时，从其他线程的队列中窃取任务
+    4. shutdown后拒绝新任务，已提交的任务执行完毕后线程退出
+    5. utilization()报告每个工作线程的任务数、窃取数和忙碌比例
+    """
+
+    def __init__(self, max_workers: int = 4, queue_capacity: int = 64,
+                 steal_interval: float = 0.05,
+                 thread_name_prefix: str = "WorkStealingExecutor"):
+        """
+        初始化线程池并启动所有工作线程
+
+        Args:
+            max_workers: 工作线程数量，必须大于0
+            queue_capacity: 每个工作线程队列的容量，必须大于0
+            steal_interval: 空闲线程阻塞等待的最长时间（秒），
+                            超过后检查其他队列是否有可窃取的任务
+            thread_name_prefix: 工作线程名称前缀
+
+        Raises:
+            ValueError: 当max_workers或queue_capacity小于等于0时抛出
+        """
+        if max_workers <= 0:
+            raise ValueError(f"工作线程数量必须大于0，当前值: {max_workers}")
+
+        self._workers: List[_Worker] = [
+            _Worker(i, queue_capacity) for i in range(max_workers)]
+        self._steal_interval: float = steal_interval
+        self._counter = itertools.count()
+        self._shutdown: bool = False
+        self._shutdown_lock = threading.Lock()
+        self._started_at: float = time.perf_counter()
+
+        for worker in self._workers:
+            worker.thread = threading.Thread(
+                target=self._run_worker, args=(worker,),
+                name=f"{thread_name_prefix}_{worker.index}", daemon=True)
+            worker.thread.start()
+
+    def submit(self, fn: Callable[..., Any], /, *args, **kwargs) -> Future:
+        """
+        提交任务，所有工作线程队列都已满时阻塞直到有空间
+
+        Args:
+            fn: 要执行的可调用对象
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            Future: 任务结果
+
+        Raises:
+            RuntimeError: 当线程池已关闭时抛出
+        """
+        future: Future = Future()
+        item = (future, fn, args, kwargs)
+        count = len(self._workers)
+        with self._shutdown_lock:
+            if self._shutdown:
+                raise RuntimeError("线程池已关闭，不能提交新任务")
+            # 队列在同一把锁内关闭，这里放入的任务一定在关闭之前入队
+            start = next(self._counter)
+            for i in range(count):
+                if self._workers[(start + i) % count].queue.offer(item, 0):
+                    return future
+
+        # 所有队列都已满，释放锁后在轮询到的队列上阻塞形成背压；
+        # 等待期间线程池关闭时put返回False，任务没有入队
+        if not self._workers[start % count].queue.put(item):
+            raise RuntimeError("线程池已关闭，不能提交新任务")
+        return future
+
+    def shutdown(self, wait: bool = True, *,
+                 cancel_futures: bool = False) -> None:
+        """
+        关闭线程池
+
+        Args:
+            wait: 是否等待所有工作线程退出
+            cancel_futures: 是否取消尚未开始执行的任务
+        """
+        with self._shutdown_lock:
+            self._shutdown = True
+            # 关闭后空闲线程的take立即返回，不必等到steal_interval
+            for worker in self._workers:
+                worker.queue.close()
+            if cancel_futures:
+                for worker in self._workers:
+                    pending: List[_WorkItem] = []
+                    worker.queue.drain_to(pending)
+                    for future, _, _, _ in pending:
+                        future.cancel()
+
+        if wait:
+            for worker in self._workers:
+                worker.thread.join()
+
+    def utilization(self) -> List[Dict[str, Any]]:
+        """
+        获取每个工作线程的运行统计
+
+        Returns:
+            List[Dict[str, Any]]: 每项包含worker、tasks、stolen、
+            busy_seconds和utilization（忙碌时间占线程池运行时间的比例）
+        """
+        elapsed = time.perf_counter() - self._started_at
+        return [
+            {
+                'worker': worker.index,
+                'tasks': worker.tasks,
+                'stolen': worker.stolen,
+                'busy_seconds': worker.busy_seconds,
+                'utilization': worker.busy_seconds / elapsed if elapsed else 0.0,
+            }
+            for worker in self._workers
+        ]
+
+    def _run_worker(self, worker: _Worker) -> None:
+        """
+        工作线程主循环：先取自己的队列，再窃取，最后阻塞等待
+
+        只有自己的队列已关闭且取空时才退出：关闭后不会再有任务入队，
+        每个线程都会取完自己的队列，已提交的任务不会丢失。
+        """
+        while True:
+            item = worker.queue.poll()
+            if item is None:
+                item = self._steal(worker)
+                if item is not None:
+                    worker.stolen += 1
+            if item is None:
+                item = worker.queue.take(self._steal_interval)
+                if item is None:
+                    if not worker.queue.is_closed():
+                        continue
+                    # 退出前最后窃取一轮，帮其他线程分担剩余任务
+                    item = self._steal(worker)
+                    if item is None:
+                        return
+                    worker.stolen += 1
+
+            start = time.perf_counter()
+            self._execute(item)
+            worker.busy_seconds += time.perf_counter() - start
+            worker.tasks += 1
+
+    def _steal(self, thief: _Worker) -> Optional[_WorkItem]:
+        """
+        从其他工作线程的队列中取出一个任务
+        """
+        count = len(self._workers)
+        for i in range(1, count):
+            victim = self._workers[(thief.index + i) % count]
+            item = victim.queue.poll()
+            if item is not None:
+                return item
+        return None
+
+    @staticmethod
+    def _execute(item: _WorkItem) -> None:
+        future, fn, args, kwargs = item
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
@@ -0,0 +1,113 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from sqlite_pool import PRAGMAS, SQLitePool
+
+ROW_COUNT = 10000
+READERS = 4
+WRITERS = 2
+DURATION = 3.0
+
+
+def create_database(database):
+    """
+    创建与示例相同结构的users表并写入测试数据
+    """
+    conn = sqlite3.connect(database)
+    conn.execute('''
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            email TEXT NOT NULL UNIQUE,
+            age INTEGER NOT NULL
+        )''')
+    conn.executemany(
+        'INSERT INTO users (name, email, age) VALUES (?, ?, ?)',
+        [(f"user{i}", f"user{i}@example.com", i % 80) for i in range(ROW_COUNT)])
+    conn.commit()
+    conn.close()
+
+
+def run_mixed_load(database, pragmas):
+    """
+    读线程按主键查询，写线程逐条更新并提交，与示例中每个请求一个事务相同
+
+    Args:
+        database: 数据库文件路径
+        pragmas: 连接执行的PRAGMA配置
+
+    Returns:
+        dict: 读、写次数和遇到database is locked的次数
+    """
+    pool = SQLitePool(database, max_size=READERS + WRITERS, pragmas=pragmas)
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def reader():
+        reads = locked = 0
+        rng = random.Random()
+        while not stop.is_set():
+            try:
+                with pool.connection() as conn:
+                    conn.execute('SELECT * FROM users WHERE id = ?',
+                                 (rng.randint(1, ROW_COUNT),)).fetchone()
+                reads += 1
+            except sqlite3.OperationalError:
+                locked += 1
+        with lock:
+            counts['reads'] += reads
+            counts['locked'] += locked
+
+    def writer():
+        writes = locked = 0
+        rng = random.Random()
+        while not stop.is_set():
+            try:
+                with pool.connection() as conn:
+                    conn.execute('UPDATE users SET age = ? WHERE id = ?',
+                                 (rng.randint(1, 99), rng.randint(1, ROW_COUNT)))
+                    conn.commit()
+                writes += 1
+            except sqlite3.OperationalError:
+                locked += 1
+        with lock:
+            counts['writes'] += writes
+            counts['locked'] += locked
+
+    threads = ([threading.Thread(target=reader) for _ in range(READERS)]
+               + [threading.Thread(target=writer) for _ in range(WRITERS)])
+    for t in threads:
+        t.start()
+    time.sleep(DURATION)
+    stop.set()
+    for t in threads:
+        t.join()
+    pool.close()
+    return counts
+
+
+def main():
+    # 默认配置：回滚日志、synchronous=FULL，busy_timeout为0，锁冲突立即报错
+    profiles = [
+        ('默认配置', {'busy_timeout': 0}),
+        ('仅等待锁', {'busy_timeout': 5000}),
+        ('WAL配置', PRAGMAS),
+    ]
+    print(f"{READERS}个读线程 + {WRITERS}个写线程，每种配置运行{DURATION}秒")
+    for name, pragmas in profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, 'bench.db')
+            create_database(database)
+            counts = run_mixed_load(database, pragmas)
+        print(f"{name}: 读 {counts['reads'] / DURATION:.0f}/s, "
+              f"写 {counts['writes'] / DURATION:.0f}/s, "
+              f"database is locked {counts['locked']} 次")
+
+
+if __name__ == '__main__':
+    main()
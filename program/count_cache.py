@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CountCache:
+    """
+    分页总数缓存，按过滤条件缓存COUNT(*)的结果
+
+    特性：
+    1. 同一过滤条件的总数只查询一次，读请求不再每次执行COUNT(*)
+    2. 新增、删除后用adjust()增量修正，不必重新统计
+    3. 其他进程也可能写同一个数据库，缓存ttl秒后过期，重新统计一次
+    4. 最多缓存max_entries个条件，超出时淘汰最久未用的
+    5. 统计期间发生写入时不缓存这次结果，避免把修正前的旧值写回缓存
+    """
+
+    def __init__(self, ttl=30.0, max_entries=10000, clock=time.monotonic):
+        """
+        初始化缓存
+
+        Args:
+            ttl: 缓存的有效秒数
+            max_entries: 最多缓存的过滤条件数量
+            clock: 时钟函数，测试时可替换
+        """
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        # 正在统计的键：{键: [统计中的请求数, 期间的修改次数]}
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        """
+        获取某个过滤条件的总数，未缓存或已过期时调用loader统计
+
+        Args:
+            key: 过滤条件，需可哈希，如 ('todos', user_id)
+            loader: 无参函数，返回实际总数
+
+        Returns:
+            int: 总数
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            loading = self._loading.setdefault(key, [0, 0])
+            loading[0] += 1
+            version = loading[1]
+
+        try:
+            count = loader()
+        finally:
+            with self._lock:
+                loading[0] -= 1
+                if not loading[0]:
+                    del self._loading[key]
+        with self._lock:
+            if loading[1] == version:
+                self._entries[key] = (count, self._clock() + self._ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return count
+
+    def peek(self, key):
+        """
+        读取缓存的总数，不触发统计，已过期的值也会返回
+
+        Returns:
+            int: 缓存的总数，没有缓存时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def adjust(self, key, delta):
+        """
+        写入提交后增量修正总数，未缓存的条件不做处理
+
+        Args:
+            key: 过滤条件
+            delta: 变化量，新增为正，删除为负
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (max(entry[0] + delta, 0), entry[1])
+            self._touch_loading(key)
+
+    def invalidate(self, key):
+        """
+        删除某个过滤条件的缓存，下次读取时重新统计
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._touch_loading(key)
+
+    def clear(self):
+        """
+        清空所有缓存
+        """
+        with self._lock:
+            self._entries.clear()
+            for loading in self._loading.values():
+                loading[1] += 1
+
+    def _touch_loading(self, key):
+        loading = self._loading.get(key)
+        if loading is not None:
+            loading[1] += 1
+
+
+def estimate_count(query, column):
+    """
+    用最大、最小id估算整张表的行数，只走两次索引查找，适合很大的表
+
+    只适用于不带过滤条件的查询：过滤后剩下的id不连续，范围可能比实际行数大得多。
+    删除和回滚的插入都会在id中留下空洞，估算值只会偏大。
+
+    Args:
+        query: 不带过滤条件的SQLAlchemy查询
+        column: 自增的整数主键列
+
+    Returns:
+        int: 估算的总数
+
+    Raises:
+        ValueError: 当查询带有过滤条件时抛出
+    """
+    if query.whereclause is not None:
+        raise ValueError("estimate_count只能估算不带过滤条件的查询")
+    first = query.with_entities(column).order_by(column.asc()).limit(1).scalar()
+    if first is None:
+        return 0
+    last = query.with_entities(column).order_by(column.desc()).limit(1).scalar()
+    return last - first + 1
@@ -7,6 +7,69 @@ from models import query_db, get_db_connection
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False  # 禁止JSON自动排序
 
+# 单次批量请求最多的条数
+MAX_BATCH_SIZE = 1000
+# IN查询每次最多的参数个数，低于SQLite的变量上限
+IN_CHUNK_SIZE = 500
+USER_FIELDS = ('name', 'email', 'age')
+
+
+def chunked(values, size=IN_CHUNK_SIZE):
+    """按size切分列表，用于拼接IN查询"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def validate_user(item, partial=False):
+    """校验单个用户数据，通过时返回None，否则返回错误信息"""
+    if not isinstance(item, dict):
+        return "Item must be an object"
+    if partial:
+        if type(item.get('id')) is not int:
+            return "Missing or invalid field: id"
+        if not any(key in item for key in USER_FIELDS):
+            return "No valid fields to update"
+    else:
+        missing = [key for key in USER_FIELDS if key not in item]
+        if missing:
+            return f"Missing required fields: {', '.join(missing)}"
+    for key in ('name', 'email'):
+        if key in item and (not isinstance(item[key], str) or not item[key]):
+            return f"Invalid field: {key}"
+    if 'age' in item and type(item['age']) is not int:
+        return "Invalid field: age"
+    return None
+
+
+def read_batch():
+    """读取请求体中的数组，数组为空或超过上限时终止请求"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        abort(400, description="Request body must be a non-empty array")
+    if len(items) > MAX_BATCH_SIZE:
+        abort(413, description=f"At most {MAX_BATCH_SIZE} items per batch")
+    return items
+
+
+def batch_errors(errors):
+    """返回逐条的错误信息，整批都不写入，状态码取第一条错误"""
+    errors.sort(key=lambda error: error['index'])
+    return jsonify({"errors": errors}), errors[0]['status']
+
+
+def select_in(conn, sql, values):
+    """分批执行带IN (...)的查询，sql中用{}表示占位符的位置"""
+    rows = []
+    for part in chunked(values):
+        rows += conn.execute(sql.format(','.join('?' * len(part))), part).fetchall()
+    return rows
+
+
+def find_missing_ids(conn, ids):
+    """返回ids中在数据库里不存在的id"""
+    found = {row['id'] for row in select_in(conn, 'SELECT id FROM users WHERE id IN ({})', list(set(ids)))}
+    return [user_id for user_id in ids if user_id not in found]
+
 
 class UserAPI(MethodView):
     def get(self, user_id):
@@ -83,10 +146,116 @@ class UserAPI(MethodView):
             conn.commit()
             return '', 204
 
+
+class UserBatchAPI(MethodView):
+    """
+    批量增删改用户
+
+    先校验全部条目，有任何一条不通过时整批都不写入并返回逐条的错误；
+    全部通过后用executemany在一个事务中写入，只提交一次。
+    """
+
+    def post(self):
+        """批量创建用户"""
+        items = read_batch()
+        errors = [{"index": i, "status": 400, "error": error}
+                  for i, item in enumerate(items)
+                  if (error := validate_user(item))]
+        if errors:
+            return batch_errors(errors)
+
+        # email唯一，批次内和数据库中都不能重复
+        emails = [item['email'] for item in items]
+        seen = set()
+        for i, email in enumerate(emails):
+            if email in seen:
+                errors.append({"index": i, "status": 409, "error": f"Duplicate email in batch: {email}"})
+            seen.add(email)
+
+        with get_db_connection() as conn:
+            existing = {row['email'] for row in
+                        select_in(conn, 'SELECT email FROM users WHERE email IN ({})', list(seen))}
+            errors += [{"index": i, "status": 409, "error": f"Email already exists: {email}"}
+                       for i, email in enumerate(emails) if email in existing]
+            if errors:
+                return batch_errors(errors)
+
+            try:
+                conn.executemany('INSERT INTO users (name, email, age) VALUES (?, ?, ?)',
+                                 [(item['name'], item['email'], item['age']) for item in items])
+                # 提交前在同一个事务中按email查回自增id
+                ids = {row['email']: row['id'] for row in
+                       select_in(conn, 'SELECT id, email FROM users WHERE email IN ({})', emails)}
+                conn.commit()
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                abort(409, description="数据已存在")
+
+        return jsonify({"results": [
+            {"index": i, "status": 201, "id": ids[item['email']]} for i, item in enumerate(items)
+        ]}), 201
+
+    def patch(self):
+        """批量更新用户，每条需带id，只更新给出的字段"""
+        items = read_batch()
+        errors = [{"index": i, "status": 400, "error": error}
+                  for i, item in enumerate(items)
+                  if (error := validate_user(item, partial=True))]
+        if errors:
+            return batch_errors(errors)
+
+        with get_db_connection() as conn:
+            missing = set(find_missing_ids(conn, [item['id'] for item in items]))
+            errors = [{"index": i, "status": 404, "error": "User not found"}
+                      for i, item in enumerate(items) if item['id'] in missing]
+            if errors:
+                return batch_errors(errors)
+
+            try:
+                # 未给出的字段传入NULL，由COALESCE保留原值，所有条目共用一条语句
+                conn.executemany('''
+                    UPDATE users
+                    SET name = COALESCE(?, name), email = COALESCE(?, email), age = COALESCE(?, age)
+                    WHERE id = ?
+                ''', [(item.get('name'), item.get('email'), item.get('age'), item['id']) for item in items])
+                conn.commit()
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                abort(409, description="数据已存在")
+
+        return jsonify({"results": [
+            {"index": i, "status": 200, "id": item['id']} for i, item in enumerate(items)
+        ]}), 200
+
+    def delete(self):
+        """批量删除用户，请求体为id数组"""
+        ids = read_batch()
+        errors = [{"index": i, "status": 400, "error": "Invalid id"}
+                  for i, user_id in enumerate(ids) if type(user_id) is not int]
+        if errors:
+            return batch_errors(errors)
+
+        with get_db_connection() as conn:
+            missing = set(find_missing_ids(conn, ids))
+            errors = [{"index": i, "status": 404, "error": "User not found"}
+                      for i, user_id in enumerate(ids) if user_id in missing]
+            if errors:
+                return batch_errors(errors)
+
+            conn.executemany('DELETE FROM users WHERE id = ?', [(user_id,) for user_id in ids])
+            conn.commit()
+
+        return jsonify({"results": [
+            {"index": i, "status": 204, "id": user_id} for i, user_id in enumerate(ids)
+        ]}), 200
+
+
 # 注册路由
 user_view = UserAPI.as_view('user_api')
 app.add_url_rule('/api/users', view_func=user_view, methods=['GET', 'POST'])
 app.add_url_rule('/api/users/<int:user_id>', view_func=user_view, methods=['GET', 'PUT', 'DELETE'])
+app.add_url_rule('/api/users:batch', view_func=UserBatchAPI.as_view('user_batch_api'),
+                 methods=['POST', 'PATCH', 'DELETE'])
 
 if __name__ == '__main__':
     app.run(debug=True)
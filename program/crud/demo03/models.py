@@ -1,18 +1,25 @@
-import sqlite3
+import os
+import sys
 from contextlib import contextmanager
 
+# 连接池模块位于program目录，供各个示例共用
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from sqlite_pool import PRAGMAS, get_pool
+
 DATABASE = '../../../sqlite/mySqlite.db'
 
+# 每个新连接执行的PRAGMA配置，默认开启WAL，读写互不阻塞
+SQLITE_PRAGMAS = dict(PRAGMAS)
+
+# 连接池默认返回字典格式数据（sqlite3.Row）
+pool = get_pool(DATABASE, pragmas=SQLITE_PRAGMAS)
+
 
 @contextmanager
 def get_db_connection():
-    """获取数据库连接"""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row  # 返回字典格式数据
-    try:
+    """从连接池借用数据库连接，用完归还"""
+    with pool.connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def query_db(query, args=(), one=False):
@@ -1,8 +1,12 @@
 from flask import Flask, request
 from flask_restful import Api, Resource, abort
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
 
 from config import Config
+from count_cache import CountCache, estimate_count
 from models import db, User
+from pagination import clamp_per_page, keyset_paginate
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -13,6 +17,74 @@ api = Api(app)
 with app.app_context():
     db.create_all()
 
+# 用户总数缓存，增删用户时增量修正
+user_counts = CountCache()
+USER_COUNT_KEY = 'users'
+
+# 单次批量请求最多的条数
+MAX_BATCH_SIZE = 1000
+# IN查询每次最多的参数个数，低于SQLite的变量上限
+IN_CHUNK_SIZE = 500
+USER_FIELDS = ('name', 'email', 'age')
+
+
+def user_total(estimate=False):
+    """获取用户总数，estimate为True时按id范围估算，适合很大的表"""
+    if estimate:
+        return estimate_count(User.query, User.id)
+    return user_counts.get(USER_COUNT_KEY, User.query.count)
+
+
+def chunked(values, size=IN_CHUNK_SIZE):
+    """按size切分列表，用于拼接IN查询"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def validate_user(item, partial=False):
+    """校验单个用户数据，通过时返回None，否则返回错误信息"""
+    if not isinstance(item, dict):
+        return "Item must be an object"
+    if partial:
+        if type(item.get('id')) is not int:
+            return "Missing or invalid field: id"
+        if not any(key in item for key in USER_FIELDS):
+            return "No valid fields to update"
+    else:
+        missing = [key for key in USER_FIELDS if key not in item]
+        if missing:
+            return f"Missing required fields: {', '.join(missing)}"
+    for key in ('name', 'email'):
+        if key in item and (not isinstance(item[key], str) or not item[key]):
+            return f"Invalid field: {key}"
+    if 'age' in item and type(item['age']) is not int:
+        return "Invalid field: age"
+    return None
+
+
+def read_batch():
+    """读取请求体中的数组，数组为空或超过上限时终止请求"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        abort(400, message="Request body must be a non-empty array")
+    if len(items) > MAX_BATCH_SIZE:
+        abort(413, message=f"At most {MAX_BATCH_SIZE} items per batch")
+    return items
+
+
+def batch_errors(errors):
+    """返回逐条的错误信息，整批都不写入，状态码取第一条错误"""
+    errors.sort(key=lambda error: error['index'])
+    return {'errors': errors}, errors[0]['status']
+
+
+def find_missing_ids(ids):
+    """返回ids中在数据库里不存在的id"""
+    found = set()
+    for part in chunked(list(set(ids))):
+        found.update(user_id for user_id, in db.session.query(User.id).filter(User.id.in_(part)))
+    return [user_id for user_id in ids if user_id not in found]
+
 
 class UserResource(Resource):
     def get(self, user_id=None):
@@ -22,26 +94,53 @@ class UserResource(Resource):
             if not user:
                 abort(404, message="User not found")
             return user.to_dict()
-        else:
+        elif 'page' in request.args:
+            # 兼容旧的页码分页，深页需要OFFSET扫描
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
 
-            # 分页查询
+            # 分页查询，总数取自缓存，不再每页COUNT(*)
             pagination = User.query.paginate(
                 page=page,
                 per_page=per_page,
-                error_out=False
+                error_out=False,
+                count=False
             )
+            total = user_total(request.args.get('count') == 'estimate')
 
             return {
                 'data': [u.to_dict() for u in pagination.items],
                 'pagination': {
-                    'total': pagination.total,
-                    'pages': pagination.pages,
+                    'total': total,
+                    'pages': -(-total // pagination.per_page),
                     'current': pagination.page,
                     'per_page': pagination.per_page
                 }
             }, 200
+        else:
+            # 游标分页：按id倒序，用上一页返回的next_cursor取下一页
+            per_page = clamp_per_page(request.args.get('per_page', type=int))
+            try:
+                users, next_cursor = keyset_paginate(
+                    User.query, User.id, request.args.get('cursor'), per_page)
+            except ValueError:
+                abort(400, message="Invalid cursor")
+
+            pagination = {
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
+            # 总数只在显式请求时返回：count=true取缓存的精确值，count=estimate估算
+            count = request.args.get('count', 'false').lower()
+            if count in ('1', 'true', 'estimate'):
+                pagination['total'] = user_total(count == 'estimate')
+                pagination['total_estimated'] = count == 'estimate'
+
+            return {
+                'data': [u.to_dict() for u in users],
+                'pagination': pagination
+            }, 200
 
     def post(self):
         """创建用户"""
@@ -59,6 +158,7 @@ class UserResource(Resource):
         )
         db.session.add(new_user)
         db.session.commit()
+        user_counts.adjust(USER_COUNT_KEY, 1)
         return new_user.to_dict(), 201
 
     def put(self, user_id):
@@ -89,11 +189,116 @@ class UserResource(Resource):
 
         db.session.delete(user)
         db.session.commit()
+        user_counts.adjust(USER_COUNT_KEY, -1)
         return '', 204
 
 
+class UserBatchResource(Resource):
+    """
+    批量增删改用户
+
+    先校验全部条目，有任何一条不通过时整批都不写入并返回逐条的错误；
+    全部通过后用SQLAlchemy的批量语句在一个事务中写入，只提交一次。
+    """
+
+    def post(self):
+        """批量创建用户"""
+        items = read_batch()
+        errors = [{'index': i, 'status': 400, 'error': error}
+                  for i, item in enumerate(items)
+                  if (error := validate_user(item))]
+        if errors:
+            return batch_errors(errors)
+
+        # name和email唯一，批次内和数据库中都不能重复
+        existing = {'name': set(), 'email': set()}
+        for part in chunked(items):
+            names = [item['name'] for item in part]
+            emails = [item['email'] for item in part]
+            for name, email in db.session.query(User.name, User.email).filter(
+                    or_(User.name.in_(names), User.email.in_(emails))):
+                existing['name'].add(name)
+                existing['email'].add(email)
+        for i, item in enumerate(items):
+            for key in ('name', 'email'):
+                if item[key] in existing[key]:
+                    errors.append({'index': i, 'status': 409, 'error': f"{key} already exists: {item[key]}"})
+                    break
+                existing[key].add(item[key])
+        if errors:
+            return batch_errors(errors)
+
+        rows = [{key: item[key] for key in USER_FIELDS} for item in items]
+        try:
+            # 多行INSERT ... RETURNING，按参数顺序返回自增id
+            ids = db.session.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True), rows).all()
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, message="name or email already exists")
+        user_counts.adjust(USER_COUNT_KEY, len(ids))
+
+        return {'results': [
+            {'index': i, 'status': 201, 'id': user_id} for i, user_id in enumerate(ids)
+        ]}, 201
+
+    def patch(self):
+        """批量更新用户，每条需带id，只更新给出的字段"""
+        items = read_batch()
+        errors = [{'index': i, 'status': 400, 'error': error}
+                  for i, item in enumerate(items)
+                  if (error := validate_user(item, partial=True))]
+        if errors:
+            return batch_errors(errors)
+
+        missing = set(find_missing_ids([item['id'] for item in items]))
+        errors = [{'index': i, 'status': 404, 'error': "User not found"}
+                  for i, item in enumerate(items) if item['id'] in missing]
+        if errors:
+            return batch_errors(errors)
+
+        rows = [{key: item[key] for key in ('id',) + USER_FIELDS if key in item} for item in items]
+        try:
+            # 按主键批量UPDATE，字段相同的条目合并为一次executemany
+            db.session.execute(update(User), rows)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, message="name or email already exists")
+
+        return {'results': [
+            {'index': i, 'status': 200, 'id': item['id']} for i, item in enumerate(items)
+        ]}, 200
+
+    def delete(self):
+        """批量删除用户，请求体为id数组"""
+        ids = read_batch()
+        errors = [{'index': i, 'status': 400, 'error': "Invalid id"}
+                  for i, user_id in enumerate(ids) if type(user_id) is not int]
+        if errors:
+            return batch_errors(errors)
+
+        missing = set(find_missing_ids(ids))
+        errors = [{'index': i, 'status': 404, 'error': "User not found"}
+                  for i, user_id in enumerate(ids) if user_id in missing]
+        if errors:
+            return batch_errors(errors)
+
+        unique_ids = list(set(ids))
+        for part in chunked(unique_ids):
+            db.session.execute(delete(User).where(User.id.in_(part)))
+        db.session.commit()
+        user_counts.adjust(USER_COUNT_KEY, -len(unique_ids))
+
+        return {'results': [
+            {'index': i, 'status': 204, 'id': user_id} for i, user_id in enumerate(ids)
+        ]}, 200
+
+
 # 注册路由
 api.add_resource(UserResource, '/api/users', '/api/users/<int:user_id>')
+api.add_resource(UserBatchResource, '/api/users:batch')
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -1,8 +1,14 @@
 import os
+import sys
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+# PRAGMA配置位于program目录的连接池模块，供各个示例共用
+sys.path.append(os.path.join(BASE_DIR, '..', '..'))
+from sqlite_pool import PRAGMAS
+
 
 class Config:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(BASE_DIR, '../../../sqlite/mySqlite.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # 禁用修改追踪‌
+    SQLITE_PRAGMAS = dict(PRAGMAS)  # 每个新连接执行的PRAGMA，默认开启WAL
@@ -1,7 +1,22 @@
+import sqlite3
+
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from sqlite_pool import apply_pragmas
 
 db = SQLAlchemy()
 
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """新建的SQLite连接执行配置中的PRAGMA"""
+    if isinstance(dbapi_connection, sqlite3.Connection) and has_app_context():
+        apply_pragmas(dbapi_connection, current_app.config.get('SQLITE_PRAGMAS', {}))
+
+
 class User(db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True)
@@ -4,13 +4,16 @@ from flask_restful import Api
 from .config import Config
 from .extensions import db, jwt, limiter
 from .resources.auth import AuthResource
-from .resources.todo import TodoResource
+from .resources.todo import TodoBatchResource, TodoResource
 from .utils.logger import setup_logger
 
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    # 覆盖的配置（如测试用的数据库）必须在初始化扩展之前生效
+    if config:
+        app.config.update(config)
 
     # 初始化扩展
     db.init_app(app)
@@ -22,6 +25,7 @@ def create_app():
     api = Api(app)
     api.add_resource(AuthResource, '/auth/login')
     api.add_resource(TodoResource, '/todos', '/todos/<int:todo_id>')
+    api.add_resource(TodoBatchResource, '/todos:batch')
 
     # 全局异常处理
     @app.errorhandler(404)
@@ -1,14 +1,20 @@
 # app/config.py
 import os
+import sys
 
 from dotenv import load_dotenv
 
+# PRAGMA配置位于program目录的连接池模块，供各个示例共用
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from sqlite_pool import PRAGMAS
+
 load_dotenv()
 
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI', 'sqlite:///../../../sqlite/mySqlite.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_PRAGMAS = dict(PRAGMAS)  # 每个新连接执行的PRAGMA，默认开启WAL
     JWT_SECRET_KEY = os.getenv('JWT_SECRET', 'default-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1小时
     RATELIMIT_DEFAULT = "200 per day"
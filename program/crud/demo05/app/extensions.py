@@ -1,8 +1,26 @@
+import sqlite3
+
+from flask import current_app, has_app_context
 from flask_jwt_extended import JWTManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# config模块已把program目录加入sys.path
+from count_cache import CountCache
+from sqlite_pool import apply_pragmas
 
 db = SQLAlchemy()
 jwt = JWTManager()
 limiter = Limiter(key_func=get_remote_address)
+# 每个用户的待办总数缓存，键为user_id
+todo_counts = CountCache()
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """新建的SQLite连接执行配置中的PRAGMA"""
+    if isinstance(dbapi_connection, sqlite3.Connection) and has_app_context():
+        apply_pragmas(dbapi_connection, current_app.config.get('SQLITE_PRAGMAS', {}))
@@ -2,19 +2,27 @@ from flask import request
 from flask_jwt_extended import create_access_token
 from flask_restful import Resource
 
+from ..extensions import db, jwt
 from ..models import User
 from ..schemas import AuthSchema
 
 auth_schema = AuthSchema()
 
 
+@jwt.user_lookup_loader
+def load_user(jwt_header, jwt_data):
+    """按token中的用户id加载current_user，用户不存在时返回None使请求被拒绝"""
+    return db.session.get(User, int(jwt_data['sub']))
+
+
 class AuthResource(Resource):
     def post(self):
         data = auth_schema.load(request.get_json())
-        user = User.query.filter_by(name=data['name']).first()
+        user = User.query.filter_by(username=data['username']).first()
 
         if user and user.check_password(data['password']):
-            access_token = create_access_token(identity=user.id)
+            # JWT的sub必须是字符串
+            access_token = create_access_token(identity=str(user.id))
             return {"access_token": access_token}, 200
 
         return {"message": "Invalid credentials"}, 401
@@ -1,14 +1,70 @@
 from flask import request
 from flask_jwt_extended import jwt_required, current_user
-from flask_restful import Resource
+from flask_restful import Resource, abort
+from marshmallow import ValidationError
+from sqlalchemy import delete, insert, update
+from pagination import clamp_per_page, keyset_paginate
 
-from ..extensions import db, limiter
+from ..extensions import db, limiter, todo_counts
 from ..models import Todo
-from ..schemas import TodoSchema, PaginatedSchema
+from ..schemas import TodoSchema, TodoUpdateSchema, PaginatedSchema
 
 todo_schema = TodoSchema()
+todo_update_schema = TodoUpdateSchema()
 paginated_schema = PaginatedSchema()
 
+# 单次批量请求最多的条数
+MAX_BATCH_SIZE = 1000
+# IN查询每次最多的参数个数，低于SQLite的变量上限
+IN_CHUNK_SIZE = 500
+
+
+def todo_total(query):
+    """
+    获取当前用户的待办总数，取自缓存的精确值
+
+    按用户过滤后的id不连续，不能用id范围估算，count=estimate也返回精确值。
+    """
+    return todo_counts.get(current_user.id, query.count)
+
+
+def chunked(values, size=IN_CHUNK_SIZE):
+    """按size切分列表，用于拼接IN查询"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def read_batch():
+    """读取请求体中的数组，数组为空或超过上限时终止请求"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        abort(400, message="Request body must be a non-empty array")
+    if len(items) > MAX_BATCH_SIZE:
+        abort(413, message=f"At most {MAX_BATCH_SIZE} items per batch")
+    return items
+
+
+def load_batch(schema, items):
+    """按schema校验全部条目，任何一条不通过时终止请求并返回逐条的错误"""
+    try:
+        return schema.load(items, many=True)
+    except ValidationError as e:
+        errors = [{'index': index, 'status': 400, 'error': error}
+                  for index, error in sorted(e.messages.items())]
+        abort(400, errors=errors)
+
+
+def check_owned(ids):
+    """不属于当前用户或不存在的待办返回404，整批都不写入"""
+    owned = set()
+    for part in chunked(list(set(ids))):
+        owned.update(todo_id for todo_id, in db.session.query(Todo.id).filter(
+            Todo.user_id == current_user.id, Todo.id.in_(part)))
+    errors = [{'index': i, 'status': 404, 'error': "Todo not found"}
+              for i, todo_id in enumerate(ids) if todo_id not in owned]
+    if errors:
+        abort(404, errors=errors)
+
 
 class TodoResource(Resource):
     decorators = [jwt_required(), limiter.limit("100/hour")]
@@ -18,27 +74,54 @@ class TodoResource(Resource):
             todo = Todo.query.get_or_404(todo_id)
             return todo_schema.dump(todo)
 
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        query = Todo.query.filter_by(user_id=current_user.id)
+
+        if 'page' in request.args:
+            # 兼容旧的页码分页，深页需要OFFSET扫描；总数取自缓存，不再每页COUNT(*)
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 10, type=int)
+
+            pagination = query.paginate(
+                page=page,
+                per_page=per_page,
+                error_out=False,
+                count=False
+            )
 
-        pagination = Todo.query.filter_by(user_id=current_user.id).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+            return paginated_schema.dump({
+                'page': page,
+                'per_page': per_page,
+                'total': todo_total(query),
+                'items': [todo_schema.dump(item) for item in pagination.items]
+            })
 
-        return paginated_schema.dump({
-            'page': page,
+        # 游标分页：按id倒序，用上一页返回的next_cursor取下一页
+        per_page = clamp_per_page(request.args.get('per_page', type=int))
+        try:
+            todos, next_cursor = keyset_paginate(
+                query, Todo.id, request.args.get('cursor'), per_page)
+        except ValueError:
+            abort(400, message="Invalid cursor")
+
+        result = {
             'per_page': per_page,
-            'total': pagination.total,
-            'items': [todo_schema.dump(item) for item in pagination.items]
-        })
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'items': [todo_schema.dump(item) for item in todos]
+        }
+        # 总数只在显式请求时返回，都是缓存的精确值，兼容count=estimate的写法
+        count = request.args.get('count', 'false').lower()
+        if count in ('1', 'true', 'estimate'):
+            result['total'] = todo_total(query)
+            result['total_estimated'] = False
+        return paginated_schema.dump(result)
 
     def post(self):
         data = todo_schema.load(request.get_json())
         todo = Todo(**data, user_id=current_user.id)
         db.session.add(todo)
         db.session.commit()
+        todo_counts.adjust(current_user.id, 1)
         return todo_schema.dump(todo), 201
 
     def put(self, todo_id):
@@ -51,6 +134,58 @@ class TodoResource(Resource):
 
     def delete(self, todo_id):
         todo = Todo.query.get_or_404(todo_id)
+        user_id = todo.user_id
         db.session.delete(todo)
         db.session.commit()
+        todo_counts.adjust(user_id, -1)
         return {'message': 'Todo deleted'}, 204
+
+
+class TodoBatchResource(Resource):
+    """
+    批量增删改当前用户的待办
+
+    先校验全部条目，有任何一条不通过时整批都不写入并返回逐条的错误；
+    全部通过后用SQLAlchemy的批量语句在一个事务中写入，只提交一次。
+    """
+    decorators = [jwt_required(), limiter.limit("100/hour")]
+
+    def post(self):
+        rows = load_batch(todo_schema, read_batch())
+        for row in rows:
+            row['user_id'] = current_user.id
+        # 多行INSERT ... RETURNING，按参数顺序返回自增id
+        ids = db.session.scalars(
+            insert(Todo).returning(Todo.id, sort_by_parameter_order=True), rows).all()
+        db.session.commit()
+        todo_counts.adjust(current_user.id, len(ids))
+        return {'results': [
+            {'index': i, 'status': 201, 'id': todo_id} for i, todo_id in enumerate(ids)
+        ]}, 201
+
+    def patch(self):
+        rows = load_batch(todo_update_schema, read_batch())
+        check_owned([row['id'] for row in rows])
+        # 按主键批量UPDATE，字段相同的条目合并为一次executemany
+        db.session.execute(update(Todo), rows)
+        db.session.commit()
+        return {'results': [
+            {'index': i, 'status': 200, 'id': row['id']} for i, row in enumerate(rows)
+        ]}
+
+    def delete(self):
+        ids = read_batch()
+        errors = [{'index': i, 'status': 400, 'error': "Invalid id"}
+                  for i, todo_id in enumerate(ids) if type(todo_id) is not int]
+        if errors:
+            abort(400, errors=errors)
+        check_owned(ids)
+
+        unique_ids = list(set(ids))
+        for part in chunked(unique_ids):
+            db.session.execute(delete(Todo).where(Todo.id.in_(part)))
+        db.session.commit()
+        todo_counts.adjust(current_user.id, -len(unique_ids))
+        return {'results': [
+            {'index': i, 'status': 204, 'id': todo_id} for i, todo_id in enumerate(ids)
+        ]}
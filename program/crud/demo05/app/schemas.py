@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
 
 
 class TodoSchema(Schema):
@@ -8,6 +8,18 @@ class TodoSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
 
 
+class TodoUpdateSchema(Schema):
+    """批量更新时的单条数据，必须带id，其余字段可选"""
+    id = fields.Int(required=True, strict=True)
+    title = fields.Str(validate=validate.Length(min=1, max=120))
+    completed = fields.Bool()
+
+    @validates_schema
+    def validate_fields(self, data, **kwargs):
+        if not data.keys() - {'id'}:
+            raise ValidationError("No valid fields to update")
+
+
 class AuthSchema(Schema):
     username = fields.Str(required=True)
     password = fields.Str(required=True, validate=validate.Length(min=6))
@@ -17,4 +29,7 @@ class PaginatedSchema(Schema):
     page = fields.Int()
     per_page = fields.Int()
     total = fields.Int()
+    total_estimated = fields.Bool()
+    next_cursor = fields.Str(allow_none=True)
+    has_more = fields.Bool()
     items = fields.List(fields.Dict())
@@ -1,5 +1,6 @@
 # app/utils/logger.py
 import logging
+import os
 from logging.handlers import RotatingFileHandler
 
 from flask import request
@@ -10,6 +11,7 @@ def setup_logger(app):
         '[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
     )
 
+    os.makedirs('logs', exist_ok=True)
     file_handler = RotatingFileHandler(
         'logs/app.log',
         maxBytes=1024*1024*10,
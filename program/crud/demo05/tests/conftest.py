@@ -1,24 +1,31 @@
 import pytest
+from flask_jwt_extended import create_access_token
+
 from app import create_app
-from app.extensions import db
+from app.extensions import db, limiter, todo_counts
 from app.models import User
 
 
 @pytest.fixture
 def app():
-    app = create_app()
-    app.config.update({
+    # 测试配置在初始化扩展之前传入，确保使用内存数据库
+    app = create_app({
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
         "JWT_SECRET_KEY": "test-secret"
     })
 
+    # 总数缓存和限流计数是进程级的，每个测试使用新的内存数据库，需要清空
+    todo_counts.clear()
+    limiter.reset()
+
     with app.app_context():
         db.create_all()
         test_user = User(username="testuser")
         test_user.set_password("testpass")
         db.session.add(test_user)
         db.session.commit()
+        app.config['TEST_USER_ID'] = test_user.id
 
     yield app
 
@@ -29,9 +36,8 @@ def client(app):
 
 
 @pytest.fixture
-def auth_header(client):
-    res = client.post('/auth/login', json={
-        "username": "testuser",
-        "password": "testpass"
-    })
-    return {'Authorization': f'Bearer {res.json["access_token"]}'}
+def auth_header(app):
+    # 直接签发token，不依赖登录接口
+    with app.app_context():
+        token = create_access_token(identity=str(app.config['TEST_USER_ID']))
+    return {'Authorization': f'Bearer {token}'}
@@ -1,4 +1,10 @@
 # tests/test_todos.py
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.models import User
+
+
 def test_create_todo(client, auth_header):
     res = client.post('/todos',
                       json={"title": "Test Todo"},
@@ -8,7 +14,124 @@ def test_create_todo(client, auth_header):
     assert res.json['title'] == "Test Todo"
 
 
+def test_login(client):
+    res = client.post('/auth/login', json={"username": "testuser", "password": "testpass"})
+    assert res.status_code == 200
+    res = client.get('/todos', headers={'Authorization': f'Bearer {res.json["access_token"]}'})
+    assert res.status_code == 200
+
+    res = client.post('/auth/login', json={"username": "testuser", "password": "wrongpass"})
+    assert res.status_code == 401
+
+
 def test_rate_limit(client, auth_header):
     for _ in range(101):
         res = client.get('/todos', headers=auth_header)
     assert res.status_code == 429
+
+
+def test_cursor_pagination(client, auth_header):
+    for i in range(5):
+        client.post('/todos', json={"title": f"Todo {i}"}, headers=auth_header)
+
+    res = client.get('/todos?per_page=2&count=true', headers=auth_header)
+    assert res.status_code == 200
+    assert res.json['total'] == 5
+    assert [item['title'] for item in res.json['items']] == ["Todo 4", "Todo 3"]
+
+    titles = []
+    cursor = res.json['next_cursor']
+    while cursor:
+        res = client.get(f'/todos?per_page=2&cursor={cursor}', headers=auth_header)
+        assert 'total' not in res.json
+        titles += [item['title'] for item in res.json['items']]
+        cursor = res.json['next_cursor']
+    assert titles == ["Todo 2", "Todo 1", "Todo 0"]
+    assert res.json['has_more'] is False
+
+
+def test_invalid_cursor(client, auth_header):
+    res = client.get('/todos?cursor=not-a-cursor', headers=auth_header)
+    assert res.status_code == 400
+
+
+def test_cached_total(client, auth_header):
+    for i in range(3):
+        client.post('/todos', json={"title": f"Todo {i}"}, headers=auth_header)
+    res = client.get('/todos?count=true', headers=auth_header)
+    assert res.json['total'] == 3
+    assert res.json['total_estimated'] is False
+
+    # 删除后缓存的总数增量修正
+    client.delete(f"/todos/{res.json['items'][0]['id']}", headers=auth_header)
+    res = client.get('/todos?page=1&per_page=2', headers=auth_header)
+    assert res.json['total'] == 2
+
+    # 按用户过滤的总数不估算，count=estimate也返回精确值
+    res = client.get('/todos?count=estimate', headers=auth_header)
+    assert res.json['total_estimated'] is False
+    assert res.json['total'] == 2
+
+
+def test_batch_create_update_delete(client, auth_header):
+    res = client.post('/todos:batch',
+                      json=[{"title": f"Batch {i}"} for i in range(3)],
+                      headers=auth_header)
+    assert res.status_code == 201
+    ids = [item['id'] for item in res.json['results']]
+    assert len(ids) == 3
+
+    res = client.patch('/todos:batch',
+                       json=[{"id": ids[0], "completed": True},
+                             {"id": ids[1], "title": "Renamed"}],
+                       headers=auth_header)
+    assert res.status_code == 200
+    assert client.get(f'/todos/{ids[0]}', headers=auth_header).json['completed'] is True
+    assert client.get(f'/todos/{ids[1]}', headers=auth_header).json['title'] == "Renamed"
+
+    res = client.delete('/todos:batch', json=ids[:2], headers=auth_header)
+    assert res.status_code == 200
+    res = client.get('/todos?count=true', headers=auth_header)
+    assert res.json['total'] == 1
+
+
+def test_batch_rejects_whole_batch(client, auth_header):
+    res = client.post('/todos:batch',
+                      json=[{"title": "ok"}, {"title": ""}],
+                      headers=auth_header)
+    assert res.status_code == 400
+    assert [error['index'] for error in res.json['errors']] == [1]
+
+    res = client.patch('/todos:batch', json=[{"id": 999, "title": "x"}],
+                       headers=auth_header)
+    assert res.status_code == 404
+    assert client.get('/todos?count=true', headers=auth_header).json['total'] == 0
+
+
+def test_batch_only_touches_own_todos(app, client, auth_header):
+    with app.app_context():
+        other = User(username="otheruser")
+        other.set_password("otherpass")
+        db.session.add(other)
+        db.session.commit()
+        other_header = {'Authorization': f'Bearer {create_access_token(identity=str(other.id))}'}
+
+    ids = [item['id'] for item in client.post(
+        '/todos:batch', json=[{"title": "Mine"}, {"title": "Mine too"}],
+        headers=auth_header).json['results']]
+
+    # 其他用户的待办视为不存在，整批都不写入
+    res = client.patch('/todos:batch', json=[{"id": ids[0], "title": "Stolen"}],
+                       headers=other_header)
+    assert res.status_code == 404
+    res = client.delete('/todos:batch', json=ids, headers=other_header)
+    assert res.status_code == 404
+    assert [error['index'] for error in res.json['errors']] == [0, 1]
+    assert client.get(f'/todos/{ids[0]}', headers=auth_header).json['title'] == "Mine"
+    assert client.get('/todos?count=true', headers=auth_header).json['total'] == 2
+    assert client.get('/todos?count=true', headers=other_header).json['total'] == 0
+
+    # 重复的id只删除一次，总数按实际删除的条数修正
+    res = client.delete('/todos:batch', json=[ids[0], ids[0]], headers=auth_header)
+    assert res.status_code == 200
+    assert client.get('/todos?count=true', headers=auth_header).json['total'] == 1
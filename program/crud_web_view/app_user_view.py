@@ -1,17 +1,31 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, g
 import sqlite3
 import os
+import sys
+
+# 连接池模块位于program目录，供各个示例共用
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sqlite_pool import get_pool
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'
 DATABASE = 'database.db'
 
-# 数据库连接工厂
+# 连接池默认以字典形式返回结果（sqlite3.Row）
+pool = get_pool(DATABASE)
+
+# 数据库连接工厂：每个请求从连接池借用一个连接，请求结束时归还
 def get_db():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row  # 以字典形式返回结果
-    return conn
+    if 'db' not in g:
+        g.db = pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exception):
+    db = g.pop('db', None)
+    if db is not None:
+        pool.release(db)
 
 # 初始化数据库（命令行执行）
 def init_db():
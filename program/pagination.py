@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+
+# 每页默认条数与上限，避免一次请求取出整张表
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+
+
+def encode_cursor(last_id):
+    """
+    把上一页最后一条记录的id编码为不透明的游标
+
+    Args:
+        last_id: 上一页最后一条记录的id
+
+    Returns:
+        str: URL安全的游标字符串
+    """
+    raw = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor):
+    """
+    解析encode_cursor生成的游标
+
+    Args:
+        cursor: 游标字符串
+
+    Returns:
+        int: 上一页最后一条记录的id
+
+    Raises:
+        ValueError: 当游标不是本模块生成的格式时抛出
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        last_id = json.loads(raw)['id']
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise ValueError(f"无效的游标: {cursor}")
+    if type(last_id) is not int:
+        raise ValueError(f"无效的游标: {cursor}")
+    return last_id
+
+
+def clamp_per_page(per_page):
+    """
+    把请求中的每页条数限制在1到MAX_PER_PAGE之间
+    """
+    if per_page is None:
+        return DEFAULT_PER_PAGE
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+def keyset_paginate(query, column, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """
+    按主键倒序的游标分页：WHERE id < :cursor ORDER BY id DESC LIMIT n
+
+    与OFFSET分页不同，每一页都直接从索引定位起点，第10000页和第1页的代价相同。
+    多取一条用来判断是否还有下一页，不需要COUNT(*)。
+
+    Args:
+        query: SQLAlchemy查询，可以已带过滤条件
+        column: 排序用的唯一列，通常是模型的id
+        cursor: 上一页返回的next_cursor，None表示第一页
+        per_page: 每页条数
+
+    Returns:
+        tuple: (本页记录列表, 下一页游标)，没有下一页时游标为None
+
+    Raises:
+        ValueError: 当游标无效时抛出
+    """
+    if cursor:
+        query = query.filter(column < decode_cursor(cursor))
+    items = query.order_by(column.desc()).limit(per_page + 1).all()
+    if len(items) <= per_page:
+        return items, None
+    items = items[:per_page]
+    return items, encode_cursor(getattr(items[-1], column.key))
@@ -0,0 +1,254 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# 每个连接打开后执行的PRAGMA配置，按顺序执行
+# journal_mode=WAL：读写互不阻塞，写入只追加到-wal文件
+# synchronous=NORMAL：WAL模式下只在检查点时fsync，断电最多丢失最近的提交
+# mmap_size：用内存映射读取数据库文件，减少read系统调用和复制
+# cache_size：负数表示KiB，每个连接64MB页缓存
+# temp_store=MEMORY：排序、临时索引放在内存中
+# busy_timeout：遇到锁时最多等待的毫秒数，而不是立即报database is locked
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+
+def apply_pragmas(conn, pragmas=PRAGMAS):
+    """
+    在连接上执行PRAGMA配置
+
+    Args:
+        conn: sqlite3连接，也可以是SQLAlchemy connect事件中的DBAPI连接
+        pragmas: {名称: 值}，为空时不做任何修改
+
+    Raises:
+        ValueError: 当PRAGMA名称不合法时抛出
+    """
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f"不合法的PRAGMA名称: {name}")
+        # PRAGMA不支持参数绑定，值只来自配置；journal_mode等会返回结果行，需要取走
+        cursor = conn.execute(f'PRAGMA {name}={value}')
+        cursor.fetchall()
+        cursor.close()
+
+
+class SQLitePool:
+    """
+    线程安全的SQLite连接池
+
+    特性：
+    1. 同一线程内嵌套借用时复用同一个连接，一次请求中的多次查询共用连接
+    2. 归还的连接放回空闲列表，后续请求直接复用，省去每次connect的开销
+    3. 连接总数不超过max_size，借满时等待归还，超时抛出TimeoutError
+    4. 空闲超过health_check_interval秒的连接借出前先执行SELECT 1检查，失效则重建
+    5. 归还时回滚未提交的事务，避免把半个事务带给下一个请求
+    6. 新建的连接执行pragmas中的PRAGMA配置，默认开启WAL
+    """
+
+    def __init__(self, database, max_size=8, timeout=5.0, cached_statements=256,
+                 health_check_interval=30.0, row_factory=sqlite3.Row,
+                 pragmas=PRAGMAS):
+        """
+        初始化连接池，连接在第一次借用时才创建
+
+        Args:
+            database: 数据库文件路径
+            max_size: 最多同时存在的连接数
+            timeout: 连接借满时等待的最长秒数
+            cached_statements: 每个连接缓存的预编译语句数量
+            health_check_interval: 空闲多少秒后借出前需要检查连接
+            row_factory: 行工厂，默认以字典形式返回结果
+            pragmas: 每个新连接执行的PRAGMA配置，传入{}保持SQLite默认设置
+        """
+        self.database = database
+        self._max_size = max_size
+        self._timeout = timeout
+        self._cached_statements = cached_statements
+        self._health_check_interval = health_check_interval
+        self._row_factory = row_factory
+        self._pragmas = dict(pragmas)
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def acquire(self):
+        """
+        借出一个连接，当前线程已借用时返回同一个连接
+
+        Returns:
+            sqlite3.Connection: 数据库连接
+
+        Raises:
+            TimeoutError: 当连接借满且在timeout秒内没有归还时抛出
+        """
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None:
+            local.depth += 1
+            return conn
+        conn = self._checkout()
+        local.conn = conn
+        local.depth = 1
+        return conn
+
+    def release(self, conn):
+        """
+        归还连接，与acquire成对调用
+
+        Args:
+            conn: acquire借出的连接
+
+        Raises:
+            ValueError: 当连接不是当前线程借出的时抛出
+        """
+        local = self._local
+        if getattr(local, 'conn', None) is not conn:
+            raise ValueError("连接不是当前线程借出的")
+        local.depth -= 1
+        if local.depth:
+            return
+        local.conn = None
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # 连接已关闭或损坏，不再放回连接池
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        以上下文管理器的方式借用连接
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """
+        获取连接池状态
+
+        Returns:
+            dict: 连接总数、空闲数、新建次数、复用次数、丢弃次数
+        """
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded,
+            }
+
+    def close(self):
+        """
+        关闭所有空闲连接，借出中的连接归还后仍可继续使用
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            conn.close()
+
+    def _checkout(self):
+        deadline = time.monotonic() + self._timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self._max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"等待数据库连接超时，连接池上限 {self._max_size}")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    # 后进先出，最近用过的连接缓存最热
+                    conn, last_used = self._idle.pop()
+                else:
+                    self._size += 1
+                    conn = last_used = None
+
+            if conn is None:
+                return self._create()
+            if time.monotonic() - last_used >= self._health_check_interval:
+                try:
+                    conn.execute('SELECT 1').fetchone()
+                except sqlite3.Error:
+                    self._discard(conn)
+                    continue
+            with self._cond:
+                self.reused += 1
+            return conn
+
+    def _create(self):
+        conn = None
+        try:
+            # 连接会在不同线程间传递，但同一时刻只被一个线程使用
+            conn = sqlite3.connect(
+                self.database, check_same_thread=False,
+                cached_statements=self._cached_statements)
+            apply_pragmas(conn, self._pragmas)
+        except (sqlite3.Error, ValueError):
+            if conn is not None:
+                conn.close()
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        conn.row_factory = self._row_factory
+        with self._cond:
+            self.created += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.discarded += 1
+            self._cond.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database, **options):
+    """
+    获取某个数据库文件共用的连接池，不存在时按options创建
+
+    Args:
+        database: 数据库文件路径
+        options: 传给SQLitePool的参数，只在首次创建时生效
+
+    Returns:
+        SQLitePool: 连接池
+    """
+    # 相对路径按当前目录解析，同一个文件只对应一个连接池
+    key = os.path.abspath(database)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SQLitePool(database, **options)
+        return pool
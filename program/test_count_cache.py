@@ -0,0 +1,84 @@
+from count_cache import CountCache
+
+
+class FakeClock:
+    """
+    手动推进的时钟
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_and_adjust() -> None:
+    """
+    测试总数只统计一次，增删后增量修正
+    """
+    print("=== 测试缓存命中与增量修正 ===")
+    cache = CountCache()
+    calls = []
+
+    def loader() -> int:
+        calls.append(1)
+        return 10
+
+    assert cache.get(('todos', 1), loader) == 10
+    assert cache.get(('todos', 1), loader) == 10
+    cache.adjust(('todos', 1), 1)
+    cache.adjust(('todos', 1), -3)
+    assert cache.get(('todos', 1), loader) == 8
+    # 其他条件不受影响，未缓存的条件修正时忽略
+    cache.adjust(('todos', 2), 5)
+    assert cache.peek(('todos', 2)) is None
+    print(f"命中 {cache.hits} 次, 统计 {cache.misses} 次")
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_ttl_and_eviction() -> None:
+    """
+    测试过期后重新统计，超出上限时淘汰最久未用的条件
+    """
+    print("\n=== 测试过期与淘汰 ===")
+    clock = FakeClock()
+    cache = CountCache(ttl=30, max_entries=2, clock=clock)
+    assert cache.get('a', lambda: 1) == 1
+    clock.now = 31
+    assert cache.get('a', lambda: 2) == 2
+
+    cache.get('b', lambda: 3)
+    cache.get('a', lambda: 0)
+    cache.get('c', lambda: 4)
+    print(f"缓存的条件: a={cache.peek('a')}, b={cache.peek('b')}, c={cache.peek('c')}")
+    assert cache.peek('b') is None
+    assert cache.peek('a') == 2 and cache.peek('c') == 4
+
+    cache.invalidate('a')
+    assert cache.get('a', lambda: 5) == 5
+
+
+def test_write_during_load() -> None:
+    """
+    测试统计期间发生写入时，这次的结果不写入缓存
+    """
+    print("\n=== 测试统计期间的写入 ===")
+    cache = CountCache()
+
+    def racing_loader() -> int:
+        # 统计读到的是写入前的快照，写入随后提交并修正
+        cache.adjust('users', 1)
+        return 100
+
+    assert cache.get('users', racing_loader) == 100
+    assert cache.peek('users') is None
+    assert cache.get('users', lambda: 101) == 101
+    assert cache.peek('users') == 101
+
+
+if __name__ == "__main__":
+    test_hit_and_adjust()
+    # test_ttl_and_eviction()
+    # test_write_during_load()
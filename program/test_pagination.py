@@ -0,0 +1,46 @@
+from pagination import MAX_PER_PAGE, clamp_per_page, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    """
+    测试游标编码后可以还原，且不包含URL中需要转义的字符
+    """
+    print("=== 测试游标编解码 ===")
+    for last_id in (1, 12, 10 ** 12):
+        cursor = encode_cursor(last_id)
+        print(f"id {last_id} -> {cursor}")
+        assert decode_cursor(cursor) == last_id
+        assert all(c.isalnum() or c in '-_' for c in cursor)
+
+
+def test_invalid_cursor() -> None:
+    """
+    测试被篡改或格式错误的游标抛出ValueError
+    """
+    print("\n=== 测试无效游标 ===")
+    invalid = ['not-a-cursor', '!!!', encode_cursor('12'), encode_cursor(True),
+               'W10', 'eyJpZCI6MTJ']
+    for cursor in invalid:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            print(f"捕获到异常: {e}")
+        else:
+            raise AssertionError(f"游标 {cursor} 应当无效")
+
+
+def test_clamp_per_page() -> None:
+    """
+    测试每页条数的默认值和上下限
+    """
+    print("\n=== 测试每页条数限制 ===")
+    assert clamp_per_page(None) == 10
+    assert clamp_per_page(0) == 1
+    assert clamp_per_page(20) == 20
+    assert clamp_per_page(10 ** 6) == MAX_PER_PAGE
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    # test_invalid_cursor()
+    # test_clamp_per_page()
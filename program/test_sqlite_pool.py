@@ -0,0 +1,182 @@
+from sqlite_pool import PRAGMAS, SQLitePool, get_pool
+import os
+import tempfile
+import threading
+import time
+
+
+def make_database(directory: str) -> str:
+    """
+    创建带users表的临时数据库
+    """
+    database = os.path.join(directory, 'test.db')
+    pool = SQLitePool(database)
+    with pool.connection() as conn:
+        conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)')
+        conn.executemany('INSERT INTO users (name) VALUES (?)',
+                         [(f"user{i}",) for i in range(100)])
+        conn.commit()
+    pool.close()
+    return database
+
+
+def test_reuse_and_nesting() -> None:
+    """
+    测试连接被复用，同一线程嵌套借用得到同一个连接
+    """
+    print("=== 测试连接复用 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        pool = SQLitePool(make_database(directory))
+        for i in range(1, 101):
+            with pool.connection() as conn:
+                row = conn.execute(
+                    'SELECT name FROM users WHERE id = ?', (i,)).fetchone()
+                assert row['name'] == f"user{i - 1}"
+                with pool.connection() as inner:
+                    assert inner is conn
+        print(f"连接池状态: {pool.stats()}")
+        assert pool.stats()['created'] == 1
+        assert pool.stats()['reused'] == 99
+        pool.close()
+
+
+def test_max_size() -> None:
+    """
+    测试连接借满时等待，超时抛出TimeoutError
+    """
+    print("\n=== 测试连接上限 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        pool = SQLitePool(make_database(directory), max_size=2, timeout=0.2)
+        held = threading.Event()
+        done = threading.Event()
+
+        def holder() -> None:
+            with pool.connection():
+                held.set()
+                done.wait()
+
+        threads = [threading.Thread(target=holder) for _ in range(2)]
+        for t in threads:
+            t.start()
+            held.wait()
+            held.clear()
+
+        start = time.monotonic()
+        try:
+            pool.acquire()
+        except TimeoutError as e:
+            print(f"捕获到超时: {e}")
+        else:
+            raise AssertionError("连接借满时应当超时")
+        assert time.monotonic() - start >= 0.2
+
+        done.set()
+        for t in threads:
+            t.join()
+        with pool.connection() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 100
+        assert pool.stats()['size'] == 2
+        pool.close()
+
+
+def test_health_check_and_rollback() -> None:
+    """
+    测试失效连接被替换，未提交的事务在归还时回滚
+    """
+    print("\n=== 测试健康检查与回滚 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        pool = SQLitePool(make_database(directory), health_check_interval=0)
+
+        with pool.connection() as conn:
+            conn.execute('DELETE FROM users')
+        with pool.connection() as conn:
+            # 上一次借用没有提交，删除已被回滚
+            assert conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 100
+
+        # 借用期间被关闭的连接归还时直接丢弃
+        with pool.connection() as conn:
+            conn.close()
+        assert pool.stats()['discarded'] == 1
+
+        # 空闲期间失效的连接在借出前的检查中被发现并重建
+        with pool.connection() as conn:
+            stale = conn
+        stale.close()
+        with pool.connection() as conn:
+            assert conn is not stale
+            assert conn.execute('SELECT 1').fetchone()[0] == 1
+        print(f"连接池状态: {pool.stats()}")
+        assert pool.stats()['discarded'] == 2
+        assert pool.stats()['size'] == 1
+        pool.close()
+
+
+def test_threads_share_pool() -> None:
+    """
+    测试多个线程并发查询，连接数不超过上限
+    """
+    print("\n=== 测试多线程共用连接池 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        database = make_database(directory)
+        pool = get_pool(database, max_size=4)
+        assert get_pool(database) is pool
+        errors = []
+
+        def worker() -> None:
+            try:
+                for i in range(1, 201):
+                    with pool.connection() as conn:
+                        conn.execute(
+                            'SELECT * FROM users WHERE id = ?', (i % 100 + 1,))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"连接池状态: {pool.stats()}")
+        assert not errors
+        assert pool.stats()['created'] <= 4
+        pool.close()
+
+
+def test_pragmas() -> None:
+    """
+    测试新连接执行PRAGMA配置，传入{}保持默认设置
+    """
+    print("\n=== 测试PRAGMA配置 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        # WAL会写入数据库文件头，默认设置要用一个新文件检查
+        pool = SQLitePool(os.path.join(directory, 'plain.db'), pragmas={})
+        with pool.connection() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+        pool.close()
+
+        database = make_database(directory)
+        pool = SQLitePool(database)
+        with pool.connection() as conn:
+            settings = {name: conn.execute(f'PRAGMA {name}').fetchone()[0]
+                        for name in PRAGMAS}
+        print(f"连接设置: {settings}")
+        assert settings['journal_mode'] == 'wal'
+        assert settings['synchronous'] == 1
+        assert settings['busy_timeout'] == PRAGMAS['busy_timeout']
+        assert settings['cache_size'] == PRAGMAS['cache_size']
+        pool.close()
+
+        try:
+            SQLitePool(database, pragmas={'cache_size; DROP TABLE users': 1}).acquire()
+        except ValueError as e:
+            print(f"捕获到异常: {e}")
+        else:
+            raise AssertionError("不合法的PRAGMA名称应当报错")
+
+
+if __name__ == "__main__":
+    test_reuse_and_nesting()
+    # test_max_size()
+    # test_health_check_and_rollback()
+    # test_threads_share_pool()
+    # test_pragmas()